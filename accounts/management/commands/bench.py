@@ -0,0 +1,131 @@
+# accounts/management/commands/bench.py
+
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+
+from accounts.models import User
+from config.benchmark import (
+    BENCH_NOTIFICATIONS_BACKEND, SCENARIOS, build_plan, load_bench_data, run_plan, seed_bench_data, summarize,
+)
+
+
+class Command(BaseCommand):
+    # python manage.py help bench
+    help = (
+        'Seeds a benchmark dataset in a throwaway test database, drives the hot API endpoints '
+        'through an in-process client and reports latency percentiles, throughput and queries '
+        'per request as JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100, help='Number of users to seed.')
+        parser.add_argument('--posts-per-user', type=int, default=10, help='Posts seeded per user.')
+        parser.add_argument('--follows-per-user', type=int, default=10, help='Follows seeded per user.')
+        parser.add_argument('--comments-per-post', type=int, default=2, help='Nested comments seeded per post.')
+        parser.add_argument('--likes-per-user', type=int, default=20, help='Post likes seeded per user.')
+        parser.add_argument(
+            '--scenario',
+            action='append',
+            choices=sorted(SCENARIOS),
+            help='Scenario to run (repeatable). Defaults to all of them.',
+        )
+        parser.add_argument('--requests', type=int, default=200, help='Measured iterations per scenario.')
+        parser.add_argument('--warmup', type=int, default=20, help='Unmeasured iterations run first.')
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=1,
+            help='Worker threads. Values above 1 need a database with real concurrent writes (PostgreSQL).',
+        )
+        parser.add_argument(
+            '--notifications-backend',
+            default=BENCH_NOTIFICATIONS_BACKEND,
+            help='NOTIFICATIONS_BACKEND used while the endpoints are measured.',
+        )
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for the dataset and the request plan.')
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout.')
+        parser.add_argument(
+            '--keepdb',
+            action='store_true',
+            help='Keep the benchmark database between runs (the dataset is seeded only once).',
+        )
+        parser.add_argument(
+            '--in-place',
+            action='store_true',
+            help='Run against the configured database instead of a test database. Seeds only if it has no users.',
+        )
+
+    def handle(self, *args, **kwargs):
+        if kwargs['requests'] < 1:
+            raise CommandError('--requests must be at least 1.')
+
+        if kwargs['in_place']:
+            # ex.: dataset criado por generate_dataset; APIClient usa o host "testserver"
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                report = self._bench(kwargs)
+        else:
+            # banco de teste descartável: nunca toca os dados reais
+            setup_test_environment()
+            old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=kwargs['keepdb'])
+            try:
+                report = self._bench(kwargs)
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=kwargs['keepdb'])
+                teardown_test_environment()
+
+        output = json.dumps(report, indent=2, sort_keys=True)
+        if kwargs['output']:
+            with open(kwargs['output'], 'w', encoding='utf-8') as f:
+                f.write(output + '\n')
+            self.stderr.write(self.style.SUCCESS(f"Benchmark report written to {kwargs['output']}"))
+        else:
+            self.stdout.write(output)
+
+    def _bench(self, kwargs):
+        if User.objects.exists():
+            dataset = load_bench_data()
+        else:
+            self.stderr.write(self.style.NOTICE('Seeding benchmark dataset...'))
+            dataset = seed_bench_data(
+                kwargs['users'],
+                kwargs['posts_per_user'],
+                kwargs['follows_per_user'],
+                kwargs['comments_per_post'],
+                kwargs['likes_per_user'],
+                seed=kwargs['seed'],
+            )
+        if len(dataset['users']) < 2 or not dataset['posts']:
+            raise CommandError('The benchmark needs at least 2 users and 1 post.')
+
+        results = {}
+        with override_settings(NOTIFICATIONS_BACKEND=kwargs['notifications_backend']):
+            self._run_scenarios(kwargs, dataset, results)
+
+        return {
+            "config": {
+                "concurrency": kwargs['concurrency'],
+                "database": connection.vendor,
+                "debug": settings.DEBUG,
+                "notifications_backend": kwargs['notifications_backend'],
+                "requests": kwargs['requests'],
+                "seed": kwargs['seed'],
+                "warmup": kwargs['warmup'],
+            },
+            "dataset": {"users": len(dataset['users']), "posts": len(dataset['posts'])},
+            "endpoints": results,
+        }
+
+    def _run_scenarios(self, kwargs, dataset, results):
+        for scenario in kwargs['scenario'] or sorted(SCENARIOS):
+            self.stderr.write(self.style.NOTICE(f'Running {scenario}...'))
+            plan = build_plan(scenario, dataset, kwargs['warmup'] + kwargs['requests'], seed=kwargs['seed'])
+            # aquecimento fora da medição (caches, conexões, primeiro acesso)
+            run_plan(plan[:kwargs['warmup']], kwargs['concurrency'])
+            samples, elapsed = run_plan(plan[kwargs['warmup']:], kwargs['concurrency'])
+            for label, label_samples in samples.items():
+                results[label] = summarize(label_samples, elapsed)
+
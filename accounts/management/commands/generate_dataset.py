@@ -0,0 +1,75 @@
+# accounts/management/commands/generate_dataset.py
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from accounts.models import User
+from config.dataset import DATASET_PASSWORD, DatasetGenerator
+
+
+class Command(BaseCommand):
+    # python manage.py help generate_dataset
+    help = (
+        'Generates a large synthetic dataset (users, power-law follows, posts, comment trees, likes, '
+        'hashtags, timelines and notifications) with chunked bulk inserts, for performance testing.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000, help='Number of users.')
+        parser.add_argument('--follows-per-user', type=int, default=30, help='Average follows per user (power-law).')
+        parser.add_argument('--posts-per-user', type=int, default=10, help='Average posts per user.')
+        parser.add_argument('--comments-per-post', type=int, default=3, help='Average comments per post.')
+        parser.add_argument('--likes-per-post', type=int, default=5, help='Average likes per post.')
+        parser.add_argument('--hashtags', type=int, default=500, help='Number of distinct hashtags.')
+        parser.add_argument('--days', type=int, default=30, help='Timestamps are spread over the last N days.')
+        parser.add_argument('--prefix', default='user', help='Username prefix of the generated users.')
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Rows generated and inserted per batch.')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed (same seed, same dataset).')
+        parser.add_argument(
+            '--copy',
+            action='store_true',
+            help='Use COPY instead of INSERT on PostgreSQL.',
+        )
+        parser.add_argument('--skip-notifications', action='store_true', help='Do not generate notifications.')
+        parser.add_argument('--skip-timelines', action='store_true', help='Do not fan posts out to the timelines.')
+
+    def handle(self, *args, **kwargs):
+        if kwargs['users'] < 1 or kwargs['chunk_size'] < 1:
+            raise CommandError('--users and --chunk-size must be at least 1.')
+        if kwargs['copy'] and connection.vendor != 'postgresql':
+            raise CommandError('--copy is only supported on PostgreSQL.')
+        if User.objects.filter(username__startswith=kwargs['prefix']).exists():
+            raise CommandError(
+                f"Users starting with '{kwargs['prefix']}' already exist. Choose another --prefix."
+            )
+
+        generator = DatasetGenerator(
+            users=kwargs['users'],
+            follows_per_user=kwargs['follows_per_user'],
+            posts_per_user=kwargs['posts_per_user'],
+            comments_per_post=kwargs['comments_per_post'],
+            likes_per_post=kwargs['likes_per_post'],
+            hashtags=kwargs['hashtags'],
+            days=kwargs['days'],
+            prefix=kwargs['prefix'],
+            chunk_size=kwargs['chunk_size'],
+            copy=kwargs['copy'],
+            notifications=not kwargs['skip_notifications'],
+            timelines=not kwargs['skip_timelines'],
+            seed=kwargs['seed'],
+            log=lambda message: self.stdout.write(self.style.NOTICE(message)),
+        )
+
+        started = time.perf_counter()
+        rows = generator.generate()
+        elapsed = time.perf_counter() - started
+
+        for table, count in sorted(rows.items()):
+            self.stdout.write(f"{table}: {count}")
+        total = sum(rows.values())
+        self.stdout.write(self.style.SUCCESS(
+            f"{total} rows in {elapsed:.1f}s ({total / elapsed:.0f} rows/s). "
+            f"Password of every generated user: {DATASET_PASSWORD}"
+        ))
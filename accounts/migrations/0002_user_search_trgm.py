@@ -0,0 +1,37 @@
+# índices de busca de usuários (accounts/search.py)
+# pg_trgm + GIN em UPPER(campo::text): mesma expressão que o Django gera
+# para icontains/istartswith no PostgreSQL
+# em outros bancos a migration não faz nada (fallback em memória)
+
+from django.db import migrations
+
+SEARCH_FIELDS = ("username", "first_name", "last_name")
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for field in SEARCH_FIELDS:
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS accounts_user_{field}_trgm "
+            f'ON accounts_user USING gin (UPPER("{field}"::text) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for field in SEARCH_FIELDS:
+        schema_editor.execute(f"DROP INDEX IF EXISTS accounts_user_{field}_trgm")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
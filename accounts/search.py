@@ -0,0 +1,177 @@
+# accounts/search.py
+
+# busca de usuários (/users/search/) com índice
+# - PostgreSQL: índices GIN pg_trgm em UPPER(username/first_name/last_name)
+#   (migration 0002), filtro icontains/istartswith servido pelos índices
+#   e ranking por similarity()
+# - outros bancos (SQLite em dev/testes): trie de prefixos em memória,
+#   mantida pelos signals de User (accounts/signals.py)
+#
+# ranking comum: username começando com o termo primeiro, depois o restante
+# mode "prefix" (autocomplete de menções): só casamentos por prefixo
+
+import threading
+
+from django.db import connection
+from django.db.models import Case, FloatField, Func, IntegerField, Q, Value, When
+from django.db.models.functions import Greatest
+
+from .models import User
+
+SEARCH_FIELDS = ("username", "first_name", "last_name")
+
+
+def search_users(query, limit, prefix_only=False):
+    query = query.strip()
+    if not query:
+        return []
+    if connection.vendor == "postgresql":
+        return _trigram_search(query, limit, prefix_only)
+    return user_trie.search(query, limit, prefix_only)
+
+
+# POSTGRESQL
+
+class Similarity(Func):
+    function = "similarity"
+    output_field = FloatField()
+
+
+def _trigram_search(query, limit, prefix_only):
+    lookup = "istartswith" if prefix_only else "icontains"
+    condition = Q()
+    for field in SEARCH_FIELDS:
+        condition |= Q(**{f"{field}__{lookup}": query})
+
+    users = User.objects.filter(condition).annotate(
+        username_prefix=Case(
+            When(username__istartswith=query, then=Value(1)),
+            default=Value(0),
+            output_field=IntegerField(),
+        ),
+        rank=Greatest(*(Similarity(field, Value(query)) for field in SEARCH_FIELDS)),
+    )
+    return list(users.order_by("-username_prefix", "-rank", "username")[:limit])
+
+
+# FALLBACK: TRIE EM MEMÓRIA
+
+class _Node:
+    __slots__ = ("children", "ids")
+
+    def __init__(self):
+        self.children = {}
+        self.ids = set()
+
+
+# trie de prefixos: cada nó guarda os ids de usuários com algum termo
+# começando pelo prefixo do caminho
+# duas tries: username (rank maior) e nomes (first_name/last_name)
+class UserTrie:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._built = False
+        self._username = _Node()
+        self._names = _Node()
+        # {user_id: (username, first_name, last_name)} minúsculos
+        self._terms = {}
+
+    def _insert(self, root, term, user_id):
+        node = root
+        node.ids.add(user_id)
+        for char in term:
+            node = node.children.setdefault(char, _Node())
+            node.ids.add(user_id)
+
+    def _delete(self, root, term, user_id):
+        node = root
+        node.ids.discard(user_id)
+        for char in term:
+            node = node.children.get(char)
+            if node is None:
+                return
+            node.ids.discard(user_id)
+
+    def _find(self, root, prefix):
+        node = root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return set()
+        return node.ids
+
+    def _add(self, user_id, username, first_name, last_name):
+        terms = (username.lower(), first_name.lower(), last_name.lower())
+        self._terms[user_id] = terms
+        self._insert(self._username, terms[0], user_id)
+        for term in terms[1:]:
+            self._insert(self._names, term, user_id)
+
+    def _remove(self, user_id):
+        terms = self._terms.pop(user_id, None)
+        if terms is None:
+            return
+        self._delete(self._username, terms[0], user_id)
+        for term in terms[1:]:
+            self._delete(self._names, term, user_id)
+
+    def _build(self):
+        for row in User.objects.values_list("id", *SEARCH_FIELDS).iterator(chunk_size=2000):
+            self._add(*row)
+        self._built = True
+
+    # signals: atualização incremental (só depois que a trie foi construída)
+    def update(self, user):
+        with self._lock:
+            if self._built:
+                self._remove(user.id)
+                self._add(user.id, user.username, user.first_name, user.last_name)
+
+    def discard(self, user_id):
+        with self._lock:
+            if self._built:
+                self._remove(user_id)
+
+    def clear(self):
+        with self._lock:
+            self.__init__()
+
+    def _ranked_ids(self, query, prefix_only):
+        term = query.lower()
+        with self._lock:
+            if not self._built:
+                self._build()
+
+            username_ids = self._find(self._username, term)
+            name_ids = self._find(self._names, term) - username_ids
+            groups = [username_ids, name_ids]
+            if not prefix_only:
+                matched = username_ids | name_ids
+                groups.append({
+                    user_id for user_id, terms in self._terms.items()
+                    if user_id not in matched and any(term in value for value in terms)
+                })
+
+            return [
+                user_id
+                for group in groups
+                for user_id in sorted(group, key=lambda user_id: self._terms[user_id][0])
+            ]
+
+    def search(self, query, limit, prefix_only=False):
+        ranked_ids = self._ranked_ids(query, prefix_only)
+
+        # ids de usuários apagados sem signal (ex.: rollback) são descartados
+        users = []
+        while ranked_ids and len(users) < limit:
+            chunk, ranked_ids = ranked_ids[: limit - len(users)], ranked_ids[limit - len(users):]
+            found = User.objects.in_bulk(chunk)
+            for user_id in chunk:
+                if user_id in found:
+                    users.append(found[user_id])
+                else:
+                    self.discard(user_id)
+        return users
+
+
+user_trie = UserTrie()
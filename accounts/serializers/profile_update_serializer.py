@@ -2,6 +2,7 @@
 
 from rest_framework import serializers
 from ..models import User
+from uploads.media_urls import media_url
 
 
 class UserProfileUpdateSerializer(serializers.ModelSerializer):
@@ -40,8 +41,8 @@ class UserProfileUpdateSerializer(serializers.ModelSerializer):
 
         if request is not None:
             if instance.profile_picture:
-                representation['profile_picture'] = request.build_absolute_uri(instance.profile_picture.url)
+                representation['profile_picture'] = media_url(instance.profile_picture, request)
             if instance.cover_image:
-                representation['cover_image'] = request.build_absolute_uri(instance.cover_image.url)
+                representation['cover_image'] = media_url(instance.cover_image, request)
         
         return representation
\ No newline at end of file
@@ -1,7 +1,11 @@
 # accounts/serializers/user_serializer.py
 
+from django.db import models
 from rest_framework import serializers
 from accounts.models import User
+from follows.follow_state import FOLLOW_STATE, follow_state
+from config.expand import expand_requested
+from uploads.media_urls import media_url
 
 # Serializer completo para /me e /username
 class UserSerializer(serializers.ModelSerializer):
@@ -39,26 +43,25 @@ class UserSerializer(serializers.ModelSerializer):
     # variável request será igual ao "request" (requisição HTTP atual) 
     # do contexto do serializador (contexto passado pela Viewset)
     
-    # request.build_absolute_uri(obj.arquivo.url) captura o caminho relativo do arquivo (/media/...) e, 
-    # usando as informações do host e do esquema da requisição (HTTP/HTTPS), 
+    # media_url(obj.arquivo, request) (uploads/media_urls.py) junta a base do storage
+    # (/media/... ou domínio do bucket, em cache por processo) ao nome do arquivo e,
+    # usando as informações do host e do esquema da requisição (HTTP/HTTPS),
     # constrói a URL completa e acessível publicamente
 
-    # Se a requisição existir, build_absolute_uri monta URL completa a ser retornada
+    # Se a requisição existir, media_url monta URL completa a ser retornada
     # pelos campos serializados manualmente (profile_picture e cover_image)
     def get_profile_picture(self, obj):
-        if obj.profile_picture:
-            # captura o objeto request passado pela viewset para o serializer
-            request = self.context.get('request')
-            if request is not None:
-                return request.build_absolute_uri(obj.profile_picture.url)
+        # captura o objeto request passado pela viewset para o serializer
+        request = self.context.get('request')
+        if request is not None:
+            return media_url(obj.profile_picture, request)
         return None
 
     def get_cover_image(self, obj):
-        if obj.cover_image:
-            # captura o objeto request passado pela viewset para o serializer
-            request = self.context.get('request')
-            if request is not None:
-                return request.build_absolute_uri(obj.cover_image.url)
+        # captura o objeto request passado pela viewset para o serializer
+        request = self.context.get('request')
+        if request is not None:
+            return media_url(obj.cover_image, request)
         return None
 
 
@@ -102,6 +105,19 @@ class UserSerializer(serializers.ModelSerializer):
 
 
 
+# list serializer de UserBasicSerializer (many=True)
+# com ?expand=follow_state, calcula contagens e relação de follow
+# da lista inteira em duas queries agrupadas
+class UserBasicListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        users = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        if users and expand_requested(self.context, FOLLOW_STATE):
+            self.context.setdefault("follow_state", {}).update(
+                follow_state(self.context["request"].user, [user.id for user in users])
+            )
+        return super().to_representation(users)
+
+
 # Serializer básico pra aninhamento e menções
 class UserBasicSerializer(serializers.ModelSerializer):
     # profile_picture é serializado manualmente para retornar URL completa
@@ -113,17 +129,18 @@ class UserBasicSerializer(serializers.ModelSerializer):
         fields = ['id', 'username', 'first_name', 'last_name', 'profile_picture']
         # Somente leitura
         read_only_fields = ['id', 'username', 'first_name', 'last_name', 'profile_picture']
+        list_serializer_class = UserBasicListSerializer
 
     # Gerenciamento do campo serializado manualmente
     # self: instância da classe do serializer (UserBasicSerializer)
     # obj: instância do modelo sendo serializado (User)
     def get_profile_picture(self, obj):
-        if obj.profile_picture:
-            # extrai requisição HTTP
-            request = self.context.get('request')
-            if request is not None:
-                # build_absolute_uri monta URL completa a ser retornada pelo campo profile_picture
-                return request.build_absolute_uri(obj.profile_picture.url)
+        # extrai requisição HTTP
+        request = self.context.get('request')
+        if request is not None:
+            # media_url monta URL completa a ser retornada pelo campo profile_picture
+            # (memo por requisição: o mesmo autor se repete nos posts do feed)
+            return media_url(obj.profile_picture, request)
         return None
 
 
@@ -135,4 +152,14 @@ class UserBasicSerializer(serializers.ModelSerializer):
         data = super().to_representation(instance)
         data["firstName"] = data.pop("first_name")
         data["lastName"] = data.pop("last_name")
+
+        # ?expand=follow_state: só embutido quando a lista pré-carregou o estado
+        # (UserBasicSerializer aninhado em posts/comments não dispara queries extras)
+        state = self.context.get("follow_state", {}).get(instance.id)
+        if state is not None:
+            data["followersCount"] = state["followers_count"]
+            data["followingCount"] = state["following_count"]
+            data["isFollowedByMe"] = state["is_followed_by_me"]
+            data["followsMe"] = state["follows_me"]
+
         return data
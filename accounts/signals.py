@@ -0,0 +1,18 @@
+# accounts/signals.py
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import User
+from .search import user_trie
+
+
+# trie de busca em memória (fallback fora do PostgreSQL)
+@receiver(post_save, sender=User)
+def update_user_search_index(sender, instance, **kwargs):
+    user_trie.update(instance)
+
+
+@receiver(post_delete, sender=User)
+def remove_user_from_search_index(sender, instance, **kwargs):
+    user_trie.discard(instance.id)
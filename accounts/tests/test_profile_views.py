@@ -88,4 +88,39 @@ class UserProfileViewTests(APITestCase):
     def test_search_empty_query(self):
         response = self.client.get(f"{self.search_url}?q=")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 0)
\ No newline at end of file
+        self.assertEqual(len(response.data), 0)
+    
+    
+    
+    def test_search_ranks_username_prefix_first(self):
+        by_name = UserFactory(username='zzz', first_name='Marina', last_name='Silva')
+        by_username = UserFactory(username='marinho', first_name='Pedro', last_name='Costa')
+        by_substring = UserFactory(username='amarina', first_name='Ana', last_name='Lima')
+
+        response = self.client.get(self.search_url, {'q': 'mari'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [user['username'] for user in response.data],
+            [by_username.username, by_name.username, by_substring.username],
+        )
+
+    
+    
+    def test_search_prefix_mode_skips_substring_matches(self):
+        UserFactory(username='amarina', first_name='Ana', last_name='Lima')
+        prefix_match = UserFactory(username='marinho', first_name='Pedro', last_name='Costa')
+
+        response = self.client.get(self.search_url, {'q': 'mari', 'mode': 'prefix'})
+        self.assertEqual([user['username'] for user in response.data], [prefix_match.username])
+
+    
+    
+    def test_search_reflects_username_change(self):
+        self.other_user.username = 'renamedperson'
+        self.other_user.save()
+
+        response = self.client.get(self.search_url, {'q': 'renamedp'})
+        self.assertEqual([user['username'] for user in response.data], ['renamedperson'])
+        response = self.client.get(self.search_url, {'q': 'otheruser'})
+        self.assertEqual(response.data, [])
+
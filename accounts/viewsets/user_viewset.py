@@ -12,11 +12,8 @@ from rest_framework.response import Response
 # status: retorno código de status HTTP
 from rest_framework import status
 
-# Encapsulate filters as objects that can then be combined logically (using & and |)
-# permite buscas avançadas (filtragem via combinação lógica) 
-from django.db.models import Q
-
 from ..models import User
+from ..search import search_users
 from ..serializers import UserSerializer, UserProfileUpdateSerializer, UserBasicSerializer
 from follows.models import Follow
 
@@ -71,6 +68,8 @@ class UserViewSet(viewsets.ReadOnlyModelViewSet):
     # self: UserViewSet
     # request: requisição HTTP atual, objeto Request do DRF
     # novo endpoint customizado /users/search/?q=...
+    # busca indexada (accounts/search.py), ranking com prefixo do username primeiro
+    # ?mode=prefix: só casamentos por prefixo (autocomplete de menções a cada tecla)
     @action(detail=False, methods=['get'])
     def search(self, request):
         # resgada o que for digitado
@@ -80,16 +79,8 @@ class UserViewSet(viewsets.ReadOnlyModelViewSet):
             # retorna lista vazia caso não haja parametro digitado
             return Response([], status=status.HTTP_200_OK)
 
-        # Otimização: use select_related para a queryset
-        # filtra os usuários por username, first_name ou last_name (case insensitive)
-        # "Q" pra juntar as condições 
-        users = self.get_queryset().filter(
-            Q(username__icontains=query) |
-            Q(first_name__icontains=query) |
-            Q(last_name__icontains=query)
-        ) 
-        
-        users = users[:10] # limite de resultados para busca
+        prefix_only = request.query_params.get('mode') == 'prefix'
+        users = search_users(query, limit=10, prefix_only=prefix_only) # limite de resultados para busca
 
         # usa serializer básico pra aninhamento e menções
         serializer = UserBasicSerializer(users, many=True, context={"request": request})
@@ -0,0 +1,31 @@
+# comments/management/commands/backfill_comment_paths.py
+
+from django.core.management.base import BaseCommand
+
+from comments.models import Comment
+from comments.paths import backfill_paths
+
+
+class Command(BaseCommand):
+    # python manage.py help backfill_comment_paths
+    help = 'Fills the materialized path/depth of comments created before the path column existed.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of comments updated per batch.',
+        )
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Clears every path first and rebuilds all of them.',
+        )
+
+    def handle(self, *args, **kwargs):
+        if kwargs['reset']:
+            Comment.objects.exclude(path="").update(path="", depth=0)
+
+        filled = backfill_paths(Comment, kwargs['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"{filled} comment path(s) filled."))
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:53
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def _count(queryset, field):
+    counts = (
+        queryset.filter(**{field: OuterRef("pk")})
+        .order_by()
+        .values(field)
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    return Coalesce(Subquery(counts), 0)
+
+
+def populate_counters(apps, schema_editor):
+    Comment = apps.get_model("comments", "Comment")
+    Like = apps.get_model("likes", "Like")
+
+    Comment.objects.update(
+        like_count=_count(Like.objects.all(), "comment"),
+        reply_count=_count(Comment.objects.all(), "parent_comment"),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("comments", "0002_alter_comment_options_remove_comment_updated_at"),
+        ("likes", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="comment",
+            name="like_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="comment",
+            name="reply_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
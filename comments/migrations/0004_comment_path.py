@@ -0,0 +1,63 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:37
+
+import uuid
+
+from django.db import migrations, models
+from django.db.models import Q
+
+
+# cópia do backfill de comments/paths.py no estado desta migração
+# (mudanças futuras no código do app não alteram a migração)
+def populate_comment_paths(apps, schema_editor):
+    Comment = apps.get_model("comments", "Comment")
+
+    def path_segment(comment_id):
+        return f"{uuid.UUID(str(comment_id)).hex}."
+
+    # nível a nível: cada lote pega comments cujo pai já tem path (ou raízes)
+    pending = Comment.objects.filter(path="").filter(
+        Q(parent_comment__isnull=True) | ~Q(parent_comment__path="")
+    )
+    while True:
+        rows = list(
+            pending.order_by("pk").values_list(
+                "pk", "parent_comment__path", "parent_comment__depth"
+            )[:1000]
+        )
+        if not rows:
+            return
+
+        Comment.objects.bulk_update(
+            [
+                Comment(
+                    pk=pk,
+                    path=(parent_path or "") + path_segment(pk),
+                    depth=parent_depth + 1 if parent_path else 0,
+                )
+                for pk, parent_path, parent_depth in rows
+            ],
+            ["path", "depth"],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("comments", "0003_comment_counters"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="comment",
+            name="depth",
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="comment",
+            name="path",
+            field=models.CharField(
+                blank=True, db_index=True, default="", editable=False, max_length=1024
+            ),
+        ),
+        migrations.RunPython(populate_comment_paths, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("comments", "0004_comment_path"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="comment",
+            name="media_renditions",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
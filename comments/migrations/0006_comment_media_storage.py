@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:26
+
+import uploads.storages
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("comments", "0005_comment_media_renditions"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="comment",
+            name="image",
+            field=models.ImageField(
+                blank=True,
+                null=True,
+                storage=uploads.storages.public_media_storage,
+                upload_to="comment_images/",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="comment",
+            name="video",
+            field=models.FileField(
+                blank=True,
+                null=True,
+                storage=uploads.storages.public_media_storage,
+                upload_to="comment_videos/",
+            ),
+        ),
+    ]
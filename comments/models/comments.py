@@ -4,8 +4,11 @@ from django.db import models
 from django.conf import settings
 import uuid
 
+from config.tokens import TrackedContentMixin
+from uploads.storages import public_media_storage
 
-class Comment(models.Model):
+
+class Comment(TrackedContentMixin, models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     post = models.ForeignKey(
         "posts.Post", on_delete=models.CASCADE, related_name="comments"
@@ -15,10 +18,22 @@ class Comment(models.Model):
         "self", null=True, blank=True, on_delete=models.CASCADE, related_name="comments"
     )
     content = models.TextField()
-    image = models.ImageField(upload_to="comment_images/", null=True, blank=True)
-    video = models.FileField(upload_to="comment_videos/", null=True, blank=True)
+    image = models.ImageField(upload_to="comment_images/", storage=public_media_storage, null=True, blank=True)
+    video = models.FileField(upload_to="comment_videos/", storage=public_media_storage, null=True, blank=True)
+    # renditions WebP/JPEG de image geradas pelo pipeline de mídia (uploads/renditions.py)
+    media_renditions = models.JSONField(default=dict, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # contadores desnormalizados, mantidos por signals com F()
+    # (likes/signals.py, comments/signals.py)
+    like_count = models.PositiveIntegerField(default=0)
+    reply_count = models.PositiveIntegerField(default=0)
+
+    # materialized path (comments/paths.py), preenchido no pre_save
+    # subárvore = prefixo do path; depth: 0 para comments raiz
+    path = models.CharField(max_length=1024, db_index=True, blank=True, default="", editable=False)
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
+
     class Meta:
         ordering = ['-created_at']
 
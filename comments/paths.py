@@ -0,0 +1,109 @@
+# comments/paths.py
+
+# materialized path dos comments
+# path: ids (hex) de todos os ancestrais + o próprio id, terminados por "."
+#   raiz:   "<raiz>."
+#   reply:  "<raiz>.<pai>.<reply>."
+# depth: quantidade de ancestrais (raiz = 0)
+# a subárvore de um comment é um range do índice de path (LIKE 'prefixo%'):
+# no PostgreSQL o db_index do CharField também cria o índice varchar_pattern_ops
+# contagens, remoção e busca da thread inteira viram uma única query indexada
+
+import uuid
+
+from django.db.models import Q
+
+from .models import Comment
+
+PATH_SEPARATOR = "."
+SEGMENT_LENGTH = 33  # uuid hex + separador
+
+# limite imposto pelo tamanho da coluna (max_length=1024)
+MAX_DEPTH = 30
+
+
+def path_segment(comment_id):
+    return f"{uuid.UUID(str(comment_id)).hex}{PATH_SEPARATOR}"
+
+
+# preenche path/depth de um comment novo a partir do pai
+# usa o pai já carregado na instância (serializer/factory) quando disponível
+# pai ainda sem path (linhas antigas): fica vazio até o backfill_comment_paths
+def set_comment_path(comment):
+    if comment.parent_comment_id is None:
+        comment.path, comment.depth = path_segment(comment.id), 0
+        return
+
+    if Comment.parent_comment.is_cached(comment):
+        parent_path, parent_depth = comment.parent_comment.path, comment.parent_comment.depth
+    else:
+        parent_path, parent_depth = (
+            Comment.objects.filter(pk=comment.parent_comment_id).values_list("path", "depth").get()
+        )
+    if parent_path:
+        comment.path, comment.depth = parent_path + path_segment(comment.id), parent_depth + 1
+
+
+# subárvore do comment (com ou sem ele mesmo)
+# comment sem path (linhas antigas, loaddata/bulk_create, backfill --reset):
+# só ele mesmo; path__startswith="" casaria com todos os comments
+def subtree(comment, include_self=True):
+    if not comment.path:
+        return Comment.objects.filter(pk=comment.pk) if include_self else Comment.objects.none()
+    queryset = Comment.objects.filter(path__startswith=comment.path)
+    if not include_self:
+        queryset = queryset.filter(depth__gt=comment.depth)
+    return queryset
+
+
+def count_descendants(comment):
+    return subtree(comment, include_self=False).count()
+
+
+# ids dos ancestrais, da raiz até o pai (sem query)
+def ancestor_ids(comment):
+    segments = comment.path.split(PATH_SEPARATOR)[:-2]
+    return [uuid.UUID(segment) for segment in segments]
+
+
+def root_id(comment):
+    return uuid.UUID(comment.path[:SEGMENT_LENGTH - 1])
+
+
+# remove o comment e todas as replies com uma query de range no path
+# (o CASCADE de parent_comment desceria um nível por query)
+# sem path: delete() do próprio comment, replies removidas pelo CASCADE
+def delete_subtree(comment):
+    if not comment.path:
+        return comment.delete()
+    return subtree(comment).delete()
+
+
+# preenche path/depth das linhas sem path, nível a nível:
+# cada lote pega comments cujo pai já tem path (ou raízes)
+# model: Comment (a migração 0004_comment_path tem a própria cópia)
+# retorna a quantidade de linhas preenchidas
+def backfill_paths(model, batch_size=1000):
+    filled = 0
+    pending = model.objects.filter(path="").filter(
+        Q(parent_comment__isnull=True) | ~Q(parent_comment__path="")
+    )
+    while True:
+        rows = list(
+            pending.order_by("pk").values_list("pk", "parent_comment__path", "parent_comment__depth")[:batch_size]
+        )
+        if not rows:
+            return filled
+
+        model.objects.bulk_update(
+            [
+                model(
+                    pk=pk,
+                    path=(parent_path or "") + path_segment(pk),
+                    depth=parent_depth + 1 if parent_path else 0,
+                )
+                for pk, parent_path, parent_depth in rows
+            ],
+            ["path", "depth"],
+        )
+        filled += len(rows)
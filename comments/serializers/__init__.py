@@ -1 +1,2 @@
 from .comment_serializer import CommentSerializer
+from .comment_thread_serializer import CommentThreadSerializer
@@ -1,20 +1,27 @@
 # comments/serializers/comment_serializer.py
 
+from django.db import models
 from rest_framework import serializers
 from ..models import Comment
+from ..paths import MAX_DEPTH
 from accounts.serializers import UserBasicSerializer
 from posts.models import Post
+from posts.viewer_state import VIEWER_STATE, comment_viewer_state, get_viewer_state
+from config.expand import expand_requested
+from uploads.media_urls import media_url
+from uploads.serializers import MediaFileField, MediaImageField, MediaPipelineMixin, SrcsetField, UploadIntentField
 
 # serializer básico comments aninhados (pai/filho)
 class CommentBasicSerializer(serializers.ModelSerializer):
     # dados de User relevantes para comments
     user = UserBasicSerializer(read_only=True)
-    reply_count = serializers.SerializerMethodField(read_only=True)
 
     # image e video são serializados manualmente para retornar URL completa
     image = serializers.SerializerMethodField()
     video = serializers.SerializerMethodField()
 
+    # renditions WebP/JPEG de image (srcset), null até o pipeline de mídia terminar
+    image_srcset = SrcsetField("image")
 
     class Meta:
         # model de comment.py
@@ -24,9 +31,11 @@ class CommentBasicSerializer(serializers.ModelSerializer):
             "user", # somente dados relevantes do autor do comment
             "content",
             "image",
+            "image_srcset",
             "video",
             "created_at",
             "reply_count",
+            "like_count",
         ]
         read_only_fields = fields
 
@@ -38,28 +47,20 @@ class CommentBasicSerializer(serializers.ModelSerializer):
     # Se obj.image | obj.video existir,
     # variável request será igual ao "request" (requisição HTTP atual) 
     # do contexto do serializador (contexto passado pela Viewset)
-    # Se a requisição existir, build_absolute_uri monta URL completa a ser retornada
-    # pelos campos serializados manualmente (image e video)
+    # Se a requisição existir, media_url (uploads/media_urls.py) monta a URL completa
+    # a partir da base do storage em cache (sem storage.url() por campo)
+    # a ser retornada pelos campos serializados manualmente (image e video)
     def get_image(self, obj):
-        if obj.image:
-            request = self.context.get('request')
-            if request is not None:
-                return request.build_absolute_uri(obj.image.url)
+        request = self.context.get('request')
+        if request is not None:
+            return media_url(obj.image, request)
         return None
 
     def get_video(self, obj):
-        if obj.video:
-            request = self.context.get('request')
-            if request is not None:
-                return request.build_absolute_uri(obj.video.url)
+        request = self.context.get('request')
+        if request is not None:
+            return media_url(obj.video, request)
         return None
-    
-    #  REPLY COUNT
-    # função pra obter número de replies de um comment
-    # já vem calculado do banco de dados graças a .annotate(reply_count=Count('comments')) 
-    # criando o field reply_count para cada comment na queryset em comment_viewset.py
-    def get_reply_count(self, obj):
-        return getattr(obj, 'reply_count', 0)
 
 
 
@@ -74,8 +75,22 @@ class RecursiveCommentSerializer(serializers.Serializer):
 
 
 
+# list serializer de CommentSerializer (many=True)
+# com ?expand=viewer_state, calcula hasLiked da página inteira em uma única query
+class CommentListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        comments = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        if comments and expand_requested(self.context, VIEWER_STATE):
+            self.context.setdefault("comment_viewer_state", {}).update(
+                comment_viewer_state(self.context["request"].user, [comment.id for comment in comments])
+            )
+        return super().to_representation(comments)
+
+
+
 # serializer principal pra um comment completo
-class CommentSerializer(serializers.ModelSerializer):
+# MediaPipelineMixin: image/video enviados ao storage fora da requisição (uploads/pipeline.py)
+class CommentSerializer(MediaPipelineMixin, serializers.ModelSerializer):
     # apendas dados de User relevantes para comments
     user = UserBasicSerializer(read_only=True)
 
@@ -88,8 +103,9 @@ class CommentSerializer(serializers.ModelSerializer):
     # campo read-only separado
     post_id = serializers.CharField(source='post.id', read_only=True)
 
+    # user do pai carregado na validação: a resposta do create o serializa sem nova query
     parent_comment = serializers.PrimaryKeyRelatedField(
-        queryset=Comment.objects.all(),
+        queryset=Comment.objects.select_related("user"),
         allow_null=True,
         required=False
     )
@@ -98,11 +114,13 @@ class CommentSerializer(serializers.ModelSerializer):
     # RecursiveCommentSerializer usa apenas os dados relevantes pra serializar a lista
     comments = RecursiveCommentSerializer(many=True, read_only=True)
 
-    image = serializers.ImageField(required=False, allow_null=True)
-    video = serializers.FileField(required=False, allow_null=True)
-    
-    # contagem otimizada de replies
-    reply_count = serializers.SerializerMethodField(read_only=True)
+    image = MediaImageField(required=False, allow_null=True)
+    video = MediaFileField(required=False, allow_null=True)
+    image_srcset = SrcsetField("image")
+
+    # alternativa ao arquivo no corpo: id de um upload direto finalizado (uploads/direct.py)
+    image_upload = UploadIntentField("image")
+    video_upload = UploadIntentField("video")
 
     class Meta:
         model = Comment
@@ -114,23 +132,43 @@ class CommentSerializer(serializers.ModelSerializer):
             "parent_comment",
             "content",
             "image",
+            "image_srcset",
+            "image_upload",
             "video",
+            "video_upload",
             "created_at",
             "comments",
             "reply_count",
+            "like_count",
         ]
         read_only_fields = [
             "id",
             "user",
             "post_id",
             "parent_comment",
+            "image_srcset",
             "created_at",
             "comments",
+            # contadores desnormalizados do model (comments/signals.py, likes/signals.py)
             "reply_count",
+            "like_count",
         ]
+        list_serializer_class = CommentListSerializer
+
+    # profundidade limitada pelo tamanho do materialized path (comments/paths.py)
+    def validate_parent_comment(self, value):
+        if value is not None and value.depth >= MAX_DEPTH:
+            raise serializers.ValidationError("Maximum reply depth reached.")
+        return value
 
     def to_representation(self, instance):
         representation = super().to_representation(instance)
+
+        # ?expand=viewer_state: estado do usuário logado embutido no comment
+        if expand_requested(self.context, VIEWER_STATE):
+            state = get_viewer_state(self.context, "comment_viewer_state", comment_viewer_state, instance)
+            representation["likeCount"] = instance.like_count
+            representation["hasLiked"] = state.get("hasLiked", False)
         
         if instance.parent_comment:
             parent_comment_serializer = CommentBasicSerializer(
@@ -142,10 +180,3 @@ class CommentSerializer(serializers.ModelSerializer):
             representation['parent_comment'] = None
         
         return representation
-
-
-    #  REPLY COUNT
-    # função pra obter número de replies de um comment
-    # se o objeto não foi anotado com Count (na criação), retorna 0.
-    def get_reply_count(self, obj):
-        return getattr(obj, 'reply_count', 0)
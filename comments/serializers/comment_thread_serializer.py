@@ -0,0 +1,47 @@
+# comments/serializers/comment_thread_serializer.py
+
+from urllib.parse import urlencode
+
+from django.urls import reverse
+from rest_framework import serializers
+
+from .comment_serializer import CommentBasicSerializer
+
+
+# nó da subárvore carregada por comments/thread.py (load_thread)
+# replies: filhos já carregados (mesmo formato, recursivo)
+# moreReplies: null, ou cursor/url para continuar as replies desse nó
+class CommentThreadSerializer(CommentBasicSerializer):
+    replies = serializers.SerializerMethodField()
+    more_replies = serializers.SerializerMethodField()
+
+    class Meta(CommentBasicSerializer.Meta):
+        fields = CommentBasicSerializer.Meta.fields + [
+            "parent_comment",
+            "replies",
+            "more_replies",
+        ]
+        read_only_fields = fields
+
+    def get_replies(self, obj):
+        return CommentThreadSerializer(obj.thread_replies, many=True, context=self.context).data
+
+    def get_more_replies(self, obj):
+        if obj.thread_more_cursor is None:
+            return None
+
+        params = {"depth": self.context["thread_depth"], "limit": self.context["thread_limit"]}
+        if obj.thread_more_cursor:
+            params["cursor"] = obj.thread_more_cursor
+        url = f"{reverse('comment-thread', kwargs={'pk': obj.id})}?{urlencode(params)}"
+
+        request = self.context.get("request")
+        return {
+            "cursor": obj.thread_more_cursor or None,
+            "url": request.build_absolute_uri(url) if request is not None else url,
+        }
+
+    def to_representation(self, instance):
+        ret = super().to_representation(instance)
+        ret["moreReplies"] = ret.pop("more_replies")
+        return ret
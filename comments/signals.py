@@ -1,14 +1,52 @@
 # comments/signals.py
 
-import re
-from django.db.models.signals import post_save
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
 from .models import Comment 
-from hashtags.models import Hashtag
+from .paths import set_comment_path
+from hashtags.extraction import resolve_hashtags
+from hashtags.trends import record_hashtag_usage
+from posts.models import Post
+from config.counters import adjust_counter
+from config.tokens import content_changed, content_tokens, mark_content_processed
+
+# MATERIALIZED PATH (comments/paths.py)
+# calculado antes do INSERT: o id (uuid4) já existe na instância
+
+@receiver(pre_save, sender=Comment)
+def fill_comment_path(sender, instance, raw=False, **kwargs):
+    if instance._state.adding and not instance.path and not raw:
+        set_comment_path(instance)
+
+
+@receiver(post_save, sender=Comment)
+def extract_and_save_hashtags_from_comment(sender, instance, created, update_fields=None, **kwargs):
+    # edição sem mudança no texto: nada a reprocessar
+    if not content_changed(instance, created, update_fields):
+        return
+
+    hashtag_names, _ = content_tokens(instance)
+    hashtag_ids = resolve_hashtags(hashtag_names).values()
+
+    # trends: só conta o uso na criação (edição não é um novo uso)
+    if created:
+        record_hashtag_usage(hashtag_ids, instance.created_at)
+
+    mark_content_processed(instance)
+
+
+# CONTADORES
+# comment_count do post conta todos os comments (raiz + replies)
+# reply_count do comment conta apenas as respostas diretas
 
 @receiver(post_save, sender=Comment)
-def extract_and_save_hashtags_from_comment(sender, instance, created, **kwargs):
-    if instance.content:
-        hashtags_found = re.findall(r'#(\w+)', instance.content)
-        for hashtag_name in hashtags_found:
-            Hashtag.objects.get_or_create(name=hashtag_name.lower())
\ No newline at end of file
+def increment_comment_counters(sender, instance, created, **kwargs):
+    if created:
+        adjust_counter(Post, instance.post_id, "comment_count", 1)
+        adjust_counter(Comment, instance.parent_comment_id, "reply_count", 1)
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_counters(sender, instance, **kwargs):
+    adjust_counter(Post, instance.post_id, "comment_count", -1)
+    adjust_counter(Comment, instance.parent_comment_id, "reply_count", -1)
@@ -6,11 +6,16 @@ from django.urls import reverse
 from django.core.files.uploadedfile import SimpleUploadedFile
 from PIL import Image
 import io
+import uuid
+
+from django.core.management import call_command
 
 from accounts.tests.factories import UserFactory
 from posts.tests.factories import PostFactory
 from comments.models import Comment
 from comments.tests.factories import CommentFactory
+from comments.paths import ancestor_ids, count_descendants, path_segment, root_id, subtree
+from likes.models import Like
 
 class CommentTests(APITestCase):
     def setUp(self):
@@ -47,6 +52,23 @@ class CommentTests(APITestCase):
         self.assertEqual(Comment.objects.count(), 3)
         self.assertIsNotNone(response.data.get('parent_comment'))
         self.assertEqual(response.data['parent_comment']['id'], str(self.parent_comment.id))
+
+
+    
+    
+    def test_create_reply_does_not_requery_comment(self):
+        data = {'content': 'My reply.', 'post': self.post.id, 'parent_comment': self.parent_comment.id}
+
+        # validação (post, pai com user) + INSERT + contadores (post, pai)
+        with self.assertNumQueries(5):
+            response = self.client.post(f"{self.posts_comments_url}?expand=viewer_state", data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['user']['id'], str(self.user.id))
+        self.assertEqual(response.data['parent_comment']['user']['id'], str(self.other_user.id))
+        self.assertEqual(response.data['parent_comment']['reply_count'], 2)
+        self.assertEqual(response.data['comments'], [])
+        self.assertEqual(response.data['reply_count'], 0)
+        self.assertFalse(response.data['hasLiked'])
     
     
     def test_create_comment_with_image_successful(self):
@@ -60,7 +82,9 @@ class CommentTests(APITestCase):
         
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertIn('image', response.data)
-        self.assertIsNotNone(response.data['image'])
+        # original ainda no pipeline de mídia: sem URL até chegar ao storage
+        self.assertIsNone(response.data['image'])
+        self.assertTrue(Comment.objects.get(id=response.data['id']).image)
         
     
     
@@ -112,4 +136,194 @@ class CommentTests(APITestCase):
     def test_delete_unauthenticated_user_fails(self):
         self.client.force_authenticate(user=None)
         response = self.client.delete(self.comment_detail_url)
-        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
\ No newline at end of file
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+    
+    
+    def test_comment_counters_follow_create_and_delete(self):
+        self.post.refresh_from_db()
+        self.parent_comment.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 2)
+        self.assertEqual(self.parent_comment.reply_count, 1)
+
+        reply = CommentFactory(user=self.user, post=self.post, parent_comment=self.parent_comment)
+        self.parent_comment.refresh_from_db()
+        self.assertEqual(self.parent_comment.reply_count, 2)
+
+        reply.delete()
+        self.post.refresh_from_db()
+        self.parent_comment.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 2)
+        self.assertEqual(self.parent_comment.reply_count, 1)
+
+    
+    
+    def test_list_comments_with_viewer_state(self):
+        Like.objects.create(user=self.user, comment=self.parent_comment)
+        response = self.client.get(f"{self.posts_comments_url}?expand=viewer_state")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['results'][0]['hasLiked'])
+        self.assertEqual(response.data['results'][0]['likeCount'], 1)
+
+    
+    
+    
+    # Testes de thread (CTE recursiva)
+
+    def _build_thread(self):
+        # parent_comment: 1 reply do setUp + 3 novas (a mais nova por último)
+        replies = list(Comment.objects.filter(parent_comment=self.parent_comment))
+        replies += [
+            CommentFactory(user=self.user, post=self.post, parent_comment=self.parent_comment)
+            for _ in range(3)
+        ]
+        newest = replies[-1]
+        child = CommentFactory(user=self.other_user, post=self.post, parent_comment=newest)
+        grandchild = CommentFactory(user=self.user, post=self.post, parent_comment=child)
+        return replies, child, grandchild
+
+    
+    
+    def test_thread_loads_bounded_subtree_in_one_query(self):
+        replies, child, grandchild = self._build_thread()
+        url = reverse('comment-thread', kwargs={'pk': self.parent_comment.id})
+
+        # path do raiz (pk) + CTE recursiva + autores
+        with self.assertNumQueries(3):
+            response = self.client.get(url, {'depth': 2, 'limit': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        root = response.data
+        self.assertEqual([reply['id'] for reply in root['replies']], [str(replies[3].id), str(replies[2].id)])
+        self.assertIsNotNone(root['moreReplies']['cursor'])
+
+        newest = root['replies'][0]
+        self.assertEqual([reply['id'] for reply in newest['replies']], [str(child.id)])
+        self.assertIsNone(newest['moreReplies'])
+
+        # limite de profundidade: o neto não vem, mas o nó indica que há mais
+        deepest = newest['replies'][0]
+        self.assertEqual(deepest['replies'], [])
+        self.assertIsNone(deepest['moreReplies']['cursor'])
+        self.assertIn(str(child.id), deepest['moreReplies']['url'])
+
+    
+    
+    def test_thread_ranks_only_the_requested_subtree(self):
+        replies, child, grandchild = self._build_thread()
+        url = reverse('comment-thread', kwargs={'pk': replies[3].id})
+
+        response = self.client.get(url, {'depth': 2})
+        self.assertEqual([reply['id'] for reply in response.data['replies']], [str(child.id)])
+        self.assertEqual([reply['id'] for reply in response.data['replies'][0]['replies']], [str(grandchild.id)])
+
+        # reply cujo path está fora do prefixo do raiz não entra no ranking
+        Comment.objects.filter(pk=grandchild.pk).update(path=path_segment(uuid.uuid4()) + path_segment(grandchild.id))
+        response = self.client.get(url, {'depth': 2})
+        self.assertEqual(response.data['replies'][0]['replies'], [])
+
+        # linhas ainda sem path (antes do backfill_comment_paths): post inteiro, como antes
+        Comment.objects.update(path='', depth=0)
+        response = self.client.get(url, {'depth': 2})
+        self.assertEqual([reply['id'] for reply in response.data['replies']], [str(child.id)])
+
+    
+    
+    def test_thread_more_replies_cursor_continues_siblings(self):
+        replies, _, _ = self._build_thread()
+        url = reverse('comment-thread', kwargs={'pk': self.parent_comment.id})
+
+        first = self.client.get(url, {'depth': 1, 'limit': 2}).data
+        response = self.client.get(first['moreReplies']['url'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [reply['id'] for reply in response.data['replies']],
+            [str(replies[1].id), str(replies[0].id)],
+        )
+        self.assertIsNone(response.data['moreReplies'])
+
+    
+    
+    def test_thread_invalid_cursor_and_unknown_comment(self):
+        url = reverse('comment-thread', kwargs={'pk': self.parent_comment.id})
+        response = self.client.get(url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(reverse('comment-thread', kwargs={'pk': uuid.uuid4()}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    
+    
+    
+    # Testes de materialized path
+
+    def test_reply_path_extends_parent_path(self):
+        data = {'content': 'My reply.', 'post': self.post.id, 'parent_comment': self.parent_comment.id}
+        response = self.client.post(self.posts_comments_url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        reply = Comment.objects.get(pk=response.data['id'])
+        nested = CommentFactory(user=self.user, post=self.post, parent_comment=reply)
+        self.assertEqual(self.parent_comment.depth, 0)
+        self.assertEqual(reply.depth, 1)
+        self.assertEqual(nested.depth, 2)
+        self.assertTrue(nested.path.startswith(reply.path))
+        self.assertEqual(ancestor_ids(nested), [self.parent_comment.id, reply.id])
+        self.assertEqual(root_id(nested), self.parent_comment.id)
+
+        # raiz + reply do setUp + reply + nested, em uma query de range
+        with self.assertNumQueries(1):
+            self.assertEqual(count_descendants(self.parent_comment), 3)
+
+    
+    
+    def test_delete_comment_removes_subtree(self):
+        my_comment = CommentFactory(user=self.user, post=self.post)
+        reply = CommentFactory(user=self.other_user, post=self.post, parent_comment=my_comment)
+        CommentFactory(user=self.user, post=self.post, parent_comment=reply)
+
+        response = self.client.delete(reverse('comment-detail', kwargs={'pk': my_comment.id}))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(Comment.objects.count(), 2)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 2)
+
+    
+    
+    def test_delete_comment_without_path_only_removes_its_subtree(self):
+        my_comment = CommentFactory(user=self.user, post=self.post)
+        reply = CommentFactory(user=self.other_user, post=self.post, parent_comment=my_comment)
+        # linhas ainda não preenchidas pelo backfill_comment_paths
+        Comment.objects.filter(pk__in=[my_comment.pk, reply.pk]).update(path='', depth=0)
+        total = Comment.objects.count()
+
+        my_comment.refresh_from_db()
+        self.assertEqual(list(subtree(my_comment)), [my_comment])
+        response = self.client.delete(reverse('comment-detail', kwargs={'pk': my_comment.id}))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(Comment.objects.count(), total - 2)
+        self.assertTrue(Comment.objects.filter(pk=self.parent_comment.pk).exists())
+
+    
+    
+    def test_backfill_comment_paths(self):
+        nested = CommentFactory(
+            user=self.user, post=self.post,
+            parent_comment=Comment.objects.get(parent_comment=self.parent_comment),
+        )
+        expected = dict(Comment.objects.values_list('id', 'path'))
+        Comment.objects.update(path='', depth=0)
+
+        call_command('backfill_comment_paths', batch_size=1, stdout=io.StringIO())
+        self.assertEqual(dict(Comment.objects.values_list('id', 'path')), expected)
+        nested.refresh_from_db()
+        self.assertEqual(nested.depth, 2)
+        self.assertEqual(subtree(self.parent_comment).count(), 3)
+
+    
+    
+    def test_reply_beyond_max_depth_fails(self):
+        Comment.objects.filter(pk=self.parent_comment.pk).update(depth=30)
+        data = {'content': 'Too deep.', 'post': self.post.id, 'parent_comment': self.parent_comment.id}
+        response = self.client.post(self.posts_comments_url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
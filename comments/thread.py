@@ -0,0 +1,137 @@
+# comments/thread.py
+
+# carregamento de uma subárvore de comments (/comments/{id}/thread/)
+# path/depth do raiz (busca pela pk) e uma única query com CTE recursiva:
+# - ranked: replies de cada pai numeradas (ROW_NUMBER) das mais recentes
+#   para as mais antigas, restritas à subárvore do comment raiz pelo
+#   materialized path (comments/paths.py) e à profundidade pedida
+#   o prefixo vai como parâmetro literal (LIKE 'prefixo%', como no
+#   path__startswith): range no índice de path, o custo não cresce com o
+#   total de comments do post
+#   (raiz ainda sem path: LIKE '%' cobre o post inteiro, como antes)
+# - thread: desce a partir do raiz até "depth" níveis, seguindo só as
+#   "limit" primeiras replies de cada pai
+# cada pai traz limit + 1 replies: a excedente só indica que há mais
+# (cursor "more replies"), sem COUNT extra
+
+import base64
+import binascii
+
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.db.models import prefetch_related_objects
+from django.utils.dateparse import parse_datetime
+
+from .models import Comment
+
+THREAD_DEFAULT_DEPTH = 3
+THREAD_MAX_DEPTH = 10
+THREAD_DEFAULT_LIMIT = 5
+THREAD_MAX_LIMIT = 50
+
+THREAD_SQL = """
+WITH RECURSIVE ranked AS (
+    SELECT c.id, c.parent_comment_id,
+           ROW_NUMBER() OVER (
+               PARTITION BY c.parent_comment_id
+               ORDER BY c.created_at DESC, c.id DESC
+           ) AS rn
+    FROM comments_comment c
+    WHERE c.post_id = %s
+      AND c.path {path_startswith}
+      AND c.depth <= %s
+      AND c.parent_comment_id IS NOT NULL
+      {cursor_condition}
+),
+thread AS (
+    SELECT id, 0 AS depth, CAST(1 AS BIGINT) AS rn FROM comments_comment WHERE id = %s
+    UNION ALL
+    SELECT r.id, t.depth + 1, r.rn
+    FROM ranked r JOIN thread t ON r.parent_comment_id = t.id
+    WHERE t.depth < %s AND t.rn <= %s AND r.rn <= %s
+)
+SELECT c.*, thread.depth AS thread_depth, thread.rn AS thread_rn
+FROM thread JOIN comments_comment c ON c.id = thread.id
+ORDER BY thread.depth, thread.rn
+"""
+
+# cursor: só as replies do raiz mais antigas que a última já carregada
+CURSOR_CONDITION = """
+      AND (c.parent_comment_id != %s OR c.created_at < %s
+           OR (c.created_at = %s AND c.id < %s))
+"""
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(comment):
+    raw = f"{comment.created_at.isoformat()}|{comment.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        created_at, comment_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        created_at = parse_datetime(created_at)
+        comment_id = Comment._meta.pk.to_python(comment_id)
+    except (binascii.Error, ValueError, ValidationError) as e:
+        raise InvalidCursor(str(e))
+    if created_at is None:
+        raise InvalidCursor("invalid timestamp")
+    return created_at, comment_id
+
+
+# retorna o comment raiz com a subárvore em memória, ou None
+# cada nó recebe:
+# - thread_replies: replies carregadas (mais recentes primeiro)
+# - thread_more_cursor: None quando não há mais replies;
+#   "" para começar do início (nó no limite de profundidade);
+#   cursor da última reply carregada caso contrário
+def load_thread(root_id, depth, limit, cursor=None):
+    try:
+        post_id, path, root_depth = Comment.objects.values_list("post_id", "path", "depth").get(pk=root_id)
+    except Comment.DoesNotExist:
+        return None
+
+    pk = Comment._meta.pk
+    root_param = pk.get_db_prep_value(root_id, connection)
+    post_param = Comment._meta.get_field("post").get_db_prep_value(post_id, connection)
+    path_pattern = connection.ops.prep_for_like_query(path) + "%"
+
+    cursor_condition, cursor_params = "", []
+    if cursor is not None:
+        created_at, comment_id = cursor
+        created_at = connection.ops.adapt_datetimefield_value(created_at)
+        cursor_condition = CURSOR_CONDITION
+        cursor_params = [root_param, created_at, created_at, pk.get_db_prep_value(comment_id, connection)]
+
+    nodes = list(Comment.objects.raw(
+        THREAD_SQL.format(
+            path_startswith=connection.operators["startswith"], cursor_condition=cursor_condition,
+        ),
+        [post_param, path_pattern, root_depth + depth, *cursor_params, root_param, depth, limit, limit + 1],
+    ))
+    if not nodes:
+        return None
+
+    prefetch_related_objects(nodes, "user")
+
+    by_id = {node.id: node for node in nodes}
+    for node in nodes:
+        node.thread_replies = []
+        node.thread_more_cursor = None
+    for node in nodes[1:]:
+        parent = by_id[node.parent_comment_id]
+        if node.thread_rn <= limit:
+            parent.thread_replies.append(node)
+        else:
+            # reply excedente: existe mais depois da última carregada
+            parent.thread_more_cursor = encode_cursor(parent.thread_replies[-1])
+
+    for node in nodes:
+        if node.thread_depth == depth and node.reply_count:
+            node.thread_more_cursor = ""
+
+    return nodes[0]
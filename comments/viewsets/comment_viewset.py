@@ -13,23 +13,25 @@ from rest_framework.response import Response
 # status: retorno código de status HTTP
 from rest_framework import status
 
-# Count: função de agregação do Django, contagem de valores direto no db
-# usando na queryset com .annotate() para adicionar um field calculado ("comments")
-from django.db.models import Count
-
 from ..models import Comment
-from ..serializers import CommentSerializer
+from ..serializers import CommentSerializer, CommentThreadSerializer
+from ..thread import (
+    THREAD_DEFAULT_DEPTH, THREAD_MAX_DEPTH, THREAD_DEFAULT_LIMIT, THREAD_MAX_LIMIT,
+    InvalidCursor, decode_cursor, load_thread,
+)
 from ..pagination import CommentCursorPagination
+from ..paths import delete_subtree
 
 from rest_framework.permissions import IsAuthenticated
 
-from storages.backends.s3boto3 import S3Boto3Storage
+from uploads.handlers import StreamingUploadMixin
 
 # ModelViewsSet: 
 # operações básicas para gerenciamento de model já embutidas (CRUD)
 # (list, retrieve, create, update, destroy)
 # criação automática de rotas
-class CommentViewSet(ModelViewSet):
+# StreamingUploadMixin: image/video do multipart gravados em disco em blocos (uploads/handlers.py)
+class CommentViewSet(StreamingUploadMixin, ModelViewSet):
     # consulta principal ao db
     # select_related(): carrega dados relacionados na mesma consulta (via JOIN no SQL)
     # prefetch_related: pré-carrega vários dados relacionados a cada objeto principal
@@ -45,9 +47,7 @@ class CommentViewSet(ModelViewSet):
         # prefetch_related: prefetch para comments filhos e seus usuários
         .prefetch_related("comments", "comments__user")
         
-        # Count calcula reply_count no nível do db
-        .annotate(reply_count=Count('comments'))
-        
+        # reply_count e like_count são colunas desnormalizadas de Comment
         .order_by('-created_at')
     )
 
@@ -92,23 +92,20 @@ class CommentViewSet(ModelViewSet):
     # user: autor do comment => usuário autenticado
     def perform_create(self, serializer):
         try:
-            # dados validados do serializador
-            validated_data = serializer.validated_data
-
-            # processamento da imagem e vídeo antes do save
-            image_file = validated_data.get('image')
-            if image_file:
-                image_file.storage = S3Boto3Storage(default_acl='public-read')
-            
-            video_file = validated_data.get('video')
-            if video_file:
-                video_file.storage = S3Boto3Storage(default_acl='public-read')
-            
-            # save o comment com o usuário e os arquivos
-            serializer.save(user=self.request.user)
-
-            # .annotate reply_count
-            serializer.instance = self.get_queryset().get(pk=serializer.instance.pk)
+            # save o comment com o usuário
+            # imagem e vídeo: gravados em disco local e enviados ao storage
+            # pelo pipeline de mídia (CommentSerializer/MediaPipelineMixin)
+            comment = serializer.save(user=self.request.user)
+
+            # resposta montada com a instância em memória, sem recarregar a queryset:
+            # - user é o request.user; post e parent_comment (com user) vêm da validação
+            # - comment novo não tem replies (cache de prefetch vazio) nem likes
+            # - reply_count/like_count: defaults 0 do model
+            comment._prefetched_objects_cache = {"comments": Comment.objects.none()}
+            serializer.context.setdefault("comment_viewer_state", {})[comment.id] = {"hasLiked": False}
+            # reply_count do pai já incrementado no db pelo signal
+            if comment.parent_comment is not None:
+                comment.parent_comment.reply_count += 1
             print("INFO: Comment e arquivos salvos com sucesso!")
 
         except Exception as e:
@@ -128,6 +125,10 @@ class CommentViewSet(ModelViewSet):
             )
         return super().destroy(request, *args, **kwargs)
 
+    # remove o comment e as replies por range do materialized path
+    def perform_destroy(self, instance):
+        delete_subtree(instance)
+
 
     # sobrescrição da função retrieve (ver um comment específico)
     # self: CommentViewSet
@@ -155,4 +156,38 @@ class CommentViewSet(ModelViewSet):
             return self.get_paginated_response(serializer.data)
         
         serializer = self.get_serializer(queryset, many=True, context={"request": request})
-        return Response(serializer.data)
\ No newline at end of file
+        return Response(serializer.data)
+
+
+    # THREAD: subárvore de um comment
+    # GET /comments/{id}/thread/?depth=3&limit=5&cursor=...
+    # depth: níveis de replies abaixo do comment; limit: replies por pai
+    # uma query (CTE recursiva, comments/thread.py) + uma para os autores
+    # cursor (moreReplies de um nó): continua as replies do comment {id}
+    @action(detail=True, methods=["get"])
+    def thread(self, request, pk=None):
+        depth = _bounded_int(request.query_params.get("depth"), THREAD_DEFAULT_DEPTH, THREAD_MAX_DEPTH)
+        limit = _bounded_int(request.query_params.get("limit"), THREAD_DEFAULT_LIMIT, THREAD_MAX_LIMIT)
+
+        cursor = request.query_params.get("cursor")
+        try:
+            cursor = decode_cursor(cursor) if cursor else None
+        except InvalidCursor:
+            return Response({"detail": "Invalid cursor."}, status=status.HTTP_400_BAD_REQUEST)
+
+        root = load_thread(pk, depth, limit, cursor)
+        if root is None:
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        context = {"request": request, "thread_depth": depth, "thread_limit": limit}
+        return Response(CommentThreadSerializer(root, context=context).data)
+
+
+# inteiro positivo da query string, com default e teto
+def _bounded_int(value, default, maximum):
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        return default
+    return min(value, maximum) if value > 0 else default
+
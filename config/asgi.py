@@ -5,6 +5,12 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+Serves the same URLconf as config.wsgi and is the entry point used in
+production (uvicorn, see the Dockerfile). Long-lived async endpoints
+(notifications/stream/) need it: a sync WSGI worker would stay blocked for
+the whole life of each stream. Sync views still run one at a time per
+worker process, as under gunicorn's sync workers.
 """
 
 import os
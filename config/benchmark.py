@@ -0,0 +1,247 @@
+# config/benchmark.py
+
+# benchmark HTTP in-process dos endpoints quentes (manage.py bench)
+# - seed_bench_data: dataset pelo ORM (signals preenchem contadores,
+#   timelines, paths e notificações como em produção)
+# - build_plan: sequência determinística (seed) de iterações; cada iteração
+#   é uma lista de passos executados em ordem pelo mesmo worker
+#   (like -> unlike, follow -> unfollow), então o estado não cresce
+# - run_plan: workers em threads, cada um com seu APIClient e sua conexão;
+#   latência e queries medidas por requisição
+# - summarize: p50/p95/p99, throughput e queries por requisição, arredondados
+#   para que o JSON seja comparável (diff) entre commits
+
+import math
+import queue
+import random
+import statistics
+import threading
+import time
+from typing import NamedTuple
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import close_old_connections, connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from comments.models import Comment
+from follows.models import Follow
+from likes.models import Like
+from posts.models import Post
+
+User = get_user_model()
+
+BENCH_PASSWORD = "bench-password"
+
+# IP fora de INTERNAL_IPS: o debug toolbar (DEBUG=True) não instrumenta as requisições
+BENCH_REMOTE_ADDR = "203.0.113.10"
+
+# outbox: a requisição só grava a intenção, sem workers em background
+# disputando o banco durante a medição (resultado reprodutível)
+BENCH_NOTIFICATIONS_BACKEND = "notifications.pipeline.OutboxBackend"
+
+
+class Step(NamedTuple):
+    label: str
+    method: str
+    path: str
+    user_id: object
+    data: dict = None
+
+
+# CENÁRIOS
+# cada cenário: função (rng, dataset) -> lista de passos de uma iteração
+
+def _feed(rng, dataset):
+    return [Step("feed", "get", "/api/posts/", rng.choice(dataset["users"]))]
+
+
+def _following_feed(rng, dataset):
+    return [Step("following_feed", "get", "/api/posts/following/", rng.choice(dataset["users"]))]
+
+
+def _comments(rng, dataset):
+    post_id = rng.choice(dataset["posts"])
+    return [Step("comments", "get", f"/api/posts/{post_id}/comments/", rng.choice(dataset["users"]))]
+
+
+def _notifications(rng, dataset):
+    return [Step("notifications", "get", "/api/notifications/", rng.choice(dataset["users"]))]
+
+
+def _like_unlike(rng, dataset):
+    user_id, data = rng.choice(dataset["users"]), {"postId": str(rng.choice(dataset["posts"]))}
+    return [
+        Step("like", "post", "/api/likes/posts/", user_id, data),
+        Step("unlike", "delete", "/api/likes/posts/unlike/", user_id, data),
+    ]
+
+
+def _follow_unfollow(rng, dataset):
+    user_id, target_id = rng.sample(dataset["users"], 2)
+    data = {"targetUserId": str(target_id)}
+    return [
+        Step("follow", "post", "/api/follows/follow/", user_id, data),
+        Step("unfollow", "delete", "/api/follows/unfollow/", user_id, data),
+    ]
+
+
+SCENARIOS = {
+    "feed": _feed,
+    "following_feed": _following_feed,
+    "comments": _comments,
+    "notifications": _notifications,
+    "like_unlike": _like_unlike,
+    "follow_unfollow": _follow_unfollow,
+}
+
+
+# DATASET
+
+# cria o dataset pelo ORM, com um único hash de senha para todos os usuários
+# notificações processadas inline (sem fila em background durante o seed)
+# retorna {"users": [ids], "posts": [ids]}
+def seed_bench_data(users, posts_per_user, follows_per_user, comments_per_post, likes_per_user, seed=0):
+    rng = random.Random(seed)
+    password = make_password(BENCH_PASSWORD)
+
+    with override_settings(NOTIFICATIONS_BACKEND="notifications.pipeline.InlineBackend"), transaction.atomic():
+        authors = User.objects.bulk_create([
+            User(username=f"bench{i}", email=f"bench{i}@example.com", password=password)
+            for i in range(users)
+        ])
+
+        # follows antes dos posts: as timelines são preenchidas pelo fan-out
+        for author in authors:
+            for following in rng.sample(authors, min(follows_per_user + 1, users)):
+                if following is not author:
+                    Follow.objects.get_or_create(follower=author, following=following)
+
+        posts = [
+            Post.objects.create(user=author, content=f"bench post {i} by @{author.username} #bench{i % 10}")
+            for author in authors
+            for i in range(posts_per_user)
+        ]
+
+        for post in posts:
+            parent = None
+            for _ in range(comments_per_post):
+                parent = Comment.objects.create(
+                    user=rng.choice(authors), post=post, parent_comment=parent,
+                    content=f"bench reply to @{post.user.username}",
+                )
+
+        for author in authors:
+            for post in rng.sample(posts, min(likes_per_user, len(posts))):
+                Like.objects.get_or_create(user=author, post=post)
+
+    return {"users": [author.id for author in authors], "posts": [post.id for post in posts]}
+
+
+# dataset já existente (--keepdb ou banco atual)
+def load_bench_data():
+    return {
+        "users": list(User.objects.order_by("username").values_list("id", flat=True)),
+        "posts": list(Post.objects.order_by("created_at", "id").values_list("id", flat=True)),
+    }
+
+
+# EXECUÇÃO
+
+def build_plan(scenario, dataset, iterations, seed=0):
+    rng = random.Random(f"{seed}:{scenario}")
+    return [SCENARIOS[scenario](rng, dataset) for _ in range(iterations)]
+
+
+# executa o plano com `concurrency` workers
+# retorna ({label: [(latência em segundos, queries, status)]}, tempo total)
+def run_plan(plan, concurrency=1):
+    tokens = {
+        user_id: f"Bearer {AccessToken.for_user(User(id=user_id))}"
+        for user_id in {step.user_id for iteration in plan for step in iteration}
+    }
+
+    iterations = queue.Queue()
+    for iteration in plan:
+        iterations.put(iteration)
+
+    results, lock = {}, threading.Lock()
+
+    def work():
+        client = _client()
+        try:
+            while True:
+                try:
+                    iteration = iterations.get_nowait()
+                except queue.Empty:
+                    return
+                for step in iteration:
+                    sample = _request(client, step, tokens[step.user_id])
+                    with lock:
+                        results.setdefault(step.label, []).append(sample)
+        finally:
+            # conexão própria da thread
+            close_old_connections()
+            connection.close()
+
+    started = time.perf_counter()
+    if concurrency <= 1:
+        # thread atual: mesma conexão do chamador (banco de teste em memória)
+        client = _client()
+        for iteration in plan:
+            for step in iteration:
+                results.setdefault(step.label, []).append(_request(client, step, tokens[step.user_id]))
+    else:
+        workers = [threading.Thread(target=work, name=f"bench-{i}") for i in range(concurrency)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+    return results, time.perf_counter() - started
+
+
+# erro 5xx vira amostra com status (não exceção)
+def _client():
+    return APIClient(REMOTE_ADDR=BENCH_REMOTE_ADDR, raise_request_exception=False)
+
+
+def _request(client, step, token):
+    # queries_log é um deque limitado: cheio, o CaptureQueriesContext não vê nada
+    connection.queries_log.clear()
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        response = getattr(client, step.method)(
+            step.path, step.data, format="json" if step.data else None, HTTP_AUTHORIZATION=token,
+        )
+        elapsed = time.perf_counter() - started
+    return elapsed, len(queries), response.status_code
+
+
+# RELATÓRIO
+
+def percentile(values, fraction):
+    # nearest-rank: valor observado, estável entre execuções
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def summarize(samples, elapsed):
+    latencies = [latency * 1000 for latency, _, _ in samples]
+    query_counts = [queries for _, queries, _ in samples]
+    return {
+        "requests": len(samples),
+        "errors": sum(1 for _, _, status in samples if status >= 400),
+        "throughput_rps": round(len(samples) / elapsed, 1) if elapsed else None,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 0.50), 2),
+            "p95": round(percentile(latencies, 0.95), 2),
+            "p99": round(percentile(latencies, 0.99), 2),
+            "max": round(max(latencies), 2),
+        },
+        "queries_per_request": {
+            "mean": round(statistics.fmean(query_counts), 2),
+            "max": max(query_counts),
+        },
+    }
@@ -0,0 +1,29 @@
+# config/counters.py
+
+# contadores desnormalizados (like_count, comment_count, reply_count, retweet_count)
+# mantidos via UPDATE atômico com F(), sem read-modify-write em Python
+
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+
+# soma delta ao contador do objeto pk (nunca abaixo de 0)
+# model: Post | Comment
+# field: nome da coluna do contador
+def adjust_counter(model, pk, field, delta):
+    if pk is None:
+        return
+    model.objects.filter(pk=pk).update(**{field: Greatest(F(field) + delta, 0)})
+
+
+# subquery com a contagem real de linhas de queryset que apontam para OuterRef('pk')
+# usado na reconciliação dos contadores (drift repair)
+def count_subquery(queryset, field):
+    counts = (
+        queryset.filter(**{field: OuterRef("pk")})
+        .order_by()
+        .values(field)
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    return Coalesce(Subquery(counts), 0)
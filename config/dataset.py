@@ -0,0 +1,432 @@
+# config/dataset.py
+
+# gerador de datasets sintéticos para testes de performance (manage.py generate_dataset)
+# - INSERT em lotes (ou COPY no PostgreSQL), sem signals: tudo o que os
+#   signals manteriam é calculado aqui, em memória, antes do INSERT:
+#   contadores (like/comment/reply), path/depth dos comments, timelines
+#   (fan-out), PostHashtag, índice de busca, buckets/score de trends,
+#   notificações e unread_count
+# - um único hash de senha reaproveitado por todos os usuários
+# - distribuições de cauda longa: popularidade (Zipf) de quem é seguido,
+#   de quem posta e das hashtags; quantidade de follows/likes/comments
+#   por Pareto (poucos com muito, muitos com pouco)
+# - posts gerados em lotes de chunk_size; comments, likes e notificações de
+#   cada lote são gerados junto, então a memória não cresce com o volume
+
+import csv
+import io
+import json
+import math
+import random
+from array import array
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.db import connection, models, transaction
+from django.db.models.constants import OnConflict
+from django.utils import timezone
+
+from comments.models import Comment
+from comments.paths import MAX_DEPTH, path_segment
+from follows.models import Follow
+from hashtags.models import Hashtag, HashtagUsageBucket
+from hashtags.trends import TRENDS_CACHE_KEY, _log_weight, minute_bucket
+from likes.models import Like
+from notifications.models import Notification, NotificationState
+from posts.models import Post, PostHashtag, PostSearchTerm, TimelineEntry
+from posts.search import search_terms
+from posts.timeline import HIGH_FANOUT_AUTHORS_CACHE_KEY
+
+User = get_user_model()
+
+DATASET_PASSWORD = "dataset-password"
+
+# expoente da Zipf de popularidade (1.0: o 1º tem o dobro do 2º, o triplo do 3º...)
+POPULARITY_EXPONENT = 1.0
+
+# fração de posts com hashtags / com menção a outro usuário
+HASHTAG_RATIO = 0.3
+MENTION_RATIO = 0.2
+
+WORDS = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor "
+    "incididunt ut labore et dolore magna aliqua enim ad minim veniam quis nostrud "
+    "exercitation ullamco laboris nisi aliquip ex ea commodo consequat"
+).split()
+
+
+# pesos acumulados de uma Zipf sobre n posições (para rng.choices)
+def zipf_cum_weights(n, exponent=POPULARITY_EXPONENT):
+    total, weights = 0.0, []
+    for rank in range(1, n + 1):
+        total += rank ** -exponent
+        weights.append(total)
+    return weights
+
+
+# inteiro >= 0 com média ~mean e cauda longa (Pareto alfa=2), limitado a cap
+def heavy_tailed(rng, mean, cap):
+    if mean <= 0 or cap <= 0:
+        return 0
+    return min(int(mean * rng.paretovariate(2.0) / 2.0), cap)
+
+
+# escrita em lote: COPY (PostgreSQL, copy=True) ou INSERT em lotes
+def insert_rows(model, objs, batch_size, copy=False):
+    if not objs:
+        return 0
+    if copy and connection.vendor == "postgresql":
+        _copy_rows(model, objs)
+    else:
+        bulk_insert(model, objs, batch_size)
+    return len(objs)
+
+
+# bulk_create sem pre_save (raw, como no loaddata): auto_now_add não
+# sobrescreve as datas geradas, sem alterar os fields do model (estado do
+# processo inteiro, visto por qualquer outra thread que salve esses models)
+# pk auto-incremento não é devolvido (lido de volta quando preciso)
+def bulk_insert(model, objs, batch_size, ignore_conflicts=False):
+    opts = model._meta
+    fields = [field for field in opts.concrete_fields if not field.generated and field is not opts.auto_field]
+    batch_size = min(batch_size, max(connection.ops.bulk_batch_size(fields, objs), 1))
+    on_conflict = OnConflict.IGNORE if ignore_conflicts else None
+    with transaction.atomic(savepoint=False):
+        for offset in range(0, len(objs), batch_size):
+            model._base_manager._insert(
+                objs[offset:offset + batch_size], fields=fields, raw=True, on_conflict=on_conflict,
+            )
+
+
+def _copy_rows(model, objs):
+    fields = model._meta.concrete_fields
+    buffer = io.StringIO()
+    # QUOTE_NONNUMERIC: None vira campo vazio sem aspas (NULL no COPY csv)
+    # e string vazia vira "" (texto vazio)
+    writer = csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC)
+    for obj in objs:
+        writer.writerow([_copy_value(field, getattr(obj, field.attname)) for field in fields])
+    buffer.seek(0)
+
+    columns = ", ".join(connection.ops.quote_name(field.column) for field in fields)
+    sql = f"COPY {connection.ops.quote_name(model._meta.db_table)} ({columns}) FROM STDIN WITH (FORMAT csv)"
+    with connection.cursor() as cursor:
+        raw = cursor.cursor
+        if hasattr(raw, "copy_expert"):
+            # psycopg2
+            raw.copy_expert(sql, buffer)
+        else:
+            # psycopg 3
+            with raw.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+
+
+def _copy_value(field, value):
+    # JSONField: o adaptador do driver não serve para o csv
+    if isinstance(field, models.JSONField):
+        return json.dumps(value)
+    return field.get_db_prep_save(value, connection)
+
+
+class DatasetGenerator:
+    def __init__(
+        self, users, follows_per_user, posts_per_user, comments_per_post, likes_per_post,
+        hashtags, days=30, prefix="user", chunk_size=5000, copy=False, notifications=True,
+        timelines=True, seed=0, log=None,
+    ):
+        self.users = users
+        self.follows_per_user = follows_per_user
+        self.posts_per_user = posts_per_user
+        self.comments_per_post = comments_per_post
+        self.likes_per_post = likes_per_post
+        self.hashtags = hashtags
+        self.days = days
+        self.prefix = prefix
+        self.chunk_size = chunk_size
+        self.copy = copy
+        self.notifications = notifications
+        self.timelines = timelines
+        self.log = log or (lambda message: None)
+
+        self.rng = random.Random(seed)
+        self.now = timezone.now()
+        self.start = self.now - timedelta(days=days)
+        self.rows = Counter()
+
+        self.user_ids = []
+        # seguidores de cada usuário (índices), para fan-out e notificações
+        self.followers = []
+        self.unread = Counter()
+        self.hashtag_ids = []
+        self.hashtag_names = []
+        # trends: usos por (hashtag, minuto) dentro da janela e score em escala log
+        self.usage = Counter()
+        self.trend_scores = {}
+
+    # ponto de entrada: gera tudo e retorna {tabela: linhas}
+    def generate(self):
+        self._generate_users()
+        self._generate_follows()
+        self._generate_hashtags()
+        self._generate_posts()
+        self._finish()
+        return dict(self.rows)
+
+    def _insert(self, model, objs):
+        self.rows[model._meta.db_table] += insert_rows(model, objs, self.chunk_size, self.copy)
+
+    def _random_moment(self, after=None):
+        after = after or self.start
+        return after + (self.now - after) * self.rng.random()
+
+    def _chunks(self, total):
+        for offset in range(0, total, self.chunk_size):
+            yield range(offset, min(offset + self.chunk_size, total))
+
+    # USERS
+
+    def _generate_users(self):
+        password = make_password(DATASET_PASSWORD)
+        for chunk in self._chunks(self.users):
+            users = [
+                User(
+                    username=f"{self.prefix}{i}",
+                    email=f"{self.prefix}{i}@example.com",
+                    password=password,
+                    first_name=self.rng.choice(WORDS).title(),
+                    last_name=self.rng.choice(WORDS).title(),
+                    joined_at=self.start,
+                )
+                for i in chunk
+            ]
+            with transaction.atomic():
+                self._insert(User, users)
+            self.user_ids.extend(user.id for user in users)
+        self.followers = [array("I") for _ in range(self.users)]
+        self.log(f"{self.users} users")
+
+        # posição na Zipf embaralhada entre os usuários, independente para
+        # popularidade (quem é seguido/mencionado) e atividade (quem posta)
+        self.user_weights = zipf_cum_weights(self.users)
+        self.popular = list(range(self.users))
+        self.rng.shuffle(self.popular)
+        self.active = list(range(self.users))
+        self.rng.shuffle(self.active)
+
+    def _popular_users(self, k):
+        return self.rng.choices(self.popular, cum_weights=self.user_weights, k=k)
+
+    def _active_users(self, k):
+        return self.rng.choices(self.active, cum_weights=self.user_weights, k=k)
+
+    # FOLLOWS (grau de saída Pareto, alvo por popularidade)
+
+    def _generate_follows(self):
+        for chunk in self._chunks(self.users):
+            follows, notifications = [], []
+            for follower in chunk:
+                wanted = heavy_tailed(self.rng, self.follows_per_user, self.users - 1)
+                targets = {target for target in self._popular_users(wanted) if target != follower}
+                for target in targets:
+                    created_at = self._random_moment()
+                    follows.append(Follow(
+                        follower_id=self.user_ids[follower],
+                        following_id=self.user_ids[target],
+                        created_at=created_at,
+                    ))
+                    self.followers[target].append(follower)
+                    notifications.append(self._notification(Notification.FOLLOW, follower, target, None, created_at))
+
+            with transaction.atomic():
+                self._insert(Follow, follows)
+                self._insert_notifications(notifications)
+        self.log(f"{self.rows[Follow._meta.db_table]} follows")
+
+    # HASHTAGS
+
+    def _generate_hashtags(self):
+        hashtags = [Hashtag(name=f"tag{i}", created_at=self.start) for i in range(self.hashtags)]
+        # hashtags já existentes (datasets anteriores) são reaproveitadas
+        bulk_insert(Hashtag, hashtags, self.chunk_size, ignore_conflicts=True)
+        self.rows[Hashtag._meta.db_table] += len(hashtags)
+        # ids lidos de volta: o INSERT em lote não devolve o pk auto-incremento
+        ids = dict(Hashtag.objects.filter(name__in=[hashtag.name for hashtag in hashtags]).values_list("name", "id"))
+        self.hashtag_names = [hashtag.name for hashtag in hashtags]
+        self.hashtag_ids = [ids[name] for name in self.hashtag_names]
+        self.hashtag_weights = zipf_cum_weights(len(hashtags)) if hashtags else []
+
+    # POSTS + comments, likes, hashtags, busca, timelines e notificações do lote
+
+    def _generate_posts(self):
+        total = self.users * self.posts_per_user
+        fanout_limit = settings.TIMELINE_FANOUT_MAX_FOLLOWERS
+        trends_start = self.now - timedelta(seconds=settings.HASHTAG_TRENDS_WINDOW_SECONDS)
+        index_search = connection.vendor != "postgresql"
+
+        for chunk in self._chunks(total):
+            batch = {model: [] for model in (Post, PostHashtag, PostSearchTerm, Comment, Like, TimelineEntry)}
+            notifications = []
+
+            for author in self._active_users(len(chunk)):
+                post, hashtags, mentioned = self._post(author)
+                batch[Post].append(post)
+
+                for hashtag in hashtags:
+                    batch[PostHashtag].append(PostHashtag(
+                        post_id=post.id, hashtag_id=self.hashtag_ids[hashtag], created_at=post.created_at,
+                    ))
+                    self._record_usage(hashtag, post.created_at, trends_start)
+
+                if index_search:
+                    batch[PostSearchTerm].extend(
+                        PostSearchTerm(post_id=post.id, term=term[:100], weight=weight)
+                        for term, weight in Counter(search_terms(post.content)).items()
+                    )
+
+                if mentioned is not None and mentioned != author:
+                    notifications.append(self._notification(
+                        Notification.MENTION, author, mentioned, post.id, post.created_at, post.id,
+                    ))
+
+                comments = self._comments(post, author, notifications)
+                batch[Comment].extend(comments)
+                batch[Like].extend(self._likes(post, author, notifications))
+
+                if self.timelines and len(self.followers[author]) <= fanout_limit:
+                    batch[TimelineEntry].extend(
+                        TimelineEntry(
+                            owner_id=self.user_ids[follower], post_id=post.id,
+                            author_id=post.user_id, created_at=post.created_at,
+                        )
+                        for follower in self.followers[author]
+                    )
+
+            # pais antes dos filhos (comments em ordem de criação)
+            with transaction.atomic():
+                for model, objs in batch.items():
+                    self._insert(model, objs)
+                self._insert_notifications(notifications)
+            self.log(f"{min(chunk.stop, total)}/{total} posts")
+
+    # retorna (post, índices das hashtags, índice do usuário mencionado ou None)
+    def _post(self, author):
+        rng = self.rng
+        words = [rng.choice(WORDS) for _ in range(rng.randint(4, 20))]
+
+        hashtags, mentioned = set(), None
+        if self.hashtag_ids and rng.random() < HASHTAG_RATIO:
+            hashtags = set(rng.choices(
+                range(len(self.hashtag_ids)), cum_weights=self.hashtag_weights, k=rng.randint(1, 2),
+            ))
+            words.extend(f"#{self.hashtag_names[hashtag]}" for hashtag in sorted(hashtags))
+
+        if rng.random() < MENTION_RATIO:
+            mentioned = self._popular_users(1)[0]
+            words.append(f"@{self.prefix}{mentioned}")
+
+        post = Post(user_id=self.user_ids[author], content=" ".join(words), created_at=self._random_moment())
+        return post, hashtags, mentioned
+
+    # árvore de comments do post: cada comment responde ao post ou a um comment anterior
+    def _comments(self, post, author, notifications):
+        rng = self.rng
+        comments = []
+        for _ in range(heavy_tailed(rng, self.comments_per_post, 10 * self.comments_per_post + 10)):
+            commenter = rng.randrange(self.users)
+            parent = rng.choice(comments) if comments and rng.random() < 0.5 else None
+            if parent is not None and parent.depth >= MAX_DEPTH:
+                parent = None
+
+            comment = Comment(
+                post_id=post.id,
+                user_id=self.user_ids[commenter],
+                parent_comment_id=parent.id if parent else None,
+                content=" ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 12))),
+                created_at=self._random_moment(parent.created_at if parent else post.created_at),
+            )
+            comment.path = (parent.path if parent else "") + path_segment(comment.id)
+            comment.depth = parent.depth + 1 if parent else 0
+            if parent is not None:
+                parent.reply_count += 1
+            post.comment_count += 1
+            comments.append(comment)
+
+            # mesma regra do pipeline: notificação de comment vai para o autor do post
+            if commenter != author:
+                notifications.append(self._notification(
+                    Notification.COMMENT, commenter, author, post.id, comment.created_at,
+                ))
+        return comments
+
+    def _likes(self, post, author, notifications):
+        count = heavy_tailed(self.rng, self.likes_per_post, self.users)
+        likes = []
+        for liker in self.rng.sample(range(self.users), count):
+            created_at = self._random_moment(post.created_at)
+            likes.append(Like(user_id=self.user_ids[liker], post_id=post.id, created_at=created_at))
+            if liker != author:
+                notifications.append(self._notification(Notification.LIKE, liker, author, post.id, created_at))
+        post.like_count = len(likes)
+        return likes
+
+    # NOTIFICAÇÕES
+
+    def _notification(self, notification_type, from_user, to_user, post_id, timestamp, object_id=None):
+        return (notification_type, from_user, to_user, post_id, object_id or post_id, timestamp)
+
+    def _insert_notifications(self, rows):
+        if not self.notifications:
+            return
+        for _, _, to_user, _, _, _ in rows:
+            self.unread[to_user] += 1
+        self._insert(Notification, [
+            Notification(
+                type=notification_type,
+                from_user_id=self.user_ids[from_user],
+                to_user_id=self.user_ids[to_user],
+                target_post_id=post_id,
+                target_object_id=object_id,
+                timestamp=timestamp,
+            )
+            for notification_type, from_user, to_user, post_id, object_id, timestamp in rows
+        ])
+
+    # TRENDS (mesma escala log de hashtags/trends.py)
+
+    def _record_usage(self, hashtag, moment, trends_start):
+        if moment >= trends_start:
+            self.usage[(hashtag, minute_bucket(moment))] += 1
+        weight = _log_weight(moment)
+        current = self.trend_scores.get(hashtag)
+        self.trend_scores[hashtag] = weight if current is None else (
+            max(current, weight) + math.log1p(math.exp(-abs(current - weight)))
+        )
+
+    # dados agregados do dataset inteiro
+    def _finish(self):
+        with transaction.atomic():
+            self._insert(HashtagUsageBucket, [
+                HashtagUsageBucket(hashtag_id=self.hashtag_ids[hashtag], bucket=bucket, count=count)
+                for (hashtag, bucket), count in self.usage.items()
+            ])
+            Hashtag.objects.bulk_update(
+                [
+                    Hashtag(id=self.hashtag_ids[hashtag], trend_score=score)
+                    for hashtag, score in self.trend_scores.items()
+                ],
+                ["trend_score"],
+                batch_size=self.chunk_size,
+            )
+            if self.notifications:
+                for chunk in self._chunks(self.users):
+                    self._insert(NotificationState, [
+                        NotificationState(user_id=self.user_ids[user], unread_count=self.unread[user])
+                        for user in chunk
+                    ])
+
+        # snapshots derivados dos dados antigos
+        cache.delete_many([TRENDS_CACHE_KEY, HIGH_FANOUT_AUTHORS_CACHE_KEY])
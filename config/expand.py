@@ -0,0 +1,12 @@
+# config/expand.py
+
+# opt-in de campos extras via query string: ?expand=viewer_state,follow_state
+# o serializer só calcula os dados extras quando a view pede
+
+
+def expand_requested(context, name):
+    request = context.get("request")
+    if request is None:
+        return False
+    expand = request.query_params.get("expand", "")
+    return name in [value.strip() for value in expand.split(",")]
@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
+import tempfile
 import environ
 from datetime import timedelta
 import dj_database_url
@@ -84,6 +85,7 @@ INSTALLED_APPS = [
     "follows",
     "notifications",
     "hashtags",
+    "uploads",
     "storages",
 ]
 
@@ -142,6 +144,108 @@ SIMPLE_JWT = {
 }
 
 
+# Timeline "Following" materializada (fan-out on write)
+# autores com mais seguidores que o limite não fazem fan-out:
+# os posts deles são puxados para a timeline na leitura (pull-on-read)
+TIMELINE_FANOUT_MAX_FOLLOWERS = env.int("TIMELINE_FANOUT_MAX_FOLLOWERS", default=5000)
+
+# qtd máxima de posts copiados para a timeline no follow e no pull-on-read
+TIMELINE_BACKFILL_SIZE = env.int("TIMELINE_BACKFILL_SIZE", default=200)
+
+# tempo de cache do conjunto de autores de alto alcance
+TIMELINE_HIGH_FANOUT_CACHE_SECONDS = env.int("TIMELINE_HIGH_FANOUT_CACHE_SECONDS", default=300)
+
+
+# Pipeline de notificações (notifications/pipeline.py)
+# backends:
+# - notifications.pipeline.ThreadPoolBackend: fila em memória + threads workers (default)
+# - notifications.pipeline.OutboxBackend: tabela outbox durável (process_notification_outbox)
+# - notifications.pipeline.InlineBackend: processa no on_commit da própria requisição
+NOTIFICATIONS_BACKEND = env(
+    "NOTIFICATIONS_BACKEND", default="notifications.pipeline.ThreadPoolBackend"
+)
+NOTIFICATIONS_WORKERS = env.int("NOTIFICATIONS_WORKERS", default=2)
+NOTIFICATIONS_BATCH_SIZE = env.int("NOTIFICATIONS_BATCH_SIZE", default=500)
+# ThreadPoolBackend grava no outbox os lotes que falharam: com qualquer backend
+# process_notification_outbox --loop precisa rodar (ou ser agendado), senão
+# essas intenções ficam paradas na tabela
+# intenção com falha no outbox: nova tentativa após RETRY_SECONDS * 2^(tentativas - 1)
+NOTIFICATIONS_OUTBOX_RETRY_SECONDS = env.int("NOTIFICATIONS_OUTBOX_RETRY_SECONDS", default=30)
+
+# agregação (NotificationGroup): janela do bucket e quantos atores guardar por grupo
+NOTIFICATIONS_GROUP_WINDOW_SECONDS = env.int(
+    "NOTIFICATIONS_GROUP_WINDOW_SECONDS", default=86400
+)
+NOTIFICATIONS_GROUP_LAST_ACTORS = env.int("NOTIFICATIONS_GROUP_LAST_ACTORS", default=3)
+
+# stream SSE (/api/notifications/stream/, servido via config.asgi: uvicorn no Dockerfile)
+# pub/sub:
+# - notifications.pubsub.PostgresNotifyBroker: LISTEN/NOTIFY entre processos
+#   (default com PostgreSQL: os workers do uvicorn são processos separados)
+# - notifications.pubsub.InProcessBroker: mesmo processo (default nos demais
+#   bancos; em processos separados o stream só vê a notificação no keep-alive)
+NOTIFICATIONS_PUBSUB_BACKEND = env(
+    "NOTIFICATIONS_PUBSUB_BACKEND",
+    default=(
+        "notifications.pubsub.PostgresNotifyBroker"
+        if "postgresql" in DATABASES["default"]["ENGINE"]
+        else "notifications.pubsub.InProcessBroker"
+    ),
+)
+NOTIFICATIONS_STREAM_HEARTBEAT_SECONDS = env.int(
+    "NOTIFICATIONS_STREAM_HEARTBEAT_SECONDS", default=15
+)
+# validade do ticket que abre o stream (?ticket=, no lugar do access token na URL)
+NOTIFICATIONS_STREAM_TICKET_SECONDS = env.int(
+    "NOTIFICATIONS_STREAM_TICKET_SECONDS", default=60
+)
+
+
+# Trends de hashtags (hashtags/trends.py)
+# meia-vida do score decaído, janela dos buckets por minuto,
+# tamanho e validade do snapshot top-N em cache
+HASHTAG_TREND_HALF_LIFE_SECONDS = env.int("HASHTAG_TREND_HALF_LIFE_SECONDS", default=6 * 3600)
+HASHTAG_TRENDS_WINDOW_SECONDS = env.int("HASHTAG_TRENDS_WINDOW_SECONDS", default=24 * 3600)
+HASHTAG_TRENDS_SIZE = env.int("HASHTAG_TRENDS_SIZE", default=30)
+HASHTAG_TRENDS_REFRESH_SECONDS = env.int("HASHTAG_TRENDS_REFRESH_SECONDS", default=60)
+
+
+# Pipeline de mídia (uploads/pipeline.py)
+# a requisição grava o arquivo em disco local (UPLOADS_TEMP_ROOT) e responde;
+# workers enviam o original ao storage configurado e geram as renditions
+# backends:
+# - uploads.pipeline.ThreadPoolBackend: fila em memória + threads workers (default)
+# - uploads.pipeline.InlineBackend: processa no on_commit da própria requisição
+# uploads pendentes (ex.: processo reiniciado): python manage.py process_pending_uploads
+UPLOADS_BACKEND = env("UPLOADS_BACKEND", default="uploads.pipeline.ThreadPoolBackend")
+UPLOADS_WORKERS = env.int("UPLOADS_WORKERS", default=2)
+UPLOADS_TEMP_ROOT = env("UPLOADS_TEMP_ROOT", default=os.path.join(tempfile.gettempdir(), "uploads"))
+# reserva do PendingUpload enquanto um worker envia os arquivos (maior que o
+# envio mais lento); falha: nova tentativa após RETRY_SECONDS * 2^(tentativas - 1)
+UPLOADS_CLAIM_SECONDS = env.int("UPLOADS_CLAIM_SECONDS", default=3600)
+UPLOADS_RETRY_SECONDS = env.int("UPLOADS_RETRY_SECONDS", default=60)
+
+# larguras (px) das renditions WebP/JPEG das imagens de posts e comments
+UPLOADS_RENDITION_WIDTHS = [int(width) for width in env.list("UPLOADS_RENDITION_WIDTHS", default=[320, 640, 1280])]
+UPLOADS_WEBP_QUALITY = env.int("UPLOADS_WEBP_QUALITY", default=80)
+UPLOADS_JPEG_QUALITY = env.int("UPLOADS_JPEG_QUALITY", default=82)
+
+# storages de mídia por perfil de ACL: perfil -> alias em STORAGES (uploads/storages.py)
+UPLOADS_STORAGE_PROFILES = {"public": "public_media"}
+
+# envio multipart ao S3 (vídeos): tamanho mínimo, tamanho das partes e partes em paralelo
+UPLOADS_MULTIPART_THRESHOLD = env.int("UPLOADS_MULTIPART_THRESHOLD", default=16 * 1024 * 1024)
+UPLOADS_MULTIPART_CHUNKSIZE = env.int("UPLOADS_MULTIPART_CHUNKSIZE", default=16 * 1024 * 1024)
+UPLOADS_MULTIPART_CONCURRENCY = env.int("UPLOADS_MULTIPART_CONCURRENCY", default=4)
+
+# uploads diretos ao storage (uploads/direct.py): validade do upload intent,
+# tamanho máximo por tipo e tamanho das partes do upload local retomável
+UPLOADS_INTENT_EXPIRES_SECONDS = env.int("UPLOADS_INTENT_EXPIRES_SECONDS", default=3600)
+UPLOADS_MAX_IMAGE_SIZE = env.int("UPLOADS_MAX_IMAGE_SIZE", default=10 * 1024 * 1024)
+UPLOADS_MAX_VIDEO_SIZE = env.int("UPLOADS_MAX_VIDEO_SIZE", default=200 * 1024 * 1024)
+UPLOADS_CHUNK_SIZE = env.int("UPLOADS_CHUNK_SIZE", default=4 * 1024 * 1024)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -204,16 +308,41 @@ if USE_S3:
     AWS_S3_FILE_OVERWRITE = False
 
     # (se usar CloudFront, troar)
-    AWS_S3_CUSTOM_DOMAIN = f"{AWS_STORAGE_BUCKET_NAME}.s3.{AWS_S3_REGION_NAME}.amazonaws.com"
+    AWS_S3_CUSTOM_DOMAIN = env(
+        "AWS_S3_CUSTOM_DOMAIN",
+        default=f"{AWS_STORAGE_BUCKET_NAME}.s3.{AWS_S3_REGION_NAME}.amazonaws.com",
+    )
+
+    # S3 compatível fora da AWS (moto server/MinIO em testes de integração)
+    AWS_S3_ENDPOINT_URL = env("AWS_S3_ENDPOINT_URL", default=None)
 
     MEDIA_URL = f"https://{AWS_S3_CUSTOM_DOMAIN}/"
 
+    # boto3 só é importado com USE_S3
+    from boto3.s3.transfer import TransferConfig
+    from botocore.config import Config
+
+    # multipart: arquivos acima do threshold (vídeos) vão em partes paralelas
+    AWS_S3_TRANSFER_CONFIG = TransferConfig(
+        multipart_threshold=UPLOADS_MULTIPART_THRESHOLD,
+        multipart_chunksize=UPLOADS_MULTIPART_CHUNKSIZE,
+        max_concurrency=UPLOADS_MULTIPART_CONCURRENCY,
+    )
+    # pool HTTP por conexão boto3 (uma por thread): cobre as partes em paralelo
+    AWS_S3_CLIENT_CONFIG = Config(max_pool_connections=UPLOADS_MULTIPART_CONCURRENCY * 2)
+
     STORAGES = {
         "default": {
             "BACKEND": "storages.backends.s3boto3.S3Boto3Storage",
             # Se quiser forçar um subdir para medias:
             # "OPTIONS": {"location": "media"},
         },
+        # mídia pública de posts/comments (perfil "public", uploads/storages.py)
+        # ACL só em bucket com ACLs habilitadas; aqui o acesso público vem da policy
+        "public_media": {
+            "BACKEND": "storages.backends.s3boto3.S3Boto3Storage",
+            "OPTIONS": {"default_acl": env("AWS_PUBLIC_MEDIA_ACL", default=None)},
+        },
         "staticfiles": {
             "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
         },
@@ -227,6 +356,10 @@ else:
         "default": {
             "BACKEND": "django.core.files.storage.FileSystemStorage",
         },
+        # stand-in local do S3 (desenvolvimento/testes)
+        "public_media": {
+            "BACKEND": "django.core.files.storage.FileSystemStorage",
+        },
         "staticfiles": {
             "BACKEND": (
                 "django.contrib.staticfiles.storage.StaticFilesStorage"
@@ -0,0 +1,179 @@
+# config/tests/query_budget.py
+
+# harness de orçamento de queries por endpoint
+# - seed_fixture_graph: grafo realista montado com as factories dos apps
+#   (usuários, follows, posts com hashtags/menções, retweets, comments com
+#   replies, likes e notificações)
+# - get_routes: todas as rotas GET registradas em /api/ (routers e views)
+# - QueryBudgetTestCase.assert_query_budget: mede a rota em dois page sizes;
+#   a contagem tem que ser a mesma nos dois (O(1) no tamanho da página,
+#   pega N+1 de serializers aninhados) e caber no orçamento declarado
+# - rotas de lista sem paginação (ou com menos linhas que o maior page size):
+#   Endpoint.seed cria mais linhas entre as duas medições; a segunda medição
+#   de uma lista tem que trazer mais linhas que a primeira
+
+from types import SimpleNamespace
+from typing import Callable, NamedTuple
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+from rest_framework.test import APITestCase
+
+from accounts.tests.factories import UserFactory
+from comments.tests.factories import CommentFactory
+from follows.tests.factories import FollowFactory
+from likes.tests.factories import LikeFactory
+from notifications.tests.factories import NotificationFactory
+from posts.tests.factories import PostFactory
+from uploads.tests.factories import UploadIntentFactory
+
+# dois tamanhos de página: o fixture tem mais linhas que o maior
+PAGE_SIZES = (2, 5)
+
+# query params de tamanho de página usados pelas paginações do projeto
+PAGE_SIZE_PARAMS = ("limit", "page_size")
+
+
+# entrada da tabela de orçamentos
+# kwargs/params: função (grafo do fixture) -> kwargs da URL / query string
+# seed: função (grafo do fixture) que cria mais linhas da lista, chamada
+#   entre as duas medições
+class Endpoint(NamedTuple):
+    budget: int
+    kwargs: Callable = lambda graph: {}
+    params: Callable = lambda graph: {}
+    seed: Callable = None
+
+
+# rotas GET nomeadas sob /api/ -> padrão de URL
+# rotas de sufixo de formato (.json) dos routers são ignoradas
+def get_routes(patterns=None, prefix=""):
+    routes = {}
+    for pattern in get_resolver().url_patterns if patterns is None else patterns:
+        route = prefix + str(pattern.pattern)
+        if isinstance(pattern, URLResolver):
+            routes.update(get_routes(pattern.url_patterns, route))
+        elif _accepts_get(pattern) and route.startswith("api/") and "format" not in pattern.pattern.regex.groupindex:
+            routes.setdefault(pattern.name, route)
+    return routes
+
+
+def _accepts_get(pattern: URLPattern):
+    callback = pattern.callback
+    actions = getattr(callback, "actions", None)
+    if actions is not None:
+        return "get" in actions
+
+    view_class = getattr(callback, "view_class", None)
+    return view_class is not None and hasattr(view_class, "get") and pattern.name != "api-root"
+
+
+# grafo de dados: viewer segue `size` autores (e é seguido por eles);
+# cada autor tem `size` posts com hashtag e menção ao viewer,
+# o post principal tem retweets, likes e `size` comments raiz com replies
+def seed_fixture_graph(size=6):
+    viewer = UserFactory(username="budgetviewer")
+    authors = [UserFactory(username=f"budgetauthor{i}") for i in range(size)]
+
+    for author in authors:
+        FollowFactory(follower=viewer, following=author)
+        FollowFactory(follower=author, following=viewer)
+
+    # posts depois dos follows: fan-out para a timeline do viewer
+    posts = [
+        PostFactory(user=author, content=f"budget post {i} #budget @budgetviewer")
+        for author in authors
+        for i in range(size)
+    ]
+    post = posts[0]
+    for author in authors:
+        PostFactory(user=author, content="", retweet=post)
+        LikeFactory(user=author, post=post)
+
+    # todo comment raiz tem replies; o principal tem `size` replies aninhadas
+    comments = [CommentFactory(user=author, post=post) for author in authors]
+    for root in comments:
+        CommentFactory(user=viewer, post=post, parent_comment=root)
+    comment = comments[0]
+    replies = [CommentFactory(user=author, post=post, parent_comment=comment) for author in authors]
+    for reply in replies:
+        CommentFactory(user=viewer, post=post, parent_comment=reply)
+    for author in authors:
+        LikeFactory(user=author, comment=comment, post=None)
+
+    notifications = [
+        NotificationFactory(from_user=author, to_user=viewer, target_post_id=post.id, target_object_id=post.id)
+        for author in authors
+        for _ in range(2)
+    ]
+
+    return SimpleNamespace(
+        viewer=viewer,
+        author=authors[0],
+        post=post,
+        comment=comment,
+        hashtag=post.post_hashtags.select_related("hashtag").first().hashtag,
+        notification=notifications[0],
+        upload_intent=UploadIntentFactory(user=viewer),
+    )
+
+
+class QueryBudgetTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.graph = seed_fixture_graph()
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.graph.viewer)
+
+    # uma requisição de aquecimento (estado criado no primeiro acesso, ex.:
+    # NotificationState), depois uma medição por page size com cache limpo
+    # (com seed: mais linhas criadas antes da segunda medição)
+    def assert_query_budget(self, name, endpoint):
+        url = reverse(name, kwargs=endpoint.kwargs(self.graph))
+        base_params = endpoint.params(self.graph)
+        self.client.get(url, base_params)
+
+        measures = []
+        for page_size in PAGE_SIZES:
+            if endpoint.seed is not None and measures:
+                endpoint.seed(self.graph)
+            params = {**base_params, **{param: page_size for param in PAGE_SIZE_PARAMS}}
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200, f"{name}: {response.status_code} {response.data}")
+            measures.append((queries, _row_count(response.data)))
+
+        (small, small_rows), (large, large_rows) = measures
+        if small_rows is not None:
+            self.assertLess(
+                small_rows, large_rows,
+                f"{name}: the second measurement returned no more rows ({small_rows} -> {large_rows}); "
+                f"add fixture rows or an Endpoint seed",
+            )
+        self.assertEqual(
+            len(small), len(large),
+            f"{name}: query count grows with the number of rows "
+            f"({len(small)} -> {len(large)})\n{_format_queries(large)}",
+        )
+        self.assertLessEqual(
+            len(large), endpoint.budget,
+            f"{name}: {len(large)} queries, budget {endpoint.budget}\n{_format_queries(large)}",
+        )
+        return len(large)
+
+
+# linhas de uma resposta de lista (paginada ou não); None para detalhe
+def _row_count(data):
+    if isinstance(data, list):
+        return len(data)
+    if isinstance(data, dict) and isinstance(data.get("results"), list):
+        return len(data["results"])
+    return None
+
+
+def _format_queries(queries):
+    return "\n".join(f"{i}. {query['sql']}" for i, query in enumerate(queries.captured_queries, 1))
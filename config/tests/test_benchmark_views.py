@@ -0,0 +1,39 @@
+# config/tests/test_benchmark_views.py
+
+import io
+import json
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from config.benchmark import percentile
+
+
+class BenchCommandTests(TestCase):
+    def test_bench_reports_every_endpoint_as_json(self):
+        out = io.StringIO()
+        call_command(
+            'bench', in_place=True, users=6, posts_per_user=2, follows_per_user=2,
+            comments_per_post=2, likes_per_user=2, requests=4, warmup=1,
+            stdout=out, stderr=io.StringIO(),
+        )
+        report = json.loads(out.getvalue())
+
+        self.assertEqual(report['dataset'], {'users': 6, 'posts': 12})
+        self.assertEqual(
+            set(report['endpoints']),
+            {'feed', 'following_feed', 'comments', 'notifications', 'like', 'unlike', 'follow', 'unfollow'},
+        )
+        for label, endpoint in report['endpoints'].items():
+            self.assertEqual(endpoint['requests'], 4, label)
+            self.assertEqual(endpoint['errors'], 0, label)
+            self.assertGreater(endpoint['queries_per_request']['mean'], 0, label)
+            self.assertLessEqual(endpoint['latency_ms']['p50'], endpoint['latency_ms']['p99'], label)
+
+    
+    
+    def test_percentile_is_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 0.50), 50)
+        self.assertEqual(percentile(values, 0.99), 99)
+        self.assertEqual(percentile([7], 0.95), 7)
@@ -0,0 +1,65 @@
+# config/tests/test_dataset_views.py
+
+import io
+from datetime import timedelta
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from accounts.models import User
+from comments.models import Comment
+from comments.paths import path_segment
+from notifications.models import Notification, NotificationState
+from posts.models import Post
+
+
+class GenerateDatasetCommandTests(TestCase):
+    def generate(self, **options):
+        defaults = dict(
+            users=30, follows_per_user=5, posts_per_user=3, comments_per_post=3, likes_per_post=3,
+            hashtags=10, chunk_size=7, stdout=io.StringIO(),
+        )
+        call_command('generate_dataset', **{**defaults, **options})
+
+    def test_generated_counters_match_the_rows(self):
+        self.generate()
+
+        self.assertEqual(User.objects.filter(username__startswith='user').count(), 30)
+        self.assertTrue(Post.objects.exists())
+
+        # contadores desnormalizados calculados em memória: nada a reparar
+        out = io.StringIO()
+        call_command('reconcile_counters', stdout=out)
+        self.assertEqual(out.getvalue().count(' 0 repaired.'), 2)
+
+        # materialized path coerente com a árvore
+        for comment in Comment.objects.select_related('parent_comment'):
+            parent = comment.parent_comment
+            expected = (parent.path if parent else '') + path_segment(comment.id)
+            self.assertEqual(comment.path, expected)
+            self.assertEqual(comment.depth, parent.depth + 1 if parent else 0)
+
+        for state in NotificationState.objects.all():
+            unread = Notification.objects.filter(to_user_id=state.user_id, is_read=False).count()
+            self.assertEqual(state.unread_count, unread)
+
+
+
+    def test_generated_timestamps_are_kept_without_touching_auto_now_add(self):
+        self.generate(users=5, posts_per_user=2)
+
+        # datas espalhadas no período, não o momento do INSERT
+        self.assertLess(User.objects.filter(username__startswith='user').earliest('joined_at').joined_at,
+                        timezone.now() - timedelta(days=29))
+        self.assertTrue(Post._meta.get_field('created_at').auto_now_add)
+
+        post = Post.objects.create(user=User.objects.first(), content='depois do dataset')
+        self.assertGreater(post.created_at, timezone.now() - timedelta(minutes=1))
+
+
+
+    def test_existing_prefix_is_rejected(self):
+        self.generate(users=3, posts_per_user=1)
+        with self.assertRaises(CommandError):
+            self.generate(users=3, posts_per_user=1)
@@ -0,0 +1,96 @@
+# config/tests/test_query_budget_views.py
+
+from django.db import transaction
+
+from accounts.tests.factories import UserFactory
+from config.tests.query_budget import Endpoint, QueryBudgetTestCase, get_routes
+from posts.tests.factories import PostFactory
+
+
+# seeds das rotas de lista sem paginação ou com poucas linhas no fixture
+# usuários não seguidos pelo viewer, encontrados pela busca "budget"
+def seed_users(graph):
+    for i in range(3):
+        UserFactory(username=f"budgetseed{i}")
+
+
+# hashtags novas com uso dentro da janela dos trends
+def seed_hashtags(graph):
+    for i in range(6):
+        PostFactory(user=graph.author, content=f"#budgetseed{i}")
+
+
+# orçamento de queries de cada rota GET da API (medido com o usuário já
+# autenticado via force_authenticate); rota nova sem entrada aqui falha
+# em test_every_get_route_has_a_budget
+QUERY_BUDGETS = {
+    # accounts
+    "user-list": Endpoint(1),
+    "user-me": Endpoint(0),
+    "user-search": Endpoint(1, params=lambda graph: {"q": "budget"}, seed=seed_users),
+    "user-suggested": Endpoint(1, seed=seed_users),
+    "user-detail": Endpoint(1, lambda graph: {"username": graph.author.username}),
+
+    # posts
+    "post-list": Endpoint(1),
+    "post-count": Endpoint(1, params=lambda graph: {"user_id": graph.author.id}),
+    "post-following-posts": Endpoint(3),
+    "post-search": Endpoint(1, params=lambda graph: {"q": "budget"}),
+    "post-detail": Endpoint(1, lambda graph: {"pk": graph.post.id}),
+
+    # comments
+    "comment-list": Endpoint(3, params=lambda graph: {"parent_comment_id": graph.comment.id}),
+    "comment-detail": Endpoint(3, lambda graph: {"pk": graph.comment.id}),
+    "comment-thread": Endpoint(3, lambda graph: {"pk": graph.comment.id}),
+    "post-comments-list": Endpoint(3, lambda graph: {"post_id": graph.post.id}),
+
+    # notifications
+    "notifications-list": Endpoint(2),
+    "notifications-unread-count": Endpoint(1),
+    "notifications-detail": Endpoint(2, lambda graph: {"pk": graph.notification.id}),
+
+    # likes
+    "post-likes-count": Endpoint(1, lambda graph: {"post_id": graph.post.id}),
+    "has-liked-post": Endpoint(2, lambda graph: {"post_id": graph.post.id}),
+    "comment-likes-count": Endpoint(1, lambda graph: {"comment_id": graph.comment.id}),
+    "has-liked-comment": Endpoint(2, lambda graph: {"comment_id": graph.comment.id}),
+
+    # follows
+    "follow-followers-count": Endpoint(2, lambda graph: {"user_id": graph.viewer.id}),
+    "follow-followers-list": Endpoint(3, lambda graph: {"user_id": graph.viewer.id}),
+    "follow-following-count": Endpoint(2, lambda graph: {"user_id": graph.viewer.id}),
+    "follow-following-list": Endpoint(3, lambda graph: {"user_id": graph.viewer.id}),
+    "follow-is-followed-by-me": Endpoint(2, lambda graph: {"target_user_id": graph.author.id}),
+
+    # hashtags
+    "hashtag-list": Endpoint(1, seed=seed_hashtags),
+    "hashtag-detail": Endpoint(1, lambda graph: {"pk": graph.hashtag.id}),
+    "hashtag-posts": Endpoint(3, lambda graph: {"name": graph.hashtag.name}),
+    "hashtag-trends": Endpoint(1, seed=seed_hashtags),
+    "hashtag-random-trends": Endpoint(1, seed=seed_hashtags),
+
+    # uploads
+    "upload-detail": Endpoint(1, lambda graph: {"pk": graph.upload_intent.id}),
+}
+
+# rotas GET fora do harness
+EXCLUDED_ROUTES = {
+    # SSE: resposta em streaming sem fim (notifications/tests)
+    "notifications-stream",
+}
+
+
+class QueryBudgetTests(QueryBudgetTestCase):
+    def test_every_get_route_has_a_budget(self):
+        routes = set(get_routes()) - EXCLUDED_ROUTES
+        self.assertEqual(routes - set(QUERY_BUDGETS), set(), "GET routes without a query budget")
+        self.assertEqual(set(QUERY_BUDGETS) - routes, set(), "query budgets for unknown routes")
+
+    
+    
+    def test_endpoints_stay_within_query_budget(self):
+        for name, endpoint in QUERY_BUDGETS.items():
+            # seed desfeito ao fim de cada rota: as demais medem o fixture original
+            with self.subTest(route=name), transaction.atomic():
+                self.assert_query_budget(name, endpoint)
+                transaction.set_rollback(True)
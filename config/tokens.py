@@ -0,0 +1,53 @@
+# config/tokens.py
+
+# tokenizer compartilhado de conteúdo (posts e comments)
+# uma única regex pré-compilada extrai hashtags (#tag) e menções (@user)
+# em uma passada; o resultado fica em cache na instância, então os signals
+# de hashtags e de menções do mesmo save não reescaneiam o texto
+
+import re
+
+TOKEN_RE = re.compile(r'([#@])(\w+)')
+
+
+# retorna (hashtags, menções): conjuntos de nomes minúsculos, sem repetição
+def extract_tokens(content):
+    hashtags, mentions = set(), set()
+    for prefix, name in TOKEN_RE.findall(content or ""):
+        (hashtags if prefix == "#" else mentions).add(name.lower())
+    return hashtags, mentions
+
+
+def content_tokens(instance):
+    cached = getattr(instance, "_content_tokens", None)
+    if cached is None or cached[0] != instance.content:
+        cached = (instance.content, *extract_tokens(instance.content))
+        instance._content_tokens = cached
+    return cached[1], cached[2]
+
+
+# guarda o content carregado do db para detectar edição sem mudança de texto
+class TrackedContentMixin:
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if "content" in instance.__dict__:
+            instance._loaded_content = instance.content
+        return instance
+
+
+# True quando o save precisa reprocessar o conteúdo
+# (criação, ou content diferente do carregado do db)
+def content_changed(instance, created, update_fields=None):
+    if created:
+        return True
+    if update_fields is not None and "content" not in update_fields:
+        return False
+    if not hasattr(instance, "_loaded_content"):
+        return True
+    return instance._loaded_content != instance.content
+
+
+# chamado depois do processamento: próximos saves comparam com o texto atual
+def mark_content_processed(instance):
+    instance._loaded_content = instance.content
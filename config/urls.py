@@ -15,6 +15,7 @@ urlpatterns = [
     path("api/likes/", include("likes.urls")),
     path("api/follows/", include("follows.urls")),
     path('api/', include('hashtags.urls')),
+    path('api/', include('uploads.urls')),
 ]
 
 urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
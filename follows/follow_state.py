@@ -0,0 +1,46 @@
+# follows/follow_state.py
+
+# contagens de seguidores/seguindo e relação com o usuário logado
+# para uma lista de usuários, em duas queries agrupadas
+# evita as 3 requisições por linha (followers/count, following/count, is_followed_by_me)
+
+from django.db.models import Count, Q
+
+from .models import Follow
+
+FOLLOW_STATE = "follow_state"
+
+
+# {user_id: {"followers_count", "following_count", "is_followed_by_me", "follows_me"}}
+def follow_state(viewer, user_ids):
+    state = {
+        user_id: {
+            "followers_count": 0,
+            "following_count": 0,
+            "is_followed_by_me": False,
+            "follows_me": False,
+        }
+        for user_id in user_ids
+    }
+    if not state:
+        return state
+
+    # seguidores de cada usuário + se o usuário logado é um deles
+    followers = Follow.objects.filter(following_id__in=user_ids).order_by()\
+        .values("following_id")\
+        .annotate(total=Count("id"), by_viewer=Count("id", filter=Q(follower_id=viewer.id)))
+
+    for row in followers:
+        state[row["following_id"]]["followers_count"] = row["total"]
+        state[row["following_id"]]["is_followed_by_me"] = row["by_viewer"] > 0
+
+    # quem cada usuário segue + se ele segue o usuário logado
+    following = Follow.objects.filter(follower_id__in=user_ids).order_by()\
+        .values("follower_id")\
+        .annotate(total=Count("id"), of_viewer=Count("id", filter=Q(following_id=viewer.id)))
+
+    for row in following:
+        state[row["follower_id"]]["following_count"] = row["total"]
+        state[row["follower_id"]]["follows_me"] = row["of_viewer"] > 0
+
+    return state
@@ -136,4 +136,53 @@ class FollowTests(APITestCase):
         self.client.force_authenticate(user=None)
         data = {'targetUserId': self.target_user.id}
         response = self.client.post(self.follow_url, data, format='json')
-        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
\ No newline at end of file
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+    
+    
+    # Testes de batch e follow_state
+    
+    def test_batch_state_returns_counts_and_relationship(self):
+        FollowFactory(follower=self.user, following=self.target_user)
+        FollowFactory(follower=self.target_user, following=self.user)
+        FollowFactory(follower=self.another_user, following=self.target_user)
+
+        data = {'userIds': [str(self.target_user.id), str(self.another_user.id)]}
+        response = self.client.post(reverse('follow-batch-state'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[str(self.target_user.id)], {
+            'followers_count': 2,
+            'following_count': 1,
+            'is_followed_by_me': True,
+            'follows_me': True,
+        })
+        self.assertFalse(response.data[str(self.another_user.id)]['is_followed_by_me'])
+        self.assertEqual(response.data[str(self.another_user.id)]['following_count'], 1)
+
+    
+    
+    def test_batch_state_omits_unknown_users(self):
+        data = {'userIds': [str(self.target_user.id), str(uuid.uuid4())]}
+        response = self.client.post(reverse('follow-batch-state'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(response.data), [str(self.target_user.id)])
+
+    
+    
+    def test_batch_state_with_invalid_id_fails(self):
+        response = self.client.post(reverse('follow-batch-state'), {'userIds': ['invalid-uuid']}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    
+    
+    def test_followers_list_embeds_follow_state(self):
+        FollowFactory(follower=self.target_user, following=self.user)
+        FollowFactory(follower=self.user, following=self.target_user)
+        url = reverse('follow-followers-list', kwargs={'user_id': self.user.id})
+
+        response = self.client.get(f"{url}?expand=follow_state")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        row = response.data['results'][0]
+        self.assertEqual(row['username'], self.target_user.username)
+        self.assertTrue(row['isFollowedByMe'])
+        self.assertTrue(row['followsMe'])
+        self.assertEqual(row['followersCount'], 1)
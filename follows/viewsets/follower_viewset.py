@@ -13,10 +13,15 @@ from django.shortcuts import get_object_or_404
 
 from accounts.serializers import UserBasicSerializer
 from ..models import Follow
+from ..follow_state import follow_state
 
 
 User = get_user_model()
 
+# limite de ids por requisição em batch_state
+BATCH_STATE_MAX_IDS = 500
+
+
 class FollowListPagination(PageNumberPagination):
     page_size = 20
     page_size_query_param = 'page_size'
@@ -155,10 +160,10 @@ class FollowViewSet(viewsets.ViewSet):
         page = paginator.paginate_queryset(queryset, request)
         
         if page is not None:
-            serializer = UserBasicSerializer([f.follower for f in page], many=True)
+            serializer = UserBasicSerializer([f.follower for f in page], many=True, context={"request": request})
             return paginator.get_paginated_response(serializer.data)
         
-        serializer = UserBasicSerializer([f.follower for f in queryset], many=True)
+        serializer = UserBasicSerializer([f.follower for f in queryset], many=True, context={"request": request})
         return Response(serializer.data)
 
 
@@ -173,8 +178,38 @@ class FollowViewSet(viewsets.ViewSet):
         page = paginator.paginate_queryset(queryset, request)
         
         if page is not None:
-            serializer = UserBasicSerializer([f.following for f in page], many=True)
+            serializer = UserBasicSerializer([f.following for f in page], many=True, context={"request": request})
             return paginator.get_paginated_response(serializer.data)
         
-        serializer = UserBasicSerializer([f.following for f in queryset], many=True)
-        return Response(serializer.data)
\ No newline at end of file
+        serializer = UserBasicSerializer([f.following for f in queryset], many=True, context={"request": request})
+        return Response(serializer.data)
+
+
+    # BATCH FOLLOW STATE
+    @action(detail=False, methods=["post"])
+    def batch_state(self, request):
+        """
+        /api/follows/batch_state/
+        body: {"userIds": [...]}
+        ids inexistentes são omitidos da resposta (como em /api/likes/batch_state/)
+        """
+        user_ids = request.data.get("userIds")
+
+        if not isinstance(user_ids, list):
+            return Response({"detail": "userIds must be a list."}, status=status.HTTP_400_BAD_REQUEST)
+
+        if len(user_ids) > BATCH_STATE_MAX_IDS:
+            return Response({"detail": f"userIds accepts at most {BATCH_STATE_MAX_IDS} ids."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            user_ids = list({uuid.UUID(str(user_id)) for user_id in user_ids})
+        except ValueError:
+            return Response({"detail": "Invalid user ID format."}, status=status.HTTP_400_BAD_REQUEST)
+
+        # ids existentes em uma query; duas queries agrupadas, sem get_object_or_404 por usuário
+        user_ids = list(User.objects.filter(id__in=user_ids).values_list("id", flat=True))
+        state = follow_state(request.user, user_ids)
+        return Response(
+            {str(user_id): user_state for user_id, user_state in state.items()},
+            status=status.HTTP_200_OK,
+        )
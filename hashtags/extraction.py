@@ -0,0 +1,25 @@
+# hashtags/extraction.py
+
+# resolução em lote de nomes de hashtag para ids
+# um SELECT para as existentes; as que faltam são criadas com um único
+# bulk_create(ignore_conflicts=True) e relidas (criadas em paralelo por outra
+# requisição também aparecem nessa segunda leitura)
+
+from .models import Hashtag
+
+
+# names: nomes já normalizados (minúsculos, sem repetição)
+# retorna {nome: id}
+def resolve_hashtags(names):
+    names = set(names)
+    if not names:
+        return {}
+
+    resolved = dict(Hashtag.objects.filter(name__in=names).values_list("name", "id"))
+    missing = names - resolved.keys()
+    if missing:
+        Hashtag.objects.bulk_create(
+            [Hashtag(name=name) for name in missing], ignore_conflicts=True
+        )
+        resolved.update(Hashtag.objects.filter(name__in=missing).values_list("name", "id"))
+    return resolved
@@ -0,0 +1,25 @@
+# hashtags/management/commands/refresh_trends.py
+
+from django.core.management.base import BaseCommand
+
+from hashtags.trends import prune_usage_buckets, refresh_trends
+
+
+class Command(BaseCommand):
+    # python manage.py help refresh_trends
+    help = 'Recomputes the cached trending hashtags snapshot (run periodically, e.g. every minute).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--prune',
+            action='store_true',
+            help='Also delete usage buckets that fell out of the trends window.',
+        )
+
+    def handle(self, *args, **kwargs):
+        if kwargs['prune']:
+            deleted = prune_usage_buckets()
+            self.stdout.write(f'Pruned {deleted} usage bucket(s).')
+
+        trends = refresh_trends()
+        self.stdout.write(self.style.SUCCESS(f'Cached {len(trends)} trending hashtag(s).'))
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("hashtags", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="hashtag",
+            name="trend_score",
+            field=models.FloatField(db_index=True, default=0.0),
+        ),
+        migrations.CreateModel(
+            name="HashtagUsageBucket",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("bucket", models.DateTimeField()),
+                ("count", models.PositiveIntegerField(default=0)),
+                (
+                    "hashtag",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="usage_buckets",
+                        to="hashtags.hashtag",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["bucket"], name="hashtags_ha_bucket_1ceed0_idx"
+                    )
+                ],
+                "unique_together": {("hashtag", "bucket")},
+            },
+        ),
+    ]
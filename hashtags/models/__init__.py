@@ -1 +1,2 @@
-from .hashtags import Hashtag
\ No newline at end of file
+from .hashtags import Hashtag
+from .usage import HashtagUsageBucket
@@ -6,6 +6,12 @@ class Hashtag(models.Model):
     name = models.CharField(max_length=100, unique=True, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # score de tendência com decaimento exponencial, em escala log
+    # relativo a TREND_EPOCH (ver hashtags/trends.py)
+    # atualizado incrementalmente a cada uso; ordenar por ele equivale
+    # a ordenar pelo score decaído atual
+    trend_score = models.FloatField(default=0.0, db_index=True)
+
     def __str__(self):
         return self.name
 
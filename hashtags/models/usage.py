@@ -0,0 +1,26 @@
+# hashtags/models/usage.py
+
+from django.db import models
+
+from .hashtags import Hashtag
+
+
+# contador de usos de uma hashtag por minuto (janela deslizante dos trends)
+# uma linha por (hashtag, bucket); buckets fora da janela são removidos
+# por: python manage.py refresh_trends --prune
+class HashtagUsageBucket(models.Model):
+    hashtag = models.ForeignKey(
+        Hashtag, on_delete=models.CASCADE, related_name="usage_buckets"
+    )
+    # início do minuto
+    bucket = models.DateTimeField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("hashtag", "bucket")
+        indexes = [
+            models.Index(fields=["bucket"]),
+        ]
+
+    def __str__(self):
+        return f"{self.hashtag_id} @ {self.bucket:%Y-%m-%d %H:%M} = {self.count}"
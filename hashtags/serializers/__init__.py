@@ -1 +1,2 @@
-from .hashtag_serializer import HashtagSerializer
\ No newline at end of file
+from .hashtag_serializer import HashtagSerializer
+from .hashtag_trend_serializer import HashtagTrendSerializer
@@ -6,4 +6,4 @@ from ..models import Hashtag
 class HashtagSerializer(serializers.ModelSerializer):
     class Meta:
         model = Hashtag
-        fields = '__all__'
\ No newline at end of file
+        fields = ['id', 'name', 'created_at']
\ No newline at end of file
@@ -0,0 +1,13 @@
+# hashtags/serializers/hashtag_trend_serializer.py
+
+from rest_framework import serializers
+
+
+# item do snapshot de trends (hashtags/trends.py)
+# campos de HashtagSerializer + uso na janela e score decaído
+class HashtagTrendSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    name = serializers.CharField()
+    created_at = serializers.DateTimeField()
+    posts_count = serializers.IntegerField()
+    score = serializers.FloatField()
@@ -1,10 +1,20 @@
 # hashtags/tests/test_hashtag_view.py
 
+from datetime import timedelta
+
 from rest_framework.test import APITestCase
 from rest_framework import status
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from accounts.tests.factories import UserFactory
-from hashtags.models import Hashtag
+from hashtags.models import Hashtag, HashtagUsageBucket
+from django.db.models import F, Value
+from hashtags.trends import MIN_EXP_ARGUMENT, _log_weight, exp_argument, record_hashtag_usage
+from posts.models import Post, PostHashtag
+from posts.tests.factories import PostFactory
 from hashtags.tests.factories import HashtagFactory
 
 
@@ -13,6 +23,8 @@ class HashtagTests(APITestCase):
         self.user = UserFactory()
         self.client.force_authenticate(user=self.user)
         self.list_url = reverse('hashtag-list')
+        self.trends_url = reverse('hashtag-trends')
+        cache.clear()
 
         self.hashtag1 = HashtagFactory(name='johncandy')
         self.hashtag2 = HashtagFactory(name='johnarias')
@@ -48,4 +60,128 @@ class HashtagTests(APITestCase):
     def test_search_filter_with_no_results(self):
         response = self.client.get(f"{self.list_url}?search=johnjohnflorence")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 0)
\ No newline at end of file
+        self.assertEqual(len(response.data), 0)
+
+    
+    
+    
+    # Testes de trends
+
+    def test_post_records_hashtag_usage(self):
+        PostFactory(user=self.user, content="#JohnCandy #johncandy #novidade")
+        self.assertEqual(HashtagUsageBucket.objects.get(hashtag=self.hashtag1).count, 1)
+        self.assertTrue(HashtagUsageBucket.objects.filter(hashtag__name='novidade').exists())
+        self.hashtag1.refresh_from_db()
+        self.assertGreater(self.hashtag1.trend_score, 0)
+
+    
+    def test_usage_of_new_hashtag_does_not_underflow_exp(self):
+        now = timezone.now()
+        weight = _log_weight(now)
+        # hashtag nova: trend_score 0.0, milhares de unidades abaixo do peso atual
+        exponent = Hashtag.objects.annotate(
+            exponent=exp_argument(F('trend_score'), Value(weight))
+        ).get(pk=self.hashtag1.pk).exponent
+        self.assertEqual(exponent, MIN_EXP_ARGUMENT)
+
+        record_hashtag_usage([self.hashtag1.id], now)
+        self.hashtag1.refresh_from_db()
+        self.assertAlmostEqual(self.hashtag1.trend_score, weight)
+
+    
+    def test_trends_are_ordered_by_decayed_score(self):
+        now = timezone.now()
+        # 3 usos antigos perdem para 2 usos recentes (meia-vida de 6h)
+        for _ in range(3):
+            record_hashtag_usage([self.hashtag1.id], now - timedelta(hours=12))
+        for _ in range(2):
+            record_hashtag_usage([self.hashtag2.id], now)
+
+        response = self.client.get(self.trends_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['name'] for item in response.data], ['johnarias', 'johncandy'])
+        self.assertEqual(response.data[0]['posts_count'], 2)
+        self.assertAlmostEqual(response.data[1]['score'], 0.75, places=2)
+
+    
+    def test_trends_ignore_usage_outside_window(self):
+        record_hashtag_usage([self.hashtag3.id], timezone.now() - timedelta(days=2))
+        response = self.client.get(self.trends_url)
+        self.assertEqual(response.data, [])
+
+    
+    def test_trends_are_served_from_snapshot(self):
+        record_hashtag_usage([self.hashtag1.id])
+        self.client.get(self.trends_url)
+
+        record_hashtag_usage([self.hashtag2.id])
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('hashtag-random-trends'), {'limit': 5})
+        self.assertEqual([item['name'] for item in response.data], ['johncandy'])
+
+    
+    
+    
+    # Testes de PostHashtag e timeline da hashtag
+
+    def test_post_save_links_hashtags(self):
+        post = PostFactory(user=self.user, content="#JohnCandy e #novidade #novidade")
+        self.assertEqual(
+            set(PostHashtag.objects.filter(post=post).values_list('hashtag__name', flat=True)),
+            {'johncandy', 'novidade'},
+        )
+
+        post.content = "agora só #johnlennon"
+        post.save()
+        self.assertEqual(
+            list(PostHashtag.objects.filter(post=post).values_list('hashtag__name', flat=True)),
+            ['johnlennon'],
+        )
+
+        post.delete()
+        self.assertFalse(PostHashtag.objects.exists())
+
+    
+    def test_hashtag_posts_endpoint(self):
+        older = PostFactory(user=self.user, content="primeiro #johncandy")
+        newer = PostFactory(user=self.user, content="segundo #JohnCandy")
+        PostFactory(user=self.user, content="outro #johnlennon")
+        PostHashtag.objects.filter(post=older).update(created_at=newer.created_at - timedelta(minutes=1))
+
+        url = reverse('hashtag-posts', kwargs={'name': 'JohnCandy'})
+        response = self.client.get(url, {'limit': 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([post['id'] for post in response.data['results']], [str(newer.id)])
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual([post['id'] for post in response.data['results']], [str(older.id)])
+
+    
+    def test_hashtag_posts_unknown_hashtag(self):
+        response = self.client.get(reverse('hashtag-posts', kwargs={'name': 'naoexiste'}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    
+    
+    
+    # Testes de extração em lote
+
+    def test_post_creation_queries_do_not_grow_with_hashtags(self):
+        def create_post_queries(content):
+            with CaptureQueriesContext(connection) as queries:
+                PostFactory(user=self.user, content=content)
+            return len(queries)
+
+        one_tag = create_post_queries("#umatag")
+        many_tags = create_post_queries(" ".join(f"#tag{n} #TAG{n}" for n in range(10)))
+        self.assertEqual(one_tag, many_tags)
+        self.assertEqual(Hashtag.objects.filter(name__startswith='tag').count(), 10)
+
+    
+    def test_edit_without_content_change_skips_extraction(self):
+        post = PostFactory(user=self.user, content="#johncandy")
+        post = Post.objects.get(pk=post.pk)
+
+        # só o UPDATE do post
+        with self.assertNumQueries(1):
+            post.save()
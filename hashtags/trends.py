@@ -0,0 +1,129 @@
+# hashtags/trends.py
+
+# trends de hashtags
+# - escrita: cada uso incrementa o bucket do minuto (HashtagUsageBucket)
+#   e atualiza o score decaído da hashtag (Hashtag.trend_score), ambos em SQL
+# - leitura: top-N pré-calculado em cache (snapshot), renovado a cada
+#   HASHTAG_TRENDS_REFRESH_SECONDS ou por: python manage.py refresh_trends
+#
+# score decaído: soma de usos * exp(-idade / tau)
+# guardado em escala log relativo a TREND_EPOCH:
+#   trend_score = log(soma de usos * exp((t_uso - TREND_EPOCH) / tau))
+# o fator de decaimento é o mesmo para todas as hashtags, então o score nunca
+# precisa ser recalculado: novo uso = logaddexp(trend_score, (t - TREND_EPOCH) / tau)
+
+import math
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Sum, Value
+from django.db.models.functions import Abs, Exp, Greatest, Ln
+from django.utils import timezone
+
+from .models import Hashtag, HashtagUsageBucket
+
+TREND_EPOCH = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+TRENDS_CACHE_KEY = "hashtags:trends"
+
+# limite do argumento de exp() no SQL: hashtag nova (trend_score 0.0) ou parada
+# há meses fica a milhares de unidades do peso atual e exp(-1800) dá
+# "value out of range: underflow" no PostgreSQL (SQLite devolve 0)
+# exp(-700) ~ 1e-304 ainda é representável e ln(1 + exp(-700)) = 0 em float
+MIN_EXP_ARGUMENT = -700.0
+
+
+def _tau():
+    return settings.HASHTAG_TREND_HALF_LIFE_SECONDS / math.log(2)
+
+
+def _log_weight(moment):
+    return (moment - TREND_EPOCH).total_seconds() / _tau()
+
+
+def minute_bucket(moment):
+    return moment.replace(second=0, microsecond=0)
+
+
+# registra um uso de cada hashtag (ids já sem repetição) no instante "moment"
+# 3 queries, independente da quantidade de hashtags
+def record_hashtag_usage(hashtag_ids, moment=None):
+    hashtag_ids = list(hashtag_ids)
+    if not hashtag_ids:
+        return
+    moment = moment or timezone.now()
+    bucket = minute_bucket(moment)
+
+    # cria os buckets que faltam e incrementa todos (sem corrida entre requisições)
+    HashtagUsageBucket.objects.bulk_create(
+        [HashtagUsageBucket(hashtag_id=hashtag_id, bucket=bucket) for hashtag_id in hashtag_ids],
+        ignore_conflicts=True,
+    )
+    HashtagUsageBucket.objects.filter(hashtag_id__in=hashtag_ids, bucket=bucket).update(
+        count=F("count") + 1
+    )
+
+    current, weight = F("trend_score"), Value(_log_weight(moment))
+    Hashtag.objects.filter(id__in=hashtag_ids).update(trend_score=log_add_exp(current, weight))
+
+
+# logaddexp(a, b) = max(a, b) + ln(1 + exp(-|a - b|)), estável numericamente
+# argumento de exp() limitado a MIN_EXP_ARGUMENT (diferença grande: termo = 0)
+def exp_argument(current, weight):
+    return Greatest(-Abs(current - weight), Value(MIN_EXP_ARGUMENT))
+
+
+def log_add_exp(current, weight):
+    return Greatest(current, weight) + Ln(Value(1.0) + Exp(exp_argument(current, weight)))
+
+
+# score decaído atual a partir do trend_score em escala log
+def current_score(trend_score, now):
+    return math.exp(trend_score - _log_weight(now))
+
+
+# top-N das hashtags com uso dentro da janela, ordenado pelo score decaído
+def compute_trends(now=None):
+    now = now or timezone.now()
+    window_start = now - timedelta(seconds=settings.HASHTAG_TRENDS_WINDOW_SECONDS)
+
+    hashtags = (
+        Hashtag.objects.filter(usage_buckets__bucket__gte=window_start)
+        .annotate(posts_count=Sum("usage_buckets__count"))
+        .order_by("-trend_score", "name")
+        .values("id", "name", "created_at", "trend_score", "posts_count")
+        [: settings.HASHTAG_TRENDS_SIZE]
+    )
+
+    return [
+        {
+            "id": hashtag["id"],
+            "name": hashtag["name"],
+            "created_at": hashtag["created_at"],
+            "posts_count": hashtag["posts_count"],
+            "score": current_score(hashtag["trend_score"], now),
+        }
+        for hashtag in hashtags
+    ]
+
+
+def refresh_trends():
+    trends = compute_trends()
+    cache.set(TRENDS_CACHE_KEY, trends, settings.HASHTAG_TRENDS_REFRESH_SECONDS)
+    return trends
+
+
+# leitura O(N) do snapshot; recalculado só quando expira
+def get_trends(limit):
+    trends = cache.get(TRENDS_CACHE_KEY)
+    if trends is None:
+        trends = refresh_trends()
+    return trends[:limit]
+
+
+# remove os buckets que já saíram da janela
+def prune_usage_buckets(now=None):
+    now = now or timezone.now()
+    window_start = now - timedelta(seconds=settings.HASHTAG_TRENDS_WINDOW_SECONDS)
+    deleted, _ = HashtagUsageBucket.objects.filter(bucket__lt=window_start).delete()
+    return deleted
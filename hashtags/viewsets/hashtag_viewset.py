@@ -1,13 +1,18 @@
 # hashtags/viewsets/hashtag_viewset.py
 
-import random
-
+from django.conf import settings
+from django.shortcuts import get_object_or_404
 from rest_framework import viewsets, permissions, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
 from ..models import Hashtag
-from ..serializers import HashtagSerializer
+from ..serializers import HashtagSerializer, HashtagTrendSerializer
+from ..trends import get_trends
+from posts.models import PostHashtag
+from posts.pagination import PostCursorPagination
+from posts.serializers import PostSerializer
+from posts.timeline import posts_for_entries
 
 class HashtagViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Hashtag.objects.all()
@@ -17,11 +22,12 @@ class HashtagViewSet(viewsets.ReadOnlyModelViewSet):
     filter_backends = [filters.SearchFilter]
     search_fields = ['name']
 
-    # lógica para o mock trends card em RightSidebar
+    # trends card em RightSidebar
+    # GET /hashtags/trends/?limit=5
     @action(detail=False, methods=['get'])
-    def random_trends(self, request):
+    def trends(self, request):
         """
-        lista de hashtags limitada e randomizada
+        hashtags em alta: top-N pelo score decaído, lido do snapshot em cache
         """
         try:
             limit = int(request.query_params.get('limit', 5))
@@ -29,18 +35,26 @@ class HashtagViewSet(viewsets.ReadOnlyModelViewSet):
                 limit = 5
         except ValueError:
             limit = 5
+        limit = min(limit, settings.HASHTAG_TRENDS_SIZE)
 
-        all_hashtags = self.get_queryset() # all hashtags
-
-        # datasets maiores: talvez otimizar essa randomização no DB-level?
-        # para PostgreSQL, usar .order_by('?')
-        
-        all_ids = list(all_hashtags.values_list('id', flat=True))
-
-        random.shuffle(all_ids)
-        selected_ids = all_ids[:limit]
-
-        random_hashtags = all_hashtags.filter(id__in=selected_ids)
-
-        serializer = self.get_serializer(random_hashtags, many=True)
+        serializer = HashtagTrendSerializer(get_trends(limit), many=True)
         return Response(serializer.data)
+
+    # rota antiga do frontend, mantida como alias de trends
+    @action(detail=False, methods=['get'])
+    def random_trends(self, request):
+        return self.trends(request)
+
+    # timeline da hashtag
+    # GET /hashtags/{name}/posts/?cursor=...
+    # paginação sobre PostHashtag (index scan em hashtag, -created_at)
+    # e depois uma única query para os posts da página
+    @action(detail=False, methods=['get'], url_path=r'(?P<name>[^/.]+)/posts')
+    def posts(self, request, name=None):
+        hashtag = get_object_or_404(Hashtag, name=name.lstrip('#').lower())
+        entries = PostHashtag.objects.filter(hashtag=hashtag).only("post_id", "created_at")
+
+        paginator = PostCursorPagination()
+        page = paginator.paginate_queryset(entries, request, view=self)
+        serializer = PostSerializer(posts_for_entries(page), many=True, context={"request": request})
+        return paginator.get_paginated_response(serializer.data)
@@ -0,0 +1,27 @@
+# likes/signals.py
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from config.counters import adjust_counter
+from posts.models import Post
+from comments.models import Comment
+from .models import Like
+
+
+def _adjust_like_count(like, delta):
+    if like.post_id:
+        adjust_counter(Post, like.post_id, "like_count", delta)
+    elif like.comment_id:
+        adjust_counter(Comment, like.comment_id, "like_count", delta)
+
+
+@receiver(post_save, sender=Like)
+def increment_like_count(sender, instance, created, **kwargs):
+    if created:
+        _adjust_like_count(instance, 1)
+
+
+@receiver(post_delete, sender=Like)
+def decrement_like_count(sender, instance, **kwargs):
+    _adjust_like_count(instance, -1)
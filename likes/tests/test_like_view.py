@@ -187,4 +187,40 @@ class LikeTests(APITestCase):
         LikeFactory(user=self.user, comment=self.comment, post=None)
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertTrue(response.data['has_liked'])
\ No newline at end of file
+        self.assertTrue(response.data['has_liked'])
+    
+    
+    def test_like_and_unlike_update_post_like_count(self):
+        data = {'postId': self.post.id}
+        self.client.post(self.like_post_url, data, format='json')
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.like_count, 1)
+
+        self.client.delete(self.unlike_post_url, data, format='json')
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.like_count, 0)
+
+    
+    
+    def test_batch_state_returns_counts_and_liked_flags(self):
+        other_post = PostFactory(user=self.other_user)
+        LikeFactory(user=self.user, post=self.post)
+        LikeFactory(user=self.other_user, post=other_post)
+        LikeFactory(user=self.user, comment=self.comment, post=None)
+
+        data = {
+            'postIds': [str(self.post.id), str(other_post.id), str(uuid.uuid4())],
+            'commentIds': [str(self.comment.id)],
+        }
+        response = self.client.post(reverse('likes-batch-state'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['posts']), 2)
+        self.assertEqual(response.data['posts'][str(self.post.id)], {'count': 1, 'has_liked': True})
+        self.assertEqual(response.data['posts'][str(other_post.id)], {'count': 1, 'has_liked': False})
+        self.assertEqual(response.data['comments'][str(self.comment.id)], {'count': 1, 'has_liked': True})
+
+    
+    
+    def test_batch_state_with_invalid_id_fails(self):
+        response = self.client.post(reverse('likes-batch-state'), {'postIds': ['invalid-uuid']}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -44,6 +44,11 @@ has_liked_comment_view = LikeViewSet.as_view({
     "get": "has_liked_comment",
 })
 
+# batch de contagens/status (posts e comments)
+batch_state_view = LikeViewSet.as_view({
+    "post": "batch_state",
+})
+
 
 urlpatterns = [
     # POST/DELETE (curtir/descurtir)
@@ -51,6 +56,7 @@ urlpatterns = [
     path("posts/unlike/", unlike_post_action, name='unlike_post'),
     path("comments/", like_comment_action, name='like_comment'),
     path("comments/unlike/", unlike_comment_action, name='unlike_comment'),
+    path("batch_state/", batch_state_view, name="likes-batch-state"),
 
     # rotas GET
     # re_path para capturar o UUID na URL
@@ -8,14 +8,47 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 
 from django.contrib.auth import get_user_model
+from django.db.models import Exists, OuterRef
 
 from posts.models import Post
 from comments.models import Comment
 from ..models import Like
 
+# limite de ids por tipo (posts/comments) em batch_state
+BATCH_STATE_MAX_IDS = 500
+
+
 class LikeViewSet(viewsets.ViewSet):
     permission_classes = [IsAuthenticated]
 
+    # função auxiliar da classe
+    # valida a lista de ids do payload de batch_state
+    # retorna (ids, mensagem de erro)
+    def _parse_id_list(self, value, field_name):
+        if value is None:
+            return [], None
+        if not isinstance(value, list):
+            return None, f"{field_name} must be a list."
+        if len(value) > BATCH_STATE_MAX_IDS:
+            return None, f"{field_name} accepts at most {BATCH_STATE_MAX_IDS} ids."
+        try:
+            return list({uuid.UUID(str(item)) for item in value}), None
+        except ValueError:
+            return None, "Invalid ID format."
+
+    # contagem (coluna like_count) e liked do usuário logado em uma query por tipo
+    # values_list: sem instanciar os models
+    def _like_state(self, model, ids, like_field):
+        if not ids:
+            return {}
+        rows = model.objects.filter(id__in=ids).annotate(
+            has_liked=Exists(Like.objects.filter(user=self.request.user, **{like_field: OuterRef("pk")}))
+        ).values_list("id", "like_count", "has_liked")
+        return {
+            str(object_id): {"count": count, "has_liked": has_liked}
+            for object_id, count, has_liked in rows
+        }
+
     # LIKE POST
     @action(detail=False, methods=["post"])
     def like_post(self, request):
@@ -167,11 +200,14 @@ class LikeViewSet(viewsets.ViewSet):
         """
         try:
             uuid.UUID(str(post_id))
-            post = Post.objects.get(id=post_id)
-        except (ValueError, Post.DoesNotExist):
+        except ValueError:
             return Response({"detail": "Post não encontrado ou ID inválido."}, status=status.HTTP_404_NOT_FOUND)
-        
-        count = Like.objects.filter(post=post).count()
+
+        # lê apenas o contador desnormalizado (Post.like_count)
+        count = Post.objects.filter(id=post_id).values_list("like_count", flat=True).first()
+        if count is None:
+            return Response({"detail": "Post não encontrado ou ID inválido."}, status=status.HTTP_404_NOT_FOUND)
+
         return Response({"count": count}, status=status.HTTP_200_OK)
 
 
@@ -202,11 +238,14 @@ class LikeViewSet(viewsets.ViewSet):
         """
         try:
             uuid.UUID(str(comment_id))
-            comment = Comment.objects.get(id=comment_id)
-        except (ValueError, Comment.DoesNotExist):
+        except ValueError:
             return Response({"detail": "Comentário não encontrado ou ID inválido."}, status=status.HTTP_404_NOT_FOUND)
-        
-        count = Like.objects.filter(comment=comment).count()
+
+        # lê apenas o contador desnormalizado (Comment.like_count)
+        count = Comment.objects.filter(id=comment_id).values_list("like_count", flat=True).first()
+        if count is None:
+            return Response({"detail": "Comentário não encontrado ou ID inválido."}, status=status.HTTP_404_NOT_FOUND)
+
         return Response({"count": count}, status=status.HTTP_200_OK)
 
 
@@ -227,3 +266,25 @@ class LikeViewSet(viewsets.ViewSet):
         
         has_liked = Like.objects.filter(user=request.user, comment=comment).exists()
         return Response({"has_liked": has_liked}, status=status.HTTP_200_OK)
+
+
+    # BATCH LIKE STATE (posts e comments)
+    @action(detail=False, methods=["post"])
+    def batch_state(self, request):
+        """
+        URL: /api/likes/batch_state/
+        body: {"postIds": [...], "commentIds": [...]}
+        ids inexistentes são omitidos da resposta
+        """
+        post_ids, error = self._parse_id_list(request.data.get("postIds"), "postIds")
+        if error:
+            return Response({"detail": error}, status=status.HTTP_400_BAD_REQUEST)
+
+        comment_ids, error = self._parse_id_list(request.data.get("commentIds"), "commentIds")
+        if error:
+            return Response({"detail": error}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            "posts": self._like_state(Post, post_ids, "post"),
+            "comments": self._like_state(Comment, comment_ids, "comment"),
+        }, status=status.HTTP_200_OK)
@@ -0,0 +1,160 @@
+# notifications/grouping.py
+
+# agregação das notificações em NotificationGroup
+# chamada pelo pipeline logo após o bulk_create das notificações do lote:
+# uma query (com lock) para os grupos existentes, bulk_update + bulk_create
+# workers concorrentes criando o mesmo grupo: o bulk_create perdedor viola
+# unique_notification_group; o savepoint é desfeito e o upsert é refeito,
+# agora encontrando (e travando) o grupo criado pelo outro worker
+# actor_count conta atores distintos: ator fora de last_actors só entra na conta
+# se não tiver notificação anterior no grupo (uma query para o lote todo)
+
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+
+from .models import Notification, NotificationGroup
+
+UPSERT_ATTEMPTS = 3
+
+
+def _str(value):
+    return str(value) if value is not None else None
+
+
+# início da janela de agrupamento que contém o timestamp
+def group_bucket(timestamp):
+    window = settings.NOTIFICATIONS_GROUP_WINDOW_SECONDS
+    epoch = datetime(1970, 1, 1, tzinfo=timestamp.tzinfo)
+    elapsed = int((timestamp - epoch).total_seconds())
+    return timestamp - timedelta(seconds=elapsed % window, microseconds=timestamp.microsecond)
+
+
+def _group_key(to_user_id, notification_type, target_object_id, bucket):
+    return (str(to_user_id), notification_type, _str(target_object_id), bucket)
+
+
+# junta os atores mantendo a ordem (mais recente primeiro) e sem repetição
+def _merge_actors(newer, older):
+    return newer + [actor for actor in older if actor not in newer]
+
+
+# upsert dos grupos das notificações recém-criadas
+# retorna os NotificationGroup criados/atualizados
+def group_notifications(notifications):
+    if not notifications:
+        return []
+
+    max_actors = settings.NOTIFICATIONS_GROUP_LAST_ACTORS
+    batch_ids = [notification.pk for notification in notifications]
+
+    # agrega o lote em memória: {chave: {"actors", "target_post_id", "timestamp"}}
+    pending = {}
+    for notification in notifications:
+        key = _group_key(
+            notification.to_user_id,
+            notification.type,
+            notification.target_object_id,
+            group_bucket(notification.timestamp),
+        )
+        entry = pending.setdefault(key, {
+            "actors": [],
+            "target_post_id": notification.target_post_id,
+            "timestamp": notification.timestamp,
+        })
+        entry["actors"] = _merge_actors([str(notification.from_user_id)], entry["actors"])
+        entry["timestamp"] = max(entry["timestamp"], notification.timestamp)
+
+    for attempt in range(UPSERT_ATTEMPTS):
+        try:
+            with transaction.atomic():
+                return _upsert_groups(pending, max_actors, batch_ids)
+        except IntegrityError:
+            if attempt == UPSERT_ATTEMPTS - 1:
+                raise
+
+
+def _existing_groups(pending):
+    # select_for_update: workers concorrentes não perdem incrementos
+    return {
+        _group_key(group.to_user_id, group.type, group.target_object_id, group.bucket): group
+        for group in NotificationGroup.objects.select_for_update().filter(
+            to_user_id__in={key[0] for key in pending},
+            type__in={key[1] for key in pending},
+            bucket__in={key[3] for key in pending},
+        )
+    }
+
+
+# atores candidatos que já têm notificação no grupo fora do lote atual
+# {chave: {ator}}
+def _earlier_actors(candidates, batch_ids):
+    window = timedelta(seconds=settings.NOTIFICATIONS_GROUP_WINDOW_SECONDS)
+    condition = Q()
+    for (to_user_id, notification_type, target_object_id, bucket), actors in candidates.items():
+        condition |= Q(
+            to_user_id=to_user_id,
+            type=notification_type,
+            target_object_id=target_object_id,
+            timestamp__gte=bucket,
+            timestamp__lt=bucket + window,
+            from_user_id__in=actors,
+        )
+
+    earlier = {}
+    rows = Notification.objects.filter(condition).exclude(pk__in=batch_ids).order_by()\
+        .values_list("to_user_id", "type", "target_object_id", "timestamp", "from_user_id")
+    for to_user_id, notification_type, target_object_id, timestamp, from_user_id in rows:
+        key = _group_key(to_user_id, notification_type, target_object_id, group_bucket(timestamp))
+        earlier.setdefault(key, set()).add(str(from_user_id))
+    return earlier
+
+
+def _upsert_groups(pending, max_actors, batch_ids):
+    existing = _existing_groups(pending)
+
+    # atores novos fora de last_actors: podem ter saído da lista e voltado
+    candidates = {}
+    for key, entry in pending.items():
+        group = existing.get(key)
+        if group is not None:
+            actors = [actor for actor in entry["actors"] if actor not in group.last_actors]
+            if actors:
+                candidates[key] = actors
+    earlier = _earlier_actors(candidates, batch_ids) if candidates else {}
+
+    to_create, to_update = [], []
+    for key, entry in pending.items():
+        group = existing.get(key)
+        if group is None:
+            to_user_id, notification_type, target_object_id, bucket = key
+            to_create.append(NotificationGroup(
+                type=notification_type,
+                to_user_id=to_user_id,
+                target_post_id=entry["target_post_id"],
+                target_object_id=target_object_id,
+                bucket=bucket,
+                actor_count=len(entry["actors"]),
+                last_actors=entry["actors"][:max_actors],
+                timestamp=entry["timestamp"],
+            ))
+            continue
+
+        # ator já contado no grupo não entra de novo (like/unlike/like)
+        seen = earlier.get(key, set())
+        group.actor_count += len([actor for actor in candidates.get(key, []) if actor not in seen])
+        group.last_actors = _merge_actors(entry["actors"], group.last_actors)[:max_actors]
+        group.timestamp = max(group.timestamp, entry["timestamp"])
+        group.is_read = False
+        to_update.append(group)
+
+    if to_update:
+        NotificationGroup.objects.bulk_update(
+            to_update, ["actor_count", "last_actors", "timestamp", "is_read"]
+        )
+    if to_create:
+        NotificationGroup.objects.bulk_create(to_create)
+
+    return to_create + to_update
@@ -0,0 +1,57 @@
+# notifications/management/commands/process_notification_outbox.py
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from notifications.pipeline import drain_outbox
+
+
+class Command(BaseCommand):
+    # python manage.py help process_notification_outbox
+    help = 'Processes pending notification intents from the outbox table (OutboxBackend).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.NOTIFICATIONS_BATCH_SIZE,
+            help='Maximum number of intents processed per transaction.',
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=5,
+            help='Intents that failed this many times are skipped (left in the outbox for inspection). '
+                 'Failed intents are retried after an exponential backoff (NOTIFICATIONS_OUTBOX_RETRY_SECONDS).',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep polling the outbox instead of exiting when it is empty.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=1.0,
+            help='Seconds to wait between polls when the outbox is empty (with --loop).',
+        )
+
+    def handle(self, *args, **kwargs):
+        total, total_failed = 0, 0
+        while True:
+            processed, failed = drain_outbox(kwargs['batch_size'], kwargs['max_attempts'])
+            total += processed
+            total_failed += failed
+
+            # linhas com falha ficam em backoff: a próxima leitura não as repete
+            if processed or failed:
+                continue
+            if not kwargs['loop']:
+                break
+            time.sleep(kwargs['interval'])
+
+        self.stdout.write(self.style.SUCCESS(f'Processed {total} notification intent(s).'))
+        if total_failed:
+            self.stdout.write(self.style.WARNING(f'{total_failed} notification intent(s) failed and will be retried later.'))
@@ -0,0 +1,74 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:03
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0002_notificationoutbox"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NotificationGroup",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "type",
+                    models.CharField(
+                        choices=[
+                            ("like", "Like"),
+                            ("comment", "Comment"),
+                            ("follow", "Follow"),
+                            ("retweet", "Retweet"),
+                            ("mention", "Mention"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("target_post_id", models.UUIDField(blank=True, null=True)),
+                ("target_object_id", models.UUIDField(blank=True, null=True)),
+                ("bucket", models.DateTimeField()),
+                ("actor_count", models.PositiveIntegerField(default=0)),
+                ("last_actors", models.JSONField(default=list)),
+                ("timestamp", models.DateTimeField()),
+                ("is_read", models.BooleanField(default=False)),
+                (
+                    "to_user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="notification_groups",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-timestamp"],
+                "indexes": [
+                    models.Index(
+                        fields=["to_user", "-timestamp"],
+                        name="notificatio_to_user_191874_idx",
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("to_user", "type", "target_object_id", "bucket"),
+                        name="unique_notification_group",
+                    )
+                ],
+            },
+        ),
+    ]
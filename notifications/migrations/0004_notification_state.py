@@ -0,0 +1,66 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:06
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+# um estado por destinatário com as não lidas atuais (read_through ainda vazio)
+# sem ele get_state criaria o estado com unread_count=0 e increment_unread
+# somaria sobre essa base errada
+def populate_states(apps, schema_editor):
+    Notification = apps.get_model("notifications", "Notification")
+    NotificationState = apps.get_model("notifications", "NotificationState")
+
+    unread = (
+        Notification.objects.order_by()
+        .values("to_user")
+        .annotate(total=Count("pk", filter=Q(is_read=False)))
+        .values_list("to_user", "total")
+    )
+    NotificationState.objects.bulk_create(
+        [
+            NotificationState(user_id=user_id, unread_count=total)
+            for user_id, total in unread
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0001_initial"),
+        ("notifications", "0003_notificationgroup"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NotificationState",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="notification_state",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                ("unread_count", models.PositiveIntegerField(default=0)),
+                ("read_through", models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                condition=models.Q(("is_read", False)),
+                fields=["to_user", "-timestamp"],
+                name="notification_unread_idx",
+            ),
+        ),
+        migrations.RunPython(populate_states, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0004_notification_state"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notificationoutbox",
+            name="attempts",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+    ]
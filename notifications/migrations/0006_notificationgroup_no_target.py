@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:45
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+# grupos sem alvo duplicados pela corrida antes da constraint: um por chave,
+# o mais recente, com a soma dos atores e os últimos atores de todos
+def merge_duplicate_groups(apps, schema_editor):
+    NotificationGroup = apps.get_model("notifications", "NotificationGroup")
+
+    duplicated = (
+        NotificationGroup.objects.filter(target_object_id__isnull=True)
+        .order_by()
+        .values("to_user", "type", "bucket")
+        .annotate(total=Count("pk"))
+        .filter(total__gt=1)
+    )
+    for key in duplicated:
+        groups = list(
+            NotificationGroup.objects.filter(
+                target_object_id__isnull=True,
+                to_user=key["to_user"],
+                type=key["type"],
+                bucket=key["bucket"],
+            ).order_by("-timestamp")
+        )
+        kept, others = groups[0], groups[1:]
+        for group in others:
+            kept.actor_count += group.actor_count
+            kept.last_actors += [
+                actor for actor in group.last_actors if actor not in kept.last_actors
+            ]
+            kept.is_read = kept.is_read and group.is_read
+        kept.last_actors = kept.last_actors[: settings.NOTIFICATIONS_GROUP_LAST_ACTORS]
+        kept.save(update_fields=["actor_count", "last_actors", "is_read"])
+        NotificationGroup.objects.filter(pk__in=[group.pk for group in others]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0005_outbox_attempts"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_groups, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="notificationgroup",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("target_object_id__isnull", True)),
+                fields=("to_user", "type", "bucket"),
+                name="unique_notification_group_no_target",
+            ),
+        ),
+    ]
@@ -1 +1,4 @@
 from .notifications import Notification
+from .group import NotificationGroup
+from .outbox import NotificationOutbox
+from .state import NotificationState
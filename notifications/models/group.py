@@ -0,0 +1,60 @@
+# notifications/models/group.py
+
+from django.db import models
+from django.contrib.auth import get_user_model
+import uuid
+
+from .notifications import Notification
+
+
+User = get_user_model()
+
+
+# notificação agregada: "Ana e mais 41 pessoas curtiram seu post"
+# uma linha por (to_user, type, target_object_id, bucket), atualizada (upsert)
+# pelo pipeline a cada nova notificação do mesmo grupo
+# bucket: início da janela de NOTIFICATIONS_GROUP_WINDOW_SECONDS
+class NotificationGroup(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+
+    type = models.CharField(max_length=10, choices=Notification.NOTIFICATION_TYPES)
+    to_user = models.ForeignKey(
+        User, related_name="notification_groups", on_delete=models.CASCADE
+    )
+
+    # mesmos alvos de Notification
+    target_post_id = models.UUIDField(null=True, blank=True)
+    target_object_id = models.UUIDField(null=True, blank=True)
+
+    bucket = models.DateTimeField()
+
+    # total de atores distintos no grupo
+    actor_count = models.PositiveIntegerField(default=0)
+    # ids (str) dos últimos atores, mais recente primeiro
+    # limitado a NOTIFICATIONS_GROUP_LAST_ACTORS
+    last_actors = models.JSONField(default=list)
+
+    # timestamp da notificação mais recente do grupo
+    timestamp = models.DateTimeField()
+    is_read = models.BooleanField(default=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["to_user", "type", "target_object_id", "bucket"],
+                name="unique_notification_group",
+            ),
+            # grupos sem alvo (follow): NULLs são distintos na constraint acima
+            models.UniqueConstraint(
+                fields=["to_user", "type", "bucket"],
+                condition=models.Q(target_object_id__isnull=True),
+                name="unique_notification_group_no_target",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["to_user", "-timestamp"]),
+        ]
+        ordering = ["-timestamp"]
+
+    def __str__(self):
+        return f"{self.to_user_id} [{self.type}] x{self.actor_count}"
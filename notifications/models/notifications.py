@@ -50,6 +50,12 @@ class Notification(models.Model):
     class Meta:
         indexes = [
             models.Index(fields=['to_user', '-timestamp']), 
+            # índice parcial: só as não lidas (contagem/recontagem do unread_count)
+            models.Index(
+                fields=['to_user', '-timestamp'],
+                condition=models.Q(is_read=False),
+                name='notification_unread_idx',
+            ),
         ]
         ordering = ['-timestamp']
 
@@ -0,0 +1,23 @@
+# notifications/models/outbox.py
+
+from django.db import models
+
+
+# outbox durável de intenções de notificação (NotificationOutboxBackend)
+# a linha é gravada na mesma transação da escrita que gerou a notificação
+# e consumida por: python manage.py process_notification_outbox
+class NotificationOutbox(models.Model):
+    # intenção serializada (ver notifications/pipeline.py)
+    payload = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    # falhas de processamento; linhas com max_attempts ficam paradas (dead letter)
+    # e não bloqueiam as seguintes
+    attempts = models.PositiveSmallIntegerField(default=0)
+    # backoff após uma falha: a linha só volta a ser lida a partir daqui
+    next_attempt_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["id"]
+
+    def __str__(self):
+        return f"{self.payload.get('kind')} #{self.pk}"
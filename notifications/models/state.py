@@ -0,0 +1,25 @@
+# notifications/models/state.py
+
+from django.db import models
+from django.contrib.auth import get_user_model
+
+
+User = get_user_model()
+
+
+# estado de leitura das notificações de cada usuário
+# - unread_count: contador mantido pelo pipeline (badge do frontend)
+# - read_through: marca d'água, notificações com timestamp <= read_through
+#   contam como lidas sem reescrever as linhas antigas
+class NotificationState(models.Model):
+    user = models.OneToOneField(
+        User,
+        primary_key=True,
+        related_name="notification_state",
+        on_delete=models.CASCADE,
+    )
+    unread_count = models.PositiveIntegerField(default=0)
+    read_through = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.user_id} ({self.unread_count} unread)"
@@ -0,0 +1,285 @@
+# notifications/pipeline.py
+
+# pipeline assíncrono de notificações
+# signals (notifications/signals.py) só registram intenções leves (ids),
+# sem queries dentro da requisição de escrita
+# o backend configurado em settings.NOTIFICATIONS_BACKEND entrega as intenções,
+# após o commit, para process_intents, que resolve tudo em lote:
+# - donos de posts/comments: uma query por tipo
+# - menções: um único IN com os usernames
+# - escrita: um único bulk_create
+# - agregação: upsert dos NotificationGroup do lote (notifications/grouping.py)
+# - contador de não lidas: incremento por destinatário (notifications/unread.py)
+#   (escrita, agregação e contador na mesma transação: tudo ou nada)
+# - tempo real: aviso aos streams SSE abertos após o commit (notifications/pubsub.py)
+
+import queue
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+from django.db.models.functions import Lower
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from posts.models import Post
+from comments.models import Comment
+from .models import Notification, NotificationOutbox
+from .grouping import group_notifications
+from .unread import increment_unread
+from .pubsub import publish_notifications
+
+User = get_user_model()
+
+
+# INTENÇÕES
+# dicionários serializáveis em JSON (também gravados no outbox)
+# {"kind": "like", "from_user_id", "post_id" | "comment_id"}
+# {"kind": "comment", "from_user_id", "post_id"}
+# {"kind": "retweet", "from_user_id", "post_id"}
+# {"kind": "follow", "from_user_id", "to_user_id"}
+# {"kind": "mention", "from_user_id", "usernames", "target_post_id", "target_object_id"}
+
+def _str(value):
+    return str(value) if value is not None else None
+
+
+def _owners(model, ids, *fields):
+    if not ids:
+        return {}
+    return {
+        str(row[0]): tuple(_str(value) for value in row[1:])
+        for row in model.objects.filter(id__in=ids).values_list("id", *fields)
+    }
+
+
+# resolve as intenções em lote e grava as notificações com bulk_create
+# retorna a lista de Notification criadas
+def process_intents(intents):
+    post_ids = {intent["post_id"] for intent in intents if intent.get("post_id")}
+    comment_ids = {intent["comment_id"] for intent in intents if intent.get("comment_id")}
+    usernames = {
+        username.lower()
+        for intent in intents if intent["kind"] == "mention"
+        for username in intent["usernames"]
+    }
+
+    # {post_id: (user_id,)} e {comment_id: (user_id, post_id)}
+    posts = _owners(Post, post_ids, "user_id")
+    comments = _owners(Comment, comment_ids, "user_id", "post_id")
+
+    # {username minúsculo: user_id}
+    mentioned = {}
+    if usernames:
+        mentioned = {
+            username: str(user_id)
+            for username, user_id in User.objects.annotate(username_lower=Lower("username"))
+            .filter(username_lower__in=usernames)
+            .values_list("username_lower", "id")
+        }
+
+    notifications = []
+    for intent in intents:
+        for to_user_id, notification_type, target_post_id, target_object_id in _targets(
+            intent, posts, comments, mentioned
+        ):
+            # usuário não é notificado das próprias ações
+            if to_user_id is None or to_user_id == intent["from_user_id"]:
+                continue
+            notifications.append(Notification(
+                type=notification_type,
+                from_user_id=intent["from_user_id"],
+                to_user_id=to_user_id,
+                target_post_id=target_post_id,
+                target_object_id=target_object_id,
+            ))
+
+    if notifications:
+        with transaction.atomic():
+            Notification.objects.bulk_create(notifications)
+            group_notifications(notifications)
+            increment_unread(notifications)
+            transaction.on_commit(lambda: publish_notifications(notifications))
+    return notifications
+
+
+# destinatários de uma intenção:
+# lista de (to_user_id, type, target_post_id, target_object_id)
+# objetos apagados antes do processamento são ignorados
+def _targets(intent, posts, comments, mentioned):
+    kind = intent["kind"]
+
+    if kind == "like":
+        if intent.get("post_id"):
+            post = posts.get(intent["post_id"])
+            if post:
+                return [(post[0], Notification.LIKE, intent["post_id"], intent["post_id"])]
+        elif intent.get("comment_id"):
+            comment = comments.get(intent["comment_id"])
+            if comment:
+                return [(comment[0], Notification.LIKE, comment[1], intent["comment_id"])]
+        return []
+
+    if kind in ("comment", "retweet"):
+        post = posts.get(intent["post_id"])
+        if not post:
+            return []
+        notification_type = Notification.COMMENT if kind == "comment" else Notification.RETWEET
+        return [(post[0], notification_type, intent["post_id"], intent["post_id"])]
+
+    if kind == "follow":
+        return [(intent["to_user_id"], Notification.FOLLOW, None, None)]
+
+    if kind == "mention":
+        user_ids = {mentioned.get(username.lower()) for username in intent["usernames"]}
+        return [
+            (user_id, Notification.MENTION, intent["target_post_id"], intent["target_object_id"])
+            for user_id in user_ids if user_id
+        ]
+
+    return []
+
+
+# BACKENDS
+
+# processa no on_commit da própria requisição (desenvolvimento/testes)
+class InlineBackend:
+    def enqueue(self, intent):
+        transaction.on_commit(lambda: self.submit([intent]))
+
+    def submit(self, intents):
+        process_intents(intents)
+
+
+# fila em memória consumida por threads workers (default)
+# cada worker drena a fila em lotes de até NOTIFICATIONS_BATCH_SIZE intenções
+class ThreadPoolBackend:
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._workers = []
+        self._lock = threading.Lock()
+
+    def enqueue(self, intent):
+        # só entra na fila depois do commit: rollback descarta a intenção
+        transaction.on_commit(lambda: self.submit([intent]))
+
+    def submit(self, intents):
+        self._start_workers()
+        for intent in intents:
+            self._queue.put(intent)
+
+    def _start_workers(self):
+        if self._workers:
+            return
+        with self._lock:
+            while len(self._workers) < settings.NOTIFICATIONS_WORKERS:
+                worker = threading.Thread(
+                    target=self._work,
+                    name=f"notifications-{len(self._workers)}",
+                    daemon=True,
+                )
+                worker.start()
+                self._workers.append(worker)
+
+    def _work(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < settings.NOTIFICATIONS_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                process_intents(batch)
+            except Exception as e:
+                # lote desfeito por inteiro: vai para o outbox, reprocessado
+                # (uma linha por vez, se preciso) por process_notification_outbox,
+                # que precisa estar rodando/agendado também com este backend
+                print(f"ERROR: Falha ao processar {len(batch)} notificação(ões). Erro: {e}")
+                try:
+                    OutboxBackend().submit(batch)
+                except Exception as e:
+                    print(f"ERROR: Falha ao gravar {len(batch)} notificação(ões) no outbox. Erro: {e}")
+            finally:
+                # thread própria: devolve a conexão com o db
+                close_old_connections()
+                for _ in batch:
+                    self._queue.task_done()
+
+
+# outbox durável: a intenção é gravada na mesma transação da escrita
+# consumo: python manage.py process_notification_outbox
+class OutboxBackend:
+    def enqueue(self, intent):
+        NotificationOutbox.objects.create(payload=intent)
+
+    def submit(self, intents):
+        NotificationOutbox.objects.bulk_create(
+            [NotificationOutbox(payload=intent) for intent in intents]
+        )
+
+
+_backends = {}
+
+
+def get_backend():
+    path = settings.NOTIFICATIONS_BACKEND
+    if path not in _backends:
+        _backends[path] = import_string(path)()
+    return _backends[path]
+
+
+# ponto de entrada usado pelos signals
+def enqueue_notification(intent):
+    get_backend().enqueue(intent)
+
+
+# consome até batch_size linhas do outbox
+# select_for_update(skip_locked): vários consumidores em paralelo no PostgreSQL
+# lote com falha: reprocessado linha a linha; a linha com problema ganha uma
+# tentativa e só volta a ser lida depois do backoff (uma queda curta do banco
+# não esgota as tentativas em milissegundos); com max_attempts deixa de ser
+# lida (as seguintes não travam)
+# retorna (processadas, com falha)
+def drain_outbox(batch_size, max_attempts):
+    now = timezone.now()
+    with transaction.atomic():
+        rows = NotificationOutbox.objects.filter(
+            Q(next_attempt_at__isnull=True) | Q(next_attempt_at__lte=now),
+            attempts__lt=max_attempts,
+        ).order_by("id")
+        if transaction.get_connection().features.has_select_for_update_skip_locked:
+            rows = rows.select_for_update(skip_locked=True)
+        rows = list(rows.values_list("id", "payload", "attempts")[:batch_size])
+        if not rows:
+            return 0, 0
+
+        failed = {}
+        try:
+            with transaction.atomic():
+                process_intents([payload for _, payload, _ in rows])
+            done = [row_id for row_id, _, _ in rows]
+        except Exception:
+            done = []
+            for row_id, payload, attempts in rows:
+                try:
+                    with transaction.atomic():
+                        process_intents([payload])
+                    done.append(row_id)
+                except Exception as e:
+                    failed.setdefault(attempts, []).append(row_id)
+                    print(f"ERROR: Falha ao processar a intenção #{row_id} do outbox. Erro: {e}")
+
+        # um UPDATE por quantidade de tentativas anteriores (mesmo backoff)
+        for attempts, row_ids in failed.items():
+            delay = settings.NOTIFICATIONS_OUTBOX_RETRY_SECONDS * 2 ** attempts
+            NotificationOutbox.objects.filter(id__in=row_ids).update(
+                attempts=F("attempts") + 1,
+                next_attempt_at=now + timedelta(seconds=delay),
+            )
+        NotificationOutbox.objects.filter(id__in=done).delete()
+    return len(done), len(rows) - len(done)
@@ -0,0 +1,141 @@
+# notifications/pubsub.py
+
+# pub/sub em processo para o stream de notificações (SSE)
+# o pipeline publica um aviso por destinatário depois de gravar o lote;
+# cada conexão SSE aberta assina o canal do seu usuário e, ao ser acordada,
+# busca as notificações novas no db (usuário ocioso: nenhuma query)
+#
+# backends (settings.NOTIFICATIONS_PUBSUB_BACKEND):
+# - InProcessBroker: escritor e stream no mesmo processo (default fora do PostgreSQL)
+# - PostgresNotifyBroker: LISTEN/NOTIFY do PostgreSQL, entrega entre processos
+#   (ex.: gunicorn/config.wsgi gravando e o servidor ASGI servindo o stream);
+#   default quando o banco é PostgreSQL
+
+import json
+import select
+import threading
+import asyncio
+
+from django.conf import settings
+from django.db import connection, connections
+from django.utils.module_loading import import_string
+
+
+# assinatura de uma conexão SSE: fila asyncio presa ao event loop do stream
+class Subscription:
+    def __init__(self, user_id):
+        self.user_id = str(user_id)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue()
+
+
+class InProcessBroker:
+    def __init__(self):
+        self._subscribers = {}
+        self._lock = threading.Lock()
+
+    # chamado dentro do event loop do stream
+    def subscribe(self, user_id):
+        subscription = Subscription(user_id)
+        with self._lock:
+            self._subscribers.setdefault(subscription.user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.user_id)
+            if subscribers:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.user_id]
+
+    # thread-safe: chamado pelas threads do pipeline
+    def publish(self, user_id, message):
+        self._deliver(str(user_id), message)
+
+    def _deliver(self, user_id, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.queue.put_nowait, message)
+            except RuntimeError:
+                # event loop já encerrado: conexão caiu antes do unsubscribe
+                self.unsubscribe(subscription)
+
+
+# entrega entre processos via LISTEN/NOTIFY (somente PostgreSQL)
+# publish: pg_notify na conexão do chamador (entregue no commit)
+# subscribe: uma thread por processo escuta o canal e repassa aos assinantes locais
+class PostgresNotifyBroker(InProcessBroker):
+    channel = "notifications"
+
+    def __init__(self):
+        super().__init__()
+        self._listener = None
+
+    def subscribe(self, user_id):
+        self._start_listener()
+        return super().subscribe(user_id)
+
+    def publish(self, user_id, message):
+        payload = json.dumps({"user_id": str(user_id), "message": message})
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [self.channel, payload])
+
+    def _start_listener(self):
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(
+                    target=self._listen, name="notifications-listen", daemon=True
+                )
+                self._listener.start()
+
+    def _listen(self):
+        while True:
+            # conexão dedicada fora do ciclo de requisições
+            db = connections.create_connection("default")
+            try:
+                db.ensure_connection()
+                db.set_autocommit(True)
+                raw = db.connection
+                with raw.cursor() as cursor:
+                    cursor.execute(f"LISTEN {self.channel}")
+
+                while True:
+                    if select.select([raw], [], [], 30) == ([], [], []):
+                        continue
+                    raw.poll()
+                    while raw.notifies:
+                        notify = raw.notifies.pop(0)
+                        data = json.loads(notify.payload)
+                        self._deliver(data["user_id"], data["message"])
+            except Exception as e:
+                print(f"ERROR: Falha no LISTEN de notificações. Erro: {e}")
+                threading.Event().wait(5)
+            finally:
+                db.close()
+
+
+_brokers = {}
+
+
+def get_broker():
+    path = settings.NOTIFICATIONS_PUBSUB_BACKEND
+    if path not in _brokers:
+        _brokers[path] = import_string(path)()
+    return _brokers[path]
+
+
+# chamado pelo pipeline: um aviso por destinatário do lote
+def publish_notifications(notifications):
+    latest = {}
+    for notification in notifications:
+        latest[str(notification.to_user_id)] = notification
+
+    broker = get_broker()
+    for user_id, notification in latest.items():
+        broker.publish(user_id, {
+            "id": str(notification.id),
+            "timestamp": notification.timestamp.isoformat(),
+        })
@@ -1 +1,2 @@
 from .notification_serializer import NotificationSerializer
+from .notification_group_serializer import NotificationGroupSerializer
@@ -0,0 +1,67 @@
+# notifications/serializers/notification_group_serializer.py
+
+from django.contrib.auth import get_user_model
+from django.db import models
+from rest_framework import serializers
+
+from ..models import NotificationGroup
+from ..unread import is_read
+from accounts.serializers import UserBasicSerializer
+
+User = get_user_model()
+
+
+# list serializer de NotificationGroupSerializer (many=True)
+# carrega os últimos atores de todos os grupos da página em uma única query
+class NotificationGroupListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        groups = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        actor_ids = {actor_id for group in groups for actor_id in group.last_actors}
+        if actor_ids:
+            self.context.setdefault("notification_actors", {}).update(
+                (str(user.id), user) for user in User.objects.filter(id__in=actor_ids)
+            )
+        return super().to_representation(groups)
+
+
+# forma agrupada: GET /notifications/?grouped=1
+class NotificationGroupSerializer(serializers.ModelSerializer):
+    actors = serializers.SerializerMethodField()
+
+    class Meta:
+        model = NotificationGroup
+
+        fields = [
+            "id",
+            "type",
+            "actors",
+            "actor_count",
+            "target_post_id",
+            "target_object_id",
+            "timestamp",
+            "is_read",
+        ]
+
+        read_only_fields = fields
+        list_serializer_class = NotificationGroupListSerializer
+
+    # últimos atores (mais recente primeiro); contas apagadas são ignoradas
+    def get_actors(self, obj):
+        users = self.context.get("notification_actors", {})
+        actors = [users[actor_id] for actor_id in obj.last_actors if actor_id in users]
+        return UserBasicSerializer(actors, many=True, context=self.context).data
+
+    def to_representation(self, instance):
+        ret = super().to_representation(instance)
+
+        if ret.get('timestamp'):
+            ret['timestamp'] = instance.timestamp.isoformat() + 'Z'
+
+        ret['actorCount'] = ret.pop('actor_count')
+        # marca d'água de leitura (NotificationState.read_through) vinda da view
+        ret.pop('is_read')
+        ret['isRead'] = is_read(instance, self.context.get('read_through'))
+        ret['targetPostId'] = ret.pop('target_post_id')
+        ret['targetObjectId'] = ret.pop('target_object_id')
+
+        return ret
@@ -3,6 +3,7 @@
 from rest_framework import serializers
 
 from ..models import Notification
+from ..unread import is_read
 from accounts.serializers import UserBasicSerializer
 
 
@@ -31,7 +32,9 @@ class NotificationSerializer(serializers.ModelSerializer):
             ret['timestamp'] = instance.timestamp.isoformat() + 'Z'
 
         if 'is_read' in ret:
-            ret['isRead'] = ret.pop('is_read')
+            # marca d'água de leitura (NotificationState.read_through) vinda da view
+            ret.pop('is_read')
+            ret['isRead'] = is_read(instance, self.context.get('read_through'))
         
         if 'target_post_id' in ret:
             ret['targetPostId'] = ret.pop('target_post_id')
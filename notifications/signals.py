@@ -1,125 +1,95 @@
 # notifications/signals.py
 
-import re
+# os receivers só montam a intenção (ids já presentes na instância, sem queries)
+# e a entregam ao pipeline (notifications/pipeline.py), que resolve destinatários
+# e grava as notificações em lote depois do commit
+
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
-from notifications.models import Notification
+from notifications.pipeline import enqueue_notification
 from likes.models import Like
 from comments.models import Comment
 from posts.models import Post
 from follows.models import Follow
-from django.contrib.auth import get_user_model 
+from config.tokens import content_tokens
+
 
-User = get_user_model() 
+def _str(value):
+    return str(value) if value is not None else None
 
 
 @receiver(post_save, sender=Like)
 def create_like_notification(sender, instance, created, **kwargs):
-    if not created: 
+    if not created:
         return
 
-    target_user = None
-    target_post_id = None
-    target_object_id = None 
-
-    if instance.post: 
-        target_user = instance.post.user
-        target_post_id = instance.post.id
-        target_object_id = instance.post.id 
-    elif instance.comment: 
-        target_user = instance.comment.user
-        target_post_id = instance.comment.post.id 
-        target_object_id = instance.comment.id 
-    else:
-        return 
+    if not instance.post_id and not instance.comment_id:
+        return
 
-    if instance.user != target_user:
-        Notification.objects.create(
-            type=Notification.LIKE,
-            from_user=instance.user,
-            to_user=target_user,
-            target_post_id=target_post_id,
-            target_object_id=target_object_id, 
-        )
+    # like em post tem prioridade (mesma regra do receiver síncrono anterior)
+    enqueue_notification({
+        "kind": "like",
+        "from_user_id": str(instance.user_id),
+        "post_id": _str(instance.post_id),
+        "comment_id": None if instance.post_id else _str(instance.comment_id),
+    })
 
 
 @receiver(post_save, sender=Comment)
 def create_comment_notification(sender, instance, created, **kwargs):
-    if created and instance.user != instance.post.user:
-        Notification.objects.create(
-            type=Notification.COMMENT,
-            from_user=instance.user,
-            to_user=instance.post.user,
-            target_post_id=instance.post.id,
-            target_object_id=instance.post.id, 
-        )
+    if created:
+        enqueue_notification({
+            "kind": "comment",
+            "from_user_id": str(instance.user_id),
+            "post_id": str(instance.post_id),
+        })
 
 
 @receiver(post_save, sender=Post)
 def create_retweet_notification(sender, instance, created, **kwargs):
-    if created and instance.retweet:
-        original_author = instance.retweet.user
-        if instance.user != original_author:
-            Notification.objects.create(
-                type=Notification.RETWEET,
-                from_user=instance.user,
-                to_user=original_author,
-                target_post_id=instance.retweet.id,
-                target_object_id=instance.retweet.id, 
-            )
+    if created and instance.retweet_id:
+        enqueue_notification({
+            "kind": "retweet",
+            "from_user_id": str(instance.user_id),
+            "post_id": str(instance.retweet_id),
+        })
 
 
 @receiver(post_save, sender=Follow)
 def create_follow_notification(sender, instance, created, **kwargs):
-    if created and instance.follower != instance.following:
-        Notification.objects.create(
-            type=Notification.FOLLOW,
-            from_user=instance.follower,
-            to_user=instance.following,
-            target_post_id=None, # Não aplicável para follow
-            target_object_id=None, # Não aplicável para follow
-        )
+    if created and instance.follower_id != instance.following_id:
+        enqueue_notification({
+            "kind": "follow",
+            "from_user_id": str(instance.follower_id),
+            "to_user_id": str(instance.following_id),
+        })
 
 
 @receiver(post_save, sender=Post)
 @receiver(post_save, sender=Comment)
 def create_mention_notification(sender, instance, created, **kwargs):
-    if not created: 
+    if not created or not instance.content:
         return
 
-    content_to_scan = ""
-    target_post_id = None
-    target_object_id = None 
-
     if isinstance(instance, Post):
-        content_to_scan = instance.content
-        target_post_id = instance.id 
-        target_object_id = instance.id 
+        target_post_id = instance.id
     elif isinstance(instance, Comment):
-        content_to_scan = instance.content
-        target_post_id = instance.post.id 
-        target_object_id = instance.id 
+        target_post_id = instance.post_id
     else:
-        return 
+        return
 
-    if not content_to_scan: 
+    # usernames resolvidos no pipeline com um único IN
+    # tokenizer compartilhado com a extração de hashtags (mesmo save, uma passada)
+    _, mentions = content_tokens(instance)
+    usernames = sorted(mentions)
+    if not usernames:
         return
 
-    mentions_found = re.findall(r'@(\w+)', content_to_scan)
-    unique_mentions = set(mentions_found)
-
-    for username in unique_mentions:
-        try:
-            mentioned_user = User.objects.get(username__iexact=username)
-            
-            if instance.user != mentioned_user:
-                Notification.objects.create(
-                    type=Notification.MENTION,
-                    from_user=instance.user, 
-                    to_user=mentioned_user,
-                    target_post_id=target_post_id, 
-                    target_object_id=target_object_id 
-                )
-        except User.DoesNotExist:
-            pass
\ No newline at end of file
+    enqueue_notification({
+        "kind": "mention",
+        "from_user_id": str(instance.user_id),
+        "usernames": usernames,
+        "target_post_id": str(target_post_id),
+        "target_object_id": str(instance.id),
+    })
@@ -1,21 +1,40 @@
 # notifications/tests/test_notification_view.py
 
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from asgiref.sync import sync_to_async
+
 from rest_framework.test import APITestCase
 from rest_framework import status
 from django.urls import reverse
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import override_settings
+from django.utils import timezone
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import AccessToken
 
+from likes.models import Like
 from likes.tests.factories import LikeFactory
 from comments.tests.factories import CommentFactory
 from posts.tests.factories import PostFactory
 from follows.tests.factories import FollowFactory
 from accounts.tests.factories import UserFactory
-from notifications.models import Notification
+from notifications.models import Notification, NotificationGroup, NotificationOutbox, NotificationState
 from notifications.tests.factories import NotificationFactory
+from notifications.pipeline import process_intents
+from notifications.pubsub import publish_notifications
+from notifications.views.notification_stream_view import _user_for_ticket, issue_stream_ticket
+from notifications import grouping
 
 User = get_user_model()
 
 
+# InlineBackend: intenções processadas no on_commit (captureOnCommitCallbacks)
+@override_settings(NOTIFICATIONS_BACKEND="notifications.pipeline.InlineBackend")
 class NotificationTests(APITestCase):
     def setUp(self):
         self.user = UserFactory()
@@ -23,6 +42,8 @@ class NotificationTests(APITestCase):
         self.client.force_authenticate(user=self.user)
         self.list_url = reverse('notifications-list')
         self.mark_all_as_read_url = reverse('mark-all-as-read')
+        self.unread_count_url = reverse('notifications-unread-count')
+        self.mark_read_url = reverse('notifications-mark-read')
 
     
     
@@ -39,7 +60,8 @@ class NotificationTests(APITestCase):
 
     def test_like_post_creates_notification(self):
         post = PostFactory(user=self.other_user)
-        LikeFactory(user=self.user, post=post)
+        with self.captureOnCommitCallbacks(execute=True):
+            LikeFactory(user=self.user, post=post)
         notification = Notification.objects.get(to_user=self.other_user)
         self.assertEqual(notification.type, Notification.LIKE)
         self.assertEqual(notification.from_user, self.user)
@@ -50,7 +72,8 @@ class NotificationTests(APITestCase):
     def test_like_comment_creates_notification(self):
         post = PostFactory(user=self.other_user)
         comment = CommentFactory(user=self.other_user, post=post)
-        LikeFactory(user=self.user, comment=comment, post=None)
+        with self.captureOnCommitCallbacks(execute=True):
+            LikeFactory(user=self.user, comment=comment, post=None)
         notification = Notification.objects.get(to_user=self.other_user)
         self.assertEqual(notification.type, Notification.LIKE)
         self.assertEqual(notification.from_user, self.user)
@@ -61,7 +84,8 @@ class NotificationTests(APITestCase):
     
     def test_comment_creates_notification(self):
         post = PostFactory(user=self.other_user)
-        CommentFactory(user=self.user, post=post)
+        with self.captureOnCommitCallbacks(execute=True):
+            CommentFactory(user=self.user, post=post)
         notification = Notification.objects.get(to_user=self.other_user)
         self.assertEqual(notification.type, Notification.COMMENT)
         self.assertEqual(notification.from_user, self.user)
@@ -70,7 +94,8 @@ class NotificationTests(APITestCase):
     
     
     def test_follow_creates_notification(self):
-        FollowFactory(follower=self.user, following=self.other_user)
+        with self.captureOnCommitCallbacks(execute=True):
+            FollowFactory(follower=self.user, following=self.other_user)
         notification = Notification.objects.get(to_user=self.other_user)
         self.assertEqual(notification.type, Notification.FOLLOW)
         self.assertEqual(notification.from_user, self.user)
@@ -81,7 +106,8 @@ class NotificationTests(APITestCase):
     
     def test_retweet_creates_notification(self):
         original_post = PostFactory(user=self.other_user)
-        PostFactory(user=self.user, retweet=original_post)
+        with self.captureOnCommitCallbacks(execute=True):
+            PostFactory(user=self.user, retweet=original_post)
         notification = Notification.objects.get(to_user=self.other_user)
         self.assertEqual(notification.type, Notification.RETWEET)
         self.assertEqual(notification.from_user, self.user)
@@ -91,7 +117,8 @@ class NotificationTests(APITestCase):
     
     def test_mention_in_post_creates_notification(self):
         mentioned_user = UserFactory(username="mentioneduser")
-        PostFactory(user=self.user, content=f"Hello @{mentioned_user.username}")
+        with self.captureOnCommitCallbacks(execute=True):
+            PostFactory(user=self.user, content=f"Hello @{mentioned_user.username}")
         notification = Notification.objects.get(to_user=mentioned_user)
         self.assertEqual(notification.type, Notification.MENTION)
         self.assertEqual(notification.from_user, self.user)
@@ -101,7 +128,8 @@ class NotificationTests(APITestCase):
     def test_mention_in_comment_creates_notification(self):
         mentioned_user = UserFactory(username="mentioneduser")
         post = PostFactory(user=self.other_user)
-        CommentFactory(user=self.user, post=post, content=f"Hello @{mentioned_user.username}")
+        with self.captureOnCommitCallbacks(execute=True):
+            CommentFactory(user=self.user, post=post, content=f"Hello @{mentioned_user.username}")
         notification = Notification.objects.get(to_user=mentioned_user)
         self.assertEqual(notification.type, Notification.MENTION)
         self.assertEqual(notification.from_user, self.user)
@@ -109,6 +137,214 @@ class NotificationTests(APITestCase):
 
     
     
+    def test_mentions_resolved_in_single_batch(self):
+        first = UserFactory(username="firstmention")
+        second = UserFactory(username="secondmention")
+        with self.captureOnCommitCallbacks() as callbacks:
+            PostFactory(user=self.user, content="@FirstMention @secondmention @firstmention @nobody @" + self.user.username)
+        with CaptureQueriesContext(connection) as queries:
+            with self.captureOnCommitCallbacks(execute=True):
+                for callback in callbacks:
+                    callback()
+        # 1 IN com os usernames, 1 bulk_create, grupos (select + insert),
+        # não lidas (insert + update); savepoints da transação não contam
+        statements = [
+            query['sql'] for query in queries.captured_queries
+            if not query['sql'].startswith(('SAVEPOINT', 'RELEASE SAVEPOINT'))
+        ]
+        self.assertEqual(len(statements), 6, statements)
+        self.assertEqual(Notification.objects.filter(type=Notification.MENTION).count(), 2)
+        self.assertTrue(Notification.objects.filter(to_user=first).exists())
+        self.assertTrue(Notification.objects.filter(to_user=second).exists())
+
+    
+    
+    def test_rolled_back_write_creates_no_notification(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    FollowFactory(follower=self.user, following=self.other_user)
+                    raise RuntimeError("rollback")
+            except RuntimeError:
+                pass
+        self.assertFalse(Notification.objects.exists())
+
+    
+    
+    @override_settings(NOTIFICATIONS_BACKEND="notifications.pipeline.OutboxBackend")
+    def test_outbox_backend_defers_to_command(self):
+        FollowFactory(follower=self.user, following=self.other_user)
+        self.assertEqual(NotificationOutbox.objects.count(), 1)
+        self.assertFalse(Notification.objects.exists())
+
+        call_command("process_notification_outbox", stdout=StringIO())
+        self.assertFalse(NotificationOutbox.objects.exists())
+        self.assertEqual(Notification.objects.get(to_user=self.other_user).type, Notification.FOLLOW)
+
+    
+    
+    def test_failed_batch_is_rolled_back_and_bad_outbox_row_does_not_block(self):
+        follow = {"kind": "follow", "from_user_id": str(self.user.id), "to_user_id": str(self.other_user.id)}
+        # falha depois do bulk_create: nada do lote fica gravado
+        with patch('notifications.pipeline.increment_unread', side_effect=RuntimeError("boom")):
+            with self.assertRaises(RuntimeError):
+                process_intents([follow])
+        self.assertFalse(Notification.objects.exists())
+        self.assertFalse(NotificationGroup.objects.exists())
+
+        bad = NotificationOutbox.objects.create(payload={**follow, "to_user_id": "not-a-uuid"})
+        NotificationOutbox.objects.create(payload=follow)
+        out = StringIO()
+        with patch('builtins.print'):
+            call_command("process_notification_outbox", max_attempts=2, stdout=out)
+
+        self.assertIn('Processed 1 ', out.getvalue())
+        self.assertIn('1 notification intent(s) failed', out.getvalue())
+        self.assertEqual(list(NotificationOutbox.objects.all()), [bad])
+        bad.refresh_from_db()
+        self.assertEqual(bad.attempts, 1)
+        self.assertGreater(bad.next_attempt_at, timezone.now())
+        self.assertEqual(Notification.objects.get(to_user=self.other_user).type, Notification.FOLLOW)
+        self.assertEqual(NotificationState.objects.get(user=self.other_user).unread_count, 1)
+
+        # em backoff: não é lida de novo até next_attempt_at
+        with patch('builtins.print'):
+            call_command("process_notification_outbox", max_attempts=2, stdout=StringIO())
+        bad.refresh_from_db()
+        self.assertEqual(bad.attempts, 1)
+
+        # backoff vencido: nova tentativa; com max_attempts deixa de ser lida
+        NotificationOutbox.objects.update(next_attempt_at=timezone.now())
+        with patch('builtins.print'):
+            call_command("process_notification_outbox", max_attempts=2, stdout=StringIO())
+            call_command("process_notification_outbox", max_attempts=2, stdout=StringIO())
+        bad.refresh_from_db()
+        self.assertEqual(bad.attempts, 2)
+
+    
+    
+    
+    # Testes de agregação (NotificationGroup)
+
+    def test_likes_on_same_post_are_grouped(self):
+        post = PostFactory(user=self.user)
+        likers = UserFactory.create_batch(5)
+        with self.captureOnCommitCallbacks(execute=True):
+            for liker in likers:
+                LikeFactory(user=liker, post=post)
+
+        self.assertEqual(Notification.objects.filter(to_user=self.user).count(), 5)
+        group = NotificationGroup.objects.get(to_user=self.user)
+        self.assertEqual(group.type, Notification.LIKE)
+        self.assertEqual(group.actor_count, 5)
+        self.assertEqual(group.target_object_id, post.id)
+        self.assertEqual(group.last_actors, [str(liker.id) for liker in reversed(likers)][:3])
+
+    
+    
+    def test_group_is_upserted_across_batches(self):
+        post = PostFactory(user=self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            LikeFactory(user=self.other_user, post=post)
+        NotificationGroup.objects.update(is_read=True)
+
+        third_user = UserFactory()
+        with self.captureOnCommitCallbacks(execute=True):
+            LikeFactory(user=third_user, post=post)
+
+        group = NotificationGroup.objects.get(to_user=self.user)
+        self.assertEqual(group.actor_count, 2)
+        self.assertEqual(group.last_actors, [str(third_user.id), str(self.other_user.id)])
+        self.assertFalse(group.is_read)
+
+    
+    
+    def test_group_created_concurrently_is_updated_on_retry(self):
+        post = PostFactory(user=self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            LikeFactory(user=self.other_user, post=post)
+
+        # outro worker criou o grupo depois do select: o primeiro upsert não o enxerga
+        real_existing = grouping._existing_groups
+        calls = []
+
+        def existing_after_race(pending):
+            calls.append(pending)
+            return {} if len(calls) == 1 else real_existing(pending)
+
+        third_user = UserFactory()
+        with patch.object(grouping, '_existing_groups', side_effect=existing_after_race):
+            with self.captureOnCommitCallbacks(execute=True):
+                LikeFactory(user=third_user, post=post)
+
+        self.assertEqual(len(calls), 2)
+        group = NotificationGroup.objects.get(to_user=self.user)
+        self.assertEqual(group.actor_count, 2)
+        self.assertEqual(group.last_actors, [str(third_user.id), str(self.other_user.id)])
+
+    
+    
+    def test_follow_group_created_concurrently_is_updated_on_retry(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            FollowFactory(follower=self.other_user, following=self.user)
+
+        # grupo sem alvo (target_object_id NULL): a constraint parcial força o retry
+        real_existing = grouping._existing_groups
+        calls = []
+
+        def existing_after_race(pending):
+            calls.append(pending)
+            return {} if len(calls) == 1 else real_existing(pending)
+
+        third_user = UserFactory()
+        with patch.object(grouping, '_existing_groups', side_effect=existing_after_race):
+            with self.captureOnCommitCallbacks(execute=True):
+                FollowFactory(follower=third_user, following=self.user)
+
+        self.assertEqual(len(calls), 2)
+        group = NotificationGroup.objects.get(to_user=self.user, type=Notification.FOLLOW)
+        self.assertIsNone(group.target_object_id)
+        self.assertEqual(group.actor_count, 2)
+
+    
+    
+    def test_actor_outside_last_actors_is_not_counted_again(self):
+        post = PostFactory(user=self.user)
+        likers = UserFactory.create_batch(4)
+        for liker in likers:
+            with self.captureOnCommitCallbacks(execute=True):
+                LikeFactory(user=liker, post=post)
+
+        # o primeiro ator saiu de last_actors (3) e curte de novo
+        Like.objects.filter(user=likers[0], post=post).delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            LikeFactory(user=likers[0], post=post)
+
+        group = NotificationGroup.objects.get(to_user=self.user)
+        self.assertEqual(group.actor_count, 4)
+        self.assertEqual(group.last_actors[0], str(likers[0].id))
+
+    
+    
+    def test_grouped_list_returns_groups(self):
+        post = PostFactory(user=self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            for liker in UserFactory.create_batch(4):
+                LikeFactory(user=liker, post=post)
+            FollowFactory(follower=self.other_user, following=self.user)
+
+        response = self.client.get(self.list_url, {'grouped': 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data['results']
+        self.assertEqual(len(results), 2)
+        like_group = next(group for group in results if group['type'] == Notification.LIKE)
+        self.assertEqual(like_group['actorCount'], 4)
+        self.assertEqual(len(like_group['actors']), 3)
+        self.assertEqual(like_group['targetObjectId'], str(post.id))
+        self.assertFalse(like_group['isRead'])
+
+    
+    
     
     # Testes de atualização
 
@@ -130,4 +366,158 @@ class NotificationTests(APITestCase):
         response = self.client.patch(url, data, format='json')
         other_notification.refresh_from_db()
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
-        self.assertFalse(other_notification.is_read)
\ No newline at end of file
+        self.assertFalse(other_notification.is_read)
+
+    
+    
+    
+    # Testes de contador de não lidas e marca d'água
+
+    def test_unread_count_is_incremented_by_pipeline(self):
+        post = PostFactory(user=self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            LikeFactory(user=self.other_user, post=post)
+            CommentFactory(user=self.other_user, post=post)
+
+        # leitura do contador: uma única query
+        with self.assertNumQueries(1):
+            response = self.client.get(self.unread_count_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 2)
+
+    
+    
+    def test_mark_all_as_read_uses_watermark(self):
+        post = PostFactory(user=self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            LikeFactory(user=self.other_user, post=post)
+
+        response = self.client.patch(self.mark_all_as_read_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(self.unread_count_url).data['count'], 0)
+
+        # linhas antigas não são reescritas; isRead vem da marca d'água
+        self.assertTrue(Notification.objects.filter(to_user=self.user, is_read=False).exists())
+        response = self.client.get(self.list_url)
+        self.assertTrue(all(item['isRead'] for item in response.data['results']))
+
+    
+    
+    def test_mark_read_until_timestamp(self):
+        old = NotificationFactory(to_user=self.user)
+        new = NotificationFactory(to_user=self.user)
+        Notification.objects.filter(pk=new.pk).update(timestamp=old.timestamp + timedelta(minutes=5))
+
+        response = self.client.post(self.mark_read_url, {'until': old.timestamp.isoformat()}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['unreadCount'], 1)
+        self.assertEqual(NotificationState.objects.get(user=self.user).unread_count, 1)
+
+        results = {item['id']: item['isRead'] for item in self.client.get(self.list_url).data['results']}
+        self.assertTrue(results[str(old.id)])
+        self.assertFalse(results[str(new.id)])
+
+    
+    
+    def test_mark_read_until_future_is_clamped_to_now(self):
+        future = timezone.now() + timedelta(days=1)
+        response = self.client.post(self.mark_read_url, {'until': future.isoformat()}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertLessEqual(NotificationState.objects.get(user=self.user).read_through, timezone.now())
+
+        # chegou depois da marcação: continua não lida
+        NotificationFactory(to_user=self.user)
+        response = self.client.get(self.list_url)
+        self.assertFalse(response.data['results'][0]['isRead'])
+
+    
+    
+    def test_mark_read_with_invalid_timestamp_fails(self):
+        response = self.client.post(self.mark_read_url, {'until': 'yesterday'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    
+    
+    
+    # Testes do stream em tempo real (SSE)
+
+    async def test_stream_requires_authentication(self):
+        response = await self.async_client.get(reverse('notifications-stream'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        # access token não é aceito na URL
+        token = str(AccessToken.for_user(self.user))
+        response = await self.async_client.get(reverse('notifications-stream'), {'token': token})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    
+    
+    def test_stream_ticket_is_signed_and_short_lived(self):
+        response = self.client.post(reverse('notifications-stream-ticket'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        ticket = response.data['ticket']
+
+        self.assertEqual(_user_for_ticket(ticket), self.user)
+        self.assertIsNone(_user_for_ticket(ticket + 'x'))
+        with override_settings(NOTIFICATIONS_STREAM_TICKET_SECONDS=-1):
+            self.assertIsNone(_user_for_ticket(ticket))
+
+        self.client.force_authenticate(user=None)
+        response = self.client.post(reverse('notifications-stream-ticket'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    
+    
+    async def test_stream_sends_backlog_then_published_notifications(self):
+        old = await sync_to_async(NotificationFactory)(to_user=self.user)
+        ticket = await sync_to_async(issue_stream_ticket)(self.user)
+        since = (old.timestamp - timedelta(seconds=1)).isoformat()
+
+        response = await self.async_client.get(
+            reverse('notifications-stream'), {'ticket': ticket, 'since': since}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+        stream = aiter(response.streaming_content)
+        try:
+            self.assertTrue((await anext(stream)).startswith(b'retry:'))
+            self.assertIn(str(old.id).encode(), await anext(stream))
+
+            new = await sync_to_async(NotificationFactory)(to_user=self.user)
+            publish_notifications([new])
+            event = await anext(stream)
+            self.assertIn(b'event: notification', event)
+            self.assertIn(str(new.id).encode(), event)
+        finally:
+            await stream.aclose()
+
+
+    
+    
+    async def test_stream_cursor_breaks_timestamp_ties_by_id(self):
+        notifications = await sync_to_async(NotificationFactory.create_batch)(2, to_user=self.user)
+        timestamp = notifications[0].timestamp
+        await Notification.objects.filter(pk__in=[n.pk for n in notifications]).aupdate(timestamp=timestamp)
+        first, second = sorted(notifications, key=lambda notification: notification.id)
+        first.timestamp = second.timestamp = timestamp
+        ticket = await sync_to_async(issue_stream_ticket)(self.user)
+
+        # cursor do último evento entregue: mesmo timestamp, id do primeiro
+        cursor = f"{first.timestamp.isoformat()}|{first.id}"
+        response = await self.async_client.get(
+            reverse('notifications-stream'), {'ticket': ticket}, headers={'Last-Event-ID': cursor}
+        )
+        stream = aiter(response.streaming_content)
+        try:
+            await anext(stream)
+            event = await anext(stream)
+            self.assertIn(str(second.id).encode(), event)
+            self.assertIn(f"id: {first.timestamp.isoformat()}|{second.id}".encode(), event)
+        finally:
+            await stream.aclose()
+
+        response = await self.async_client.get(
+            reverse('notifications-stream'), {'ticket': ticket, 'since': f"{first.timestamp.isoformat()}|x"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
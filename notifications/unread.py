@@ -0,0 +1,83 @@
+# notifications/unread.py
+
+# contador de não lidas e marca d'água de leitura (NotificationState)
+# uma notificação é lida quando is_read=True ou timestamp <= read_through
+
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Notification, NotificationState
+
+
+def get_state(user):
+    state, _ = NotificationState.objects.get_or_create(user=user)
+    return state
+
+
+def read_through_for(user):
+    return (
+        NotificationState.objects.filter(user=user)
+        .values_list("read_through", flat=True)
+        .first()
+    )
+
+
+def is_read(instance, read_through):
+    return instance.is_read or (read_through is not None and instance.timestamp <= read_through)
+
+
+# chamado pelo pipeline após o bulk_create
+# um UPDATE por quantidade distinta de notificações novas (normalmente 1 ou 2)
+def increment_unread(notifications):
+    counts = Counter(str(notification.to_user_id) for notification in notifications)
+    if not counts:
+        return
+
+    NotificationState.objects.bulk_create(
+        [NotificationState(user_id=user_id) for user_id in counts],
+        ignore_conflicts=True,
+    )
+
+    by_amount = {}
+    for user_id, amount in counts.items():
+        by_amount.setdefault(amount, []).append(user_id)
+    for amount, user_ids in by_amount.items():
+        NotificationState.objects.filter(user_id__in=user_ids).update(
+            unread_count=F("unread_count") + amount
+        )
+
+
+# recalcula o contador a partir das notificações depois da marca d'água
+# (índice parcial notification_unread_idx)
+def count_unread(user, read_through):
+    queryset = Notification.objects.filter(to_user=user, is_read=False)
+    if read_through is not None:
+        queryset = queryset.filter(timestamp__gt=read_through)
+    return queryset.count()
+
+
+def refresh_unread_count(user):
+    get_state(user)
+    with transaction.atomic():
+        state = NotificationState.objects.select_for_update().get(pk=user.pk)
+        state.unread_count = count_unread(user, state.read_through)
+        state.save(update_fields=["unread_count"])
+    return state
+
+
+# avança a marca d'água até "until" (nunca retrocede)
+# until no futuro vale como agora: notificações que ainda vão chegar não nascem lidas
+# nenhuma linha de Notification é reescrita
+def mark_read(user, until):
+    until = min(until, timezone.now())
+    get_state(user)
+    with transaction.atomic():
+        state = NotificationState.objects.select_for_update().get(pk=user.pk)
+        if state.read_through is None or until > state.read_through:
+            state.read_through = until
+        state.unread_count = count_unread(user, state.read_through)
+        state.save(update_fields=["read_through", "unread_count"])
+    return state
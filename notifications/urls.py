@@ -3,13 +3,20 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
-from .views import MarkAllAsReadView
+from .views import MarkAllAsReadView, NotificationStreamTicketView, NotificationStreamView
 from .viewsets import NotificationViewSet
 
 router = DefaultRouter()
 router.register(r"notifications", NotificationViewSet, basename="notifications")
 
 urlpatterns = [
+    # antes do router: "stream" não é um pk de notificação
+    path("notifications/stream/", NotificationStreamView.as_view(), name="notifications-stream"),
+    path(
+        "notifications/stream/ticket/",
+        NotificationStreamTicketView.as_view(),
+        name="notifications-stream-ticket",
+    ),
     path("", include(router.urls)),
     path("mark_all_as_read/", MarkAllAsReadView.as_view(), name="mark-all-as-read"),
 ]
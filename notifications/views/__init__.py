@@ -1 +1,2 @@
 from .notification_view import MarkAllAsReadView
+from .notification_stream_view import NotificationStreamTicketView, NotificationStreamView
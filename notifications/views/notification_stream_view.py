@@ -0,0 +1,188 @@
+# notifications/views/notification_stream_view.py
+
+# stream de notificações em tempo real (Server-Sent Events)
+# GET /api/notifications/stream/?ticket=<ticket>&since=<timestamp ISO 8601>[|<id>]
+# view assíncrona do Django (não DRF): servida pelo config.asgi
+#
+# - autenticação JWT pelo header Authorization ou ?ticket= (EventSource não envia
+#   headers): ticket assinado de curta duração, obtido com o JWT em
+#   POST /api/notifications/stream/ticket/; o access token nunca vai na URL
+#   (nem nos logs de acesso); reconexão depois da validade pede um ticket novo
+# - since / Last-Event-ID: envia primeiro as notificações posteriores ao cursor
+#   cursor = timestamp|id do último evento (id desempata notificações com o
+#   mesmo timestamp no limite de uma página); só o timestamp também é aceito
+# - depois só consulta o db quando o pub/sub acorda a conexão;
+#   conexão ociosa recebe apenas comentários de keep-alive
+
+import asyncio
+import json
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.views import View
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from ..models import Notification
+from ..pagination import NotificationCursorPagination
+from ..pubsub import get_broker
+from ..serializers import NotificationSerializer
+from ..unread import read_through_for
+
+
+User = get_user_model()
+
+STREAM_TICKET_SALT = "notifications.stream.ticket"
+
+
+def issue_stream_ticket(user):
+    return signing.TimestampSigner(salt=STREAM_TICKET_SALT).sign(str(user.pk))
+
+
+# usuário do ticket; None se inválido ou vencido
+def _user_for_ticket(ticket):
+    try:
+        user_id = signing.TimestampSigner(salt=STREAM_TICKET_SALT).unsign(
+            ticket, max_age=settings.NOTIFICATIONS_STREAM_TICKET_SECONDS
+        )
+    except signing.BadSignature:
+        return None
+    return User.objects.filter(pk=user_id, is_active=True).first()
+
+
+def _authenticate(request):
+    ticket = request.GET.get("ticket")
+    if ticket:
+        return _user_for_ticket(ticket)
+
+    auth = JWTAuthentication()
+    try:
+        result = auth.authenticate(request)
+        return result[0] if result else None
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        return None
+
+
+# POST /api/notifications/stream/ticket/ (JWT no header Authorization)
+class NotificationStreamTicketView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        return Response({
+            "ticket": issue_stream_ticket(request.user),
+            "expiresIn": settings.NOTIFICATIONS_STREAM_TICKET_SECONDS,
+        })
+
+
+CURSOR_SEPARATOR = "|"
+
+
+# "timestamp|id" (ou só timestamp) -> (timestamp, id | None); None se inválido
+def _parse_cursor(value):
+    timestamp, _, notification_id = value.partition(CURSOR_SEPARATOR)
+    timestamp = parse_datetime(timestamp)
+    if timestamp is None:
+        return None
+    if timezone.is_naive(timestamp):
+        timestamp = timezone.make_aware(timestamp)
+    if not notification_id:
+        return timestamp, None
+    try:
+        return timestamp, uuid.UUID(notification_id)
+    except ValueError:
+        return None
+
+
+# notificações do usuário posteriores ao cursor (timestamp, id), mais antigas primeiro
+# retorna (eventos SSE, novo cursor)
+def _fetch_events(request, user, cursor):
+    since, since_id = cursor
+    after = Q(timestamp__gt=since)
+    if since_id is not None:
+        after |= Q(timestamp=since, id__gt=since_id)
+    notifications = list(
+        Notification.objects.filter(after, to_user=user)
+        .select_related("from_user")
+        .order_by("timestamp", "id")[: NotificationCursorPagination.page_size]
+    )
+    if not notifications:
+        return [], cursor
+
+    context = {"request": request, "read_through": read_through_for(user)}
+    data = NotificationSerializer(notifications, many=True, context=context).data
+    events = [
+        f"id: {notification.timestamp.isoformat()}{CURSOR_SEPARATOR}{notification.id}\n"
+        f"event: notification\n"
+        f"data: {json.dumps(item, cls=DjangoJSONEncoder)}\n\n"
+        for notification, item in zip(notifications, data)
+    ]
+    return events, (notifications[-1].timestamp, notifications[-1].id)
+
+
+class NotificationStreamView(View):
+    async def get(self, request):
+        user = await sync_to_async(_authenticate)(request)
+        if user is None:
+            return JsonResponse(
+                {"detail": "Authentication credentials were not provided or are invalid."},
+                status=401,
+            )
+
+        since = request.GET.get("since") or request.headers.get("Last-Event-ID")
+        if since:
+            cursor = _parse_cursor(since)
+            if cursor is None:
+                return JsonResponse({"since": ["Invalid cursor."]}, status=400)
+        else:
+            cursor = (timezone.now(), None)
+
+        response = StreamingHttpResponse(
+            self.stream(request, user, cursor), content_type="text/event-stream"
+        )
+        response["Cache-Control"] = "no-cache"
+        # nginx: não bufferizar o stream
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    async def stream(self, request, user, cursor):
+        broker = get_broker()
+        # assina antes do backlog: nada publicado no meio se perde
+        subscription = broker.subscribe(user.id)
+        fetch = sync_to_async(_fetch_events)
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                # backlog / notificações novas desde o cursor
+                events, cursor = await fetch(request, user, cursor)
+                for event in events:
+                    yield event
+                if len(events) == NotificationCursorPagination.page_size:
+                    continue
+
+                # espera um aviso do pub/sub (sem query enquanto ocioso)
+                try:
+                    await asyncio.wait_for(
+                        subscription.queue.get(),
+                        timeout=settings.NOTIFICATIONS_STREAM_HEARTBEAT_SECONDS,
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+
+                # vários avisos acumulados resultam em uma única busca
+                while not subscription.queue.empty():
+                    subscription.queue.get_nowait()
+        finally:
+            broker.unsubscribe(subscription)
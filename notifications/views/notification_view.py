@@ -1,16 +1,21 @@
 # notifications/views/notification_view.py
 
+from django.utils import timezone
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 
+from ..unread import mark_read
+
 
 class MarkAllAsReadView(APIView):
     permission_classes = [IsAuthenticated]
 
+    # avança a marca d'água de leitura até agora
+    # (não reescreve as notificações não lidas)
     def patch(self, request):
-        request.user.received_notifications.filter(is_read=False).update(is_read=True)
+        mark_read(request.user, timezone.now())
         return Response(
             {"message": "All notifications marked as read."}, status=status.HTTP_200_OK
         )
@@ -1,10 +1,14 @@
 # notifications/viewsets/notification_viewset.py
 
-from rest_framework import viewsets, permissions
+from django.utils import timezone
+from rest_framework import viewsets, permissions, serializers, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
 
-from ..models import Notification
-from ..serializers import NotificationSerializer
+from ..models import Notification, NotificationGroup
+from ..serializers import NotificationSerializer, NotificationGroupSerializer
 from ..pagination import NotificationCursorPagination
+from .. import unread
 
 
 class NotificationViewSet(viewsets.ModelViewSet):
@@ -14,5 +18,67 @@ class NotificationViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = NotificationCursorPagination 
 
+    # ?grouped=1: lista NotificationGroup ("Ana e mais 41 pessoas curtiram...")
+    # em vez de uma linha por notificação
+    def is_grouped(self):
+        return self.action == "list" and self.request.query_params.get("grouped") in ("1", "true")
+
     def get_queryset(self):
-        return super().get_queryset().filter(to_user=self.request.user)
\ No newline at end of file
+        if self.is_grouped():
+            return NotificationGroup.objects.filter(to_user=self.request.user).order_by("-timestamp")
+        return super().get_queryset().filter(to_user=self.request.user)
+
+    def get_serializer_class(self):
+        if self.is_grouped():
+            return NotificationGroupSerializer
+        return super().get_serializer_class()
+
+    # marca d'água de leitura do usuário: isRead das notificações antigas
+    # é calculado no serializer, sem UPDATE nas linhas
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.request.user.is_authenticated:
+            context["read_through"] = unread.read_through_for(self.request.user)
+        return context
+
+    # PATCH is_read de uma notificação: recalcula o contador
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        unread.refresh_unread_count(self.request.user)
+
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
+        unread.refresh_unread_count(self.request.user)
+
+
+    # GET /notifications/unread_count/
+    # leitura do contador mantido (NotificationState), sem COUNT nas notificações
+    @action(detail=False, methods=["get"], url_path="unread_count")
+    def unread_count(self, request):
+        state = unread.get_state(request.user)
+        return Response({"count": state.unread_count}, status=status.HTTP_200_OK)
+
+
+    # POST /notifications/mark_read/ {"until": "<timestamp ISO 8601>"}
+    # tudo com timestamp <= until passa a contar como lido
+    # sem "until": marca tudo até agora
+    @action(detail=False, methods=["post"], url_path="mark_read")
+    def mark_read(self, request):
+        field = serializers.DateTimeField()
+        until = request.data.get("until")
+        if until in (None, ""):
+            until = timezone.now()
+        else:
+            try:
+                until = field.to_internal_value(until)
+            except serializers.ValidationError as e:
+                return Response({"until": e.detail}, status=status.HTTP_400_BAD_REQUEST)
+
+        state = unread.mark_read(request.user, until)
+        return Response(
+            {
+                "readThrough": field.to_representation(state.read_through),
+                "unreadCount": state.unread_count,
+            },
+            status=status.HTTP_200_OK,
+        )
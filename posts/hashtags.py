@@ -0,0 +1,28 @@
+# posts/hashtags.py
+
+# sincronização da tabela PostHashtag com as hashtags do conteúdo do post
+
+from .models import PostHashtag
+
+
+# deixa as ligações do post iguais a hashtag_ids
+# (remove as que saíram na edição, cria as novas)
+def sync_post_hashtags(post, hashtag_ids):
+    hashtag_ids = set(hashtag_ids)
+    current = set(
+        PostHashtag.objects.filter(post=post).values_list("hashtag_id", flat=True)
+    )
+
+    removed = current - hashtag_ids
+    if removed:
+        PostHashtag.objects.filter(post=post, hashtag_id__in=removed).delete()
+
+    added = hashtag_ids - current
+    if added:
+        PostHashtag.objects.bulk_create(
+            [
+                PostHashtag(post=post, hashtag_id=hashtag_id, created_at=post.created_at)
+                for hashtag_id in added
+            ],
+            ignore_conflicts=True,
+        )
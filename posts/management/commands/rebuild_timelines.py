@@ -0,0 +1,30 @@
+# posts/management/commands/rebuild_timelines.py
+
+from django.core.management.base import BaseCommand
+
+from accounts.models import User
+from posts.timeline import rebuild_timeline
+
+
+class Command(BaseCommand):
+    # python manage.py help rebuild_timelines
+    help = 'Rebuilds the materialized "Following" timelines from the current follows and posts.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--username',
+            help='Rebuild only the timeline of this user.',
+        )
+
+    def handle(self, *args, **kwargs):
+        users = User.objects.all()
+        if kwargs['username']:
+            users = users.filter(username=kwargs['username'])
+
+        total = 0
+        # iterator(): não carrega todos os usuários em memória
+        for user in users.iterator(chunk_size=500):
+            rebuild_timeline(user)
+            total += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {total} timeline(s).'))
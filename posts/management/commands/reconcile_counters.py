@@ -0,0 +1,82 @@
+# posts/management/commands/reconcile_counters.py
+
+from django.core.management.base import BaseCommand
+from django.db.models import F, Q
+
+from config.counters import count_subquery
+from posts.models import Post
+from comments.models import Comment
+from likes.models import Like
+
+
+# contadores de cada model: campo -> (queryset contado, FK que aponta para o objeto)
+COUNTERS = {
+    Post: {
+        "like_count": (Like.objects.all(), "post"),
+        "comment_count": (Comment.objects.all(), "post"),
+        "retweet_count": (Post.objects.all(), "retweet"),
+    },
+    Comment: {
+        "like_count": (Like.objects.all(), "comment"),
+        "reply_count": (Comment.objects.all(), "parent_comment"),
+    },
+}
+
+
+class Command(BaseCommand):
+    # python manage.py help reconcile_counters
+    help = 'Repairs drift in the denormalized like/comment/reply/retweet counters of posts and comments.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of rows checked per batch.',
+        )
+
+    def handle(self, *args, **kwargs):
+        batch_size = kwargs['batch_size']
+
+        for model, counters in COUNTERS.items():
+            checked, repaired = self._reconcile(model, counters, batch_size)
+            self.stdout.write(self.style.SUCCESS(
+                f"{model.__name__}: {checked} row(s) checked, {repaired} repaired."
+            ))
+
+    def _reconcile(self, model, counters, batch_size):
+        actual = {
+            f"actual_{field}": count_subquery(queryset, fk)
+            for field, (queryset, fk) in counters.items()
+        }
+        # linha com drift: qualquer contador diferente da contagem real
+        drift = Q()
+        for field in counters:
+            drift |= ~Q(**{field: F(f"actual_{field}")})
+
+        checked = repaired = 0
+        last_pk = None
+
+        # paginação por keyset no pk: cada lote é um range do índice da PK
+        while True:
+            batch = model.objects.order_by("pk")
+            if last_pk is not None:
+                batch = batch.filter(pk__gt=last_pk)
+            pks = list(batch.values_list("pk", flat=True)[:batch_size])
+            if not pks:
+                break
+
+            checked += len(pks)
+            last_pk = pks[-1]
+
+            drifted = list(
+                model.objects.filter(pk__in=pks).annotate(**actual).filter(drift)
+                .values_list("pk", flat=True)
+            )
+            if drifted:
+                repaired += model.objects.filter(pk__in=drifted).update(**{
+                    field: count_subquery(queryset, fk)
+                    for field, (queryset, fk) in counters.items()
+                })
+
+        return checked, repaired
@@ -0,0 +1,81 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:17
+
+import django.db.models.deletion
+import re
+
+from django.db import migrations, models
+
+
+def populate_post_hashtags(apps, schema_editor):
+    Post = apps.get_model("posts", "Post")
+    PostHashtag = apps.get_model("posts", "PostHashtag")
+    Hashtag = apps.get_model("hashtags", "Hashtag")
+
+    posts = (
+        Post.objects.filter(content__contains="#")
+        .values_list("id", "content", "created_at")
+        .iterator(chunk_size=1000)
+    )
+    links = []
+    for post_id, content, created_at in posts:
+        for name in {name.lower() for name in re.findall(r"#(\w+)", content)}:
+            hashtag, _ = Hashtag.objects.get_or_create(name=name)
+            links.append(
+                PostHashtag(
+                    post_id=post_id, hashtag_id=hashtag.id, created_at=created_at
+                )
+            )
+    PostHashtag.objects.bulk_create(links, batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("hashtags", "0002_trends"),
+        ("posts", "0004_post_counters"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PostHashtag",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField()),
+                (
+                    "hashtag",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="post_hashtags",
+                        to="hashtags.hashtag",
+                    ),
+                ),
+                (
+                    "post",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="post_hashtags",
+                        to="posts.post",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-created_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["hashtag", "-created_at"],
+                        name="posts_posth_hashtag_2ef953_idx",
+                    )
+                ],
+                "unique_together": {("post", "hashtag")},
+            },
+        ),
+        migrations.RunPython(populate_post_hashtags, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,85 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:28
+
+import django.db.models.deletion
+import re
+from collections import Counter
+
+from django.db import migrations, models
+
+
+# PostgreSQL: coluna tsvector gerada (mantida pelo banco a cada escrita) + GIN
+# demais bancos: índice invertido PostSearchTerm para os posts existentes
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(
+            "ALTER TABLE posts_post ADD COLUMN IF NOT EXISTS search_vector tsvector "
+            "GENERATED ALWAYS AS (to_tsvector('simple', coalesce(content, ''))) STORED"
+        )
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS posts_post_search_vector_gin "
+            "ON posts_post USING gin (search_vector)"
+        )
+        return
+
+    Post = apps.get_model("posts", "Post")
+    PostSearchTerm = apps.get_model("posts", "PostSearchTerm")
+    rows = []
+    for post_id, content in Post.objects.values_list("id", "content").iterator(
+        chunk_size=1000
+    ):
+        terms = [
+            term
+            for term in re.findall(r"\w+", (content or "").lower())
+            if len(term) > 1
+        ]
+        rows.extend(
+            PostSearchTerm(post_id=post_id, term=term[:100], weight=weight)
+            for term, weight in Counter(terms).items()
+        )
+    PostSearchTerm.objects.bulk_create(rows, batch_size=1000)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS posts_post_search_vector_gin")
+        schema_editor.execute(
+            "ALTER TABLE posts_post DROP COLUMN IF EXISTS search_vector"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("posts", "0005_posthashtag"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PostSearchTerm",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("term", models.CharField(max_length=100)),
+                ("weight", models.PositiveIntegerField(default=1)),
+                (
+                    "post",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="search_terms",
+                        to="posts.post",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("term", "post")},
+            },
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("posts", "0006_post_search"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="media_renditions",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -1 +1,4 @@
 from .posts import Post
+from .timeline import TimelineEntry
+from .post_hashtag import PostHashtag
+from .search import PostSearchTerm
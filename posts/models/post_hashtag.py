@@ -0,0 +1,30 @@
+# posts/models/post_hashtag.py
+
+from django.db import models
+from hashtags.models import Hashtag
+from .posts import Post
+
+
+# ligação post <-> hashtag (índice invertido das hashtags)
+# mantida pelo signal de save do post (criação e edição); apagada em cascata
+# a timeline da hashtag é um index scan em (hashtag, -created_at)
+class PostHashtag(models.Model):
+    post = models.ForeignKey(
+        Post, on_delete=models.CASCADE, related_name="post_hashtags"
+    )
+    hashtag = models.ForeignKey(
+        Hashtag, on_delete=models.CASCADE, related_name="post_hashtags"
+    )
+
+    # cópia de post.created_at: ordenação/cursor sem JOIN com posts_post
+    created_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ("post", "hashtag")
+        indexes = [
+            models.Index(fields=["hashtag", "-created_at"]),
+        ]
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.post_id} #{self.hashtag_id}"
@@ -4,13 +4,18 @@ from django.db import models
 from accounts.models import User
 import uuid
 
+from config.tokens import TrackedContentMixin
+from uploads.storages import public_media_storage
 
-class Post(models.Model):
+
+class Post(TrackedContentMixin, models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="posts")
     content = models.TextField()
-    image = models.ImageField(upload_to="post_images/", blank=True, null=True)
-    video = models.FileField(upload_to="post_videos/", blank=True, null=True)
+    image = models.ImageField(upload_to="post_images/", storage=public_media_storage, blank=True, null=True)
+    video = models.FileField(upload_to="post_videos/", storage=public_media_storage, blank=True, null=True)
+    # renditions WebP/JPEG de image geradas pelo pipeline de mídia (uploads/renditions.py)
+    media_renditions = models.JSONField(default=dict, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     retweet = models.ForeignKey(
         "self",
@@ -20,8 +25,19 @@ class Post(models.Model):
         related_name="retweets",
     )
 
+    # contadores desnormalizados, mantidos por signals com F()
+    # (likes/signals.py, comments/signals.py, posts/signals.py)
+    # reconciliação: python manage.py reconcile_counters
+    like_count = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(default=0)
+    retweet_count = models.PositiveIntegerField(default=0)
+
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # posts recentes de um autor (backfill/pull-on-read da timeline e perfil)
+            models.Index(fields=['user', '-created_at']),
+        ]
 
     def __str__(self):
         return f"{self.user.username}: {self.content[:30]}"
@@ -0,0 +1,21 @@
+# posts/models/search.py
+
+from django.db import models
+from .posts import Post
+
+
+# índice invertido portátil da busca de posts (bancos sem full-text nativo)
+# uma linha por (termo, post) com a quantidade de ocorrências do termo
+# no PostgreSQL a busca usa a coluna tsvector gerada (migration 0006)
+class PostSearchTerm(models.Model):
+    post = models.ForeignKey(
+        Post, on_delete=models.CASCADE, related_name="search_terms"
+    )
+    term = models.CharField(max_length=100)
+    weight = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        unique_together = ("term", "post")
+
+    def __str__(self):
+        return f"{self.term} -> {self.post_id}"
@@ -0,0 +1,34 @@
+# posts/models/timeline.py
+
+from django.db import models
+from accounts.models import User
+from .posts import Post
+
+
+# entrada materializada do feed "Following" (fan-out on write)
+# cada post de um autor seguido vira uma linha na timeline de cada seguidor,
+# então a leitura do feed é um index scan em (owner, -created_at)
+class TimelineEntry(models.Model):
+    # dono da timeline (quem lê o feed)
+    owner = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="timeline_entries"
+    )
+    post = models.ForeignKey(
+        Post, on_delete=models.CASCADE, related_name="timeline_entries"
+    )
+    # autor do post, desnormalizado para evict em O(entradas do autor) no unfollow
+    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+
+    # cópia de post.created_at: ordenação/cursor sem JOIN com posts_post
+    created_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ("owner", "post")
+        indexes = [
+            models.Index(fields=["owner", "-created_at"]),
+            models.Index(fields=["owner", "author"]),
+        ]
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.owner_id} <- {self.post_id}"
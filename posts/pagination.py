@@ -5,4 +5,10 @@ class PostCursorPagination(CursorPagination):
     page_size = 25
     page_size_query_param = 'limit'
     cursor_query_param = 'cursor'
-    ordering = '-created_at'
\ No newline at end of file
+    ordering = '-created_at'
+
+
+# resultados da busca (/posts/search/): mais relevantes primeiro,
+# empates pelos mais recentes
+class PostSearchCursorPagination(PostCursorPagination):
+    ordering = ('-rank', '-created_at')
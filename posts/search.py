@@ -0,0 +1,74 @@
+# posts/search.py
+
+# busca full-text de posts (/posts/search/?q=)
+# - PostgreSQL: coluna gerada posts_post.search_vector (tsvector, config
+#   "simple") com índice GIN, criada na migration 0006; mantida pelo próprio
+#   banco a cada INSERT/UPDATE do content; ranking por ts_rank
+# - outros bancos: índice invertido PostSearchTerm, mantido pelo signal de
+#   save do post; ranking pela soma das ocorrências dos termos
+#
+# nos dois casos o queryset é anotado com "rank" para a paginação por cursor
+
+import re
+from collections import Counter
+
+from django.db import connection
+from django.db.models import BooleanField, Count, FloatField, OuterRef, Subquery, Sum, Value
+from django.db.models.expressions import RawSQL
+
+from .models import Post, PostSearchTerm
+
+WORD_RE = re.compile(r'\w+')
+MAX_QUERY_TERMS = 10
+# PostSearchTerm.term (max_length); termos maiores são truncados antes de
+# contar, então prefixos iguais viram o mesmo termo (uma linha por post)
+MAX_TERM_LENGTH = 100
+
+
+def search_terms(text):
+    return [term[:MAX_TERM_LENGTH] for term in WORD_RE.findall((text or "").lower()) if len(term) > 1]
+
+
+# signal de save: reescreve as linhas do post no índice invertido
+# (no PostgreSQL a coluna gerada dispensa esse trabalho)
+def index_post_for_search(post):
+    if connection.vendor == "postgresql":
+        return
+
+    PostSearchTerm.objects.filter(post=post).delete()
+    PostSearchTerm.objects.bulk_create([
+        PostSearchTerm(post=post, term=term, weight=weight)
+        for term, weight in Counter(search_terms(post.content)).items()
+    ])
+
+
+def search_posts(query):
+    if not search_terms(query):
+        return Post.objects.none().annotate(rank=Value(0.0, output_field=FloatField()))
+    if connection.vendor == "postgresql":
+        return _tsvector_search(query)
+    return _inverted_index_search(query)
+
+
+def _tsvector_search(query):
+    tsquery = "websearch_to_tsquery('simple', %s)"
+    return Post.objects.annotate(
+        matched=RawSQL(f"posts_post.search_vector @@ {tsquery}", [query], output_field=BooleanField()),
+        rank=RawSQL(f"ts_rank(posts_post.search_vector, {tsquery})::float8", [query], output_field=FloatField()),
+    ).filter(matched=True)
+
+
+# posts que contêm todos os termos da busca
+def _inverted_index_search(query):
+    terms = list(dict.fromkeys(search_terms(query)))[:MAX_QUERY_TERMS]
+    matches = (
+        PostSearchTerm.objects.filter(term__in=terms)
+        .values("post_id")
+        .annotate(matched_terms=Count("id"), score=Sum("weight"))
+        .filter(matched_terms=len(terms))
+    )
+    rank = matches.filter(post_id=OuterRef("pk")).values("score")
+
+    return Post.objects.filter(id__in=matches.values("post_id")).annotate(
+        rank=Subquery(rank, output_field=FloatField())
+    )
@@ -1,9 +1,13 @@
 # posts/serializers/post_serializer.py
 
+from django.db import models
 from rest_framework import serializers
 from ..models import Post
+from ..viewer_state import VIEWER_STATE, post_viewer_state, get_viewer_state
 from accounts.serializers import UserBasicSerializer
-from storages.backends.s3boto3 import S3Boto3Storage
+from config.expand import expand_requested
+from uploads.media_urls import media_url
+from uploads.serializers import MediaFileField, MediaImageField, MediaPipelineMixin, SrcsetField, UploadIntentField
 
 # *** PostSummarySerializer ***
 
@@ -18,6 +22,9 @@ class PostSummarySerializer(serializers.ModelSerializer):
     image = serializers.SerializerMethodField()
     video = serializers.SerializerMethodField()
 
+    # renditions WebP/JPEG de image (srcset), null até o pipeline de mídia terminar
+    image_srcset = SrcsetField("image")
+
     class Meta:
         # model de post.py
         model = Post
@@ -28,6 +35,7 @@ class PostSummarySerializer(serializers.ModelSerializer):
             "user", # somente dados relevantes do autor do post
             "content",
             "image",
+            "image_srcset",
             "video",
             "created_at",
         ]
@@ -41,32 +49,53 @@ class PostSummarySerializer(serializers.ModelSerializer):
     # Se obj.image | obj.video existir,
     # variável request será igual ao "request" (requisição HTTP atual) 
     # do contexto do serializador (contexto passado pela Viewset)
-    # Se a requisição existir, build_absolute_uri monta URL completa a ser retornada
-    # pelos campos serializados manualmente (image e video)
+    # Se a requisição existir, media_url (uploads/media_urls.py) monta a URL completa
+    # a partir da base do storage em cache (sem storage.url() por campo)
+    # a ser retornada pelos campos serializados manualmente (image e video)
     def get_image(self, obj):
-        if obj.image:
-            request = self.context.get('request')
-            if request is not None:
-                return request.build_absolute_uri(obj.image.url)
+        request = self.context.get('request')
+        if request is not None:
+            return media_url(obj.image, request)
         return None
 
     def get_video(self, obj):
-        if obj.video:
-            request = self.context.get('request')
-            if request is not None:
-                return request.build_absolute_uri(obj.video.url)
+        request = self.context.get('request')
+        if request is not None:
+            return media_url(obj.video, request)
         return None
 
 
+# *** PostListSerializer ***
+
+# list serializer de PostSerializer (many=True)
+# com ?expand=viewer_state, calcula hasLiked/hasRetweeted da página inteira
+# em uma única query antes de serializar cada post
+class PostListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        posts = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        if posts and expand_requested(self.context, VIEWER_STATE):
+            self.context.setdefault("post_viewer_state", {}).update(
+                post_viewer_state(self.context["request"].user, [post.id for post in posts])
+            )
+        return super().to_representation(posts)
+
+
 # *** PostSerializer ***
 
 # serializer principal pra um post completo
-class PostSerializer(serializers.ModelSerializer):
+# MediaPipelineMixin: image/video gravados em disco local e enviados ao storage
+# por workers (uploads/pipeline.py), fora da requisição
+class PostSerializer(MediaPipelineMixin, serializers.ModelSerializer):
     # dados de User relevantes para Post.
     user = UserBasicSerializer(read_only=True)
 
-    image = serializers.ImageField(required=False, allow_null=True)
-    video = serializers.FileField(required=False, allow_null=True)
+    image = MediaImageField(required=False, allow_null=True)
+    video = MediaFileField(required=False, allow_null=True)
+    image_srcset = SrcsetField("image")
+
+    # alternativa ao arquivo no corpo: id de um upload direto finalizado (uploads/direct.py)
+    image_upload = UploadIntentField("image")
+    video_upload = UploadIntentField("video")
 
     # entrada --> receber a ID do post original
     retweet_id = serializers.PrimaryKeyRelatedField(
@@ -82,8 +111,8 @@ class PostSerializer(serializers.ModelSerializer):
         read_only=True
     )
 
-    # já vem calculado do banco de dados (função count em post_viewset.py)
-    total_comments_count = serializers.SerializerMethodField(read_only=True)
+    # contadores desnormalizados do model (sem Count()/GROUP BY por página)
+    total_comments_count = serializers.IntegerField(source='comment_count', read_only=True)
 
     class Meta:
         model = Post
@@ -92,24 +121,42 @@ class PostSerializer(serializers.ModelSerializer):
             "user",
             "content",
             "image",
+            "image_srcset",
+            "image_upload",
             "video",
+            "video_upload",
             "retweet_id",
             "retweet",
             "created_at",
             "total_comments_count",
+            "like_count",
+            "retweet_count",
         ]
         read_only_fields = [
             "id",
             "user",
+            "image_srcset",
             "retweet",
             "created_at",
             "total_comments_count",
+            "like_count",
+            "retweet_count",
         ]
+        list_serializer_class = PostListSerializer
+
 
+    # ?expand=viewer_state: estado do usuário logado embutido no post
+    # likeCount vem da coluna desnormalizada, hasLiked/hasRetweeted do viewer_state pré-carregado
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
 
-    # função que retorna a contagem de comments pré-calculada por PostViewSet usando .annotate()
-    def get_total_comments_count(self, obj):
-        return getattr(obj, 'total_comments_count', 0)
+        if expand_requested(self.context, VIEWER_STATE):
+            state = get_viewer_state(self.context, "post_viewer_state", post_viewer_state, instance)
+            data["likeCount"] = instance.like_count
+            data["hasLiked"] = state.get("hasLiked", False)
+            data["hasRetweeted"] = state.get("hasRetweeted", False)
+
+        return data
 
     # sobrescrição da função create pra associar o usuário logado ao post automaticamente
     # validated_data: dicionário de dados já limpos e validados pelo serializer
@@ -118,12 +165,7 @@ class PostSerializer(serializers.ModelSerializer):
             # busca usuário logado e associa ao campo "user"
             validated_data["user"] = self.context["request"].user
 
-            image_file = validated_data.get('image')
-            if image_file:
-                new_storage = S3Boto3Storage(default_acl='public-read')
-                image_file.storage = new_storage
-                validated_data['image'] = image_file
-
+            # image/video: MediaPipelineMixin
             return super().create(validated_data)
         
         except Exception as e:
@@ -1,14 +1,76 @@
 # posts/signals.py
 
-import re
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from .models import Post
-from hashtags.models import Hashtag
+from .timeline import fan_out_post, backfill_timeline, evict_from_timeline
+from .hashtags import sync_post_hashtags
+from .search import index_post_for_search
+from hashtags.extraction import resolve_hashtags
+from hashtags.trends import record_hashtag_usage
+from follows.models import Follow
+from config.counters import adjust_counter
+from config.tokens import content_changed, content_tokens, mark_content_processed
+
+# CONTEÚDO DO POST: hashtags e índice de busca
+# um único receiver para que o texto só seja reprocessado quando mudou
+
+@receiver(post_save, sender=Post)
+def process_post_content(sender, instance, created, update_fields=None, **kwargs):
+    # edição sem mudança no texto: nada a reprocessar
+    if not content_changed(instance, created, update_fields):
+        return
+
+    extract_and_save_hashtags_from_post(instance, created)
+    index_post_for_search(instance)
+
+    mark_content_processed(instance)
+
+
+def extract_and_save_hashtags_from_post(instance, created):
+    hashtag_names, _ = content_tokens(instance)
+
+    # hashtags resolvidas em lote e ligadas ao post (PostHashtag)
+    # edição sem hashtags remove as ligações antigas
+    hashtag_ids = resolve_hashtags(hashtag_names).values()
+    if hashtag_ids or not created:
+        sync_post_hashtags(instance, hashtag_ids)
+
+    # trends: só conta o uso na criação (edição não é um novo uso)
+    if created:
+        record_hashtag_usage(hashtag_ids, instance.created_at)
+
+
+# CONTADOR DE RETWEETS (retweet_count do post original)
 
 @receiver(post_save, sender=Post)
-def extract_and_save_hashtags_from_post(sender, instance, created, **kwargs):
-    if instance.content:
-        hashtags_found = re.findall(r'#(\w+)', instance.content)
-        for hashtag_name in hashtags_found:
-            Hashtag.objects.get_or_create(name=hashtag_name.lower())
\ No newline at end of file
+def increment_retweet_count(sender, instance, created, **kwargs):
+    if created and instance.retweet_id:
+        adjust_counter(Post, instance.retweet_id, "retweet_count", 1)
+
+
+@receiver(post_delete, sender=Post)
+def decrement_retweet_count(sender, instance, **kwargs):
+    adjust_counter(Post, instance.retweet_id, "retweet_count", -1)
+
+
+# TIMELINE "FOLLOWING"
+
+# fan-out do post novo para as timelines dos seguidores do autor
+@receiver(post_save, sender=Post)
+def fan_out_post_to_timelines(sender, instance, created, **kwargs):
+    if created:
+        fan_out_post(instance)
+
+
+# follow: backfill dos posts recentes do autor seguido
+@receiver(post_save, sender=Follow)
+def backfill_timeline_on_follow(sender, instance, created, **kwargs):
+    if created:
+        backfill_timeline(instance.follower_id, instance.following_id)
+
+
+# unfollow: evict das entradas do autor deixado de seguir
+@receiver(post_delete, sender=Follow)
+def evict_timeline_on_unfollow(sender, instance, **kwargs):
+    evict_from_timeline(instance.follower_id, instance.following_id)
@@ -0,0 +1,147 @@
+# posts/timeline.py
+
+# timeline "Following" materializada
+# - fan-out on write: post novo é copiado para a timeline de cada seguidor
+# - pull-on-read: autores com muitos seguidores não fazem fan-out,
+#   os posts deles são puxados para a timeline do leitor quando o feed é lido
+# - follow/unfollow: backfill/evict das entradas do autor seguido
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max, Q
+
+from follows.models import Follow
+from .models import Post, TimelineEntry
+
+HIGH_FANOUT_AUTHORS_CACHE_KEY = "timeline:high_fanout_authors"
+
+
+def _build_entries(owner_ids, posts):
+    # posts: iterável de tuplas (post_id, author_id, created_at)
+    return [
+        TimelineEntry(owner_id=owner_id, post_id=post_id, author_id=author_id, created_at=created_at)
+        for owner_id in owner_ids
+        for post_id, author_id, created_at in posts
+    ]
+
+
+def _recent_posts(author_ids):
+    return list(
+        Post.objects.filter(user_id__in=author_ids).order_by("-created_at")
+        .values_list("id", "user_id", "created_at")[: settings.TIMELINE_BACKFILL_SIZE]
+    )
+
+
+# ids dos autores com mais seguidores que TIMELINE_FANOUT_MAX_FOLLOWERS
+# recalculado no máximo a cada TIMELINE_HIGH_FANOUT_CACHE_SECONDS
+def high_fanout_author_ids():
+    author_ids = cache.get(HIGH_FANOUT_AUTHORS_CACHE_KEY)
+    if author_ids is None:
+        author_ids = set(
+            Follow.objects.values("following_id")
+            .annotate(followers=Count("id"))
+            .filter(followers__gt=settings.TIMELINE_FANOUT_MAX_FOLLOWERS)
+            .values_list("following_id", flat=True)
+        )
+        cache.set(
+            HIGH_FANOUT_AUTHORS_CACHE_KEY,
+            author_ids,
+            settings.TIMELINE_HIGH_FANOUT_CACHE_SECONDS,
+        )
+    return author_ids
+
+
+# FAN-OUT ON WRITE
+# copia o post para a timeline de todos os seguidores do autor
+# retorna False quando o autor é de alto alcance (fica para o pull-on-read)
+def fan_out_post(post):
+    limit = settings.TIMELINE_FANOUT_MAX_FOLLOWERS
+
+    # limit + 1: basta saber se o limite foi ultrapassado
+    follower_ids = list(
+        Follow.objects.filter(following_id=post.user_id)
+        .values_list("follower_id", flat=True)[: limit + 1]
+    )
+
+    if len(follower_ids) > limit:
+        author_ids = cache.get(HIGH_FANOUT_AUTHORS_CACHE_KEY)
+        if author_ids is not None and post.user_id not in author_ids:
+            cache.set(
+                HIGH_FANOUT_AUTHORS_CACHE_KEY,
+                author_ids | {post.user_id},
+                settings.TIMELINE_HIGH_FANOUT_CACHE_SECONDS,
+            )
+        return False
+
+    TimelineEntry.objects.bulk_create(
+        _build_entries(follower_ids, [(post.id, post.user_id, post.created_at)]),
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+    return True
+
+
+# PULL-ON-READ
+# traz para a timeline do usuário os posts novos dos autores de alto alcance que ele segue
+# marca d'água por autor: entrada mais recente de cada um já presente na timeline
+# (uma marca única pularia posts de um autor mais lento, mais antigos que o
+# último post de outro autor)
+def pull_high_fanout_posts(user):
+    high_fanout_ids = high_fanout_author_ids()
+    if not high_fanout_ids:
+        return
+
+    author_ids = list(
+        Follow.objects.filter(follower=user, following_id__in=high_fanout_ids)
+        .values_list("following_id", flat=True)
+    )
+    if not author_ids:
+        return
+
+    latest = dict(
+        TimelineEntry.objects.filter(owner=user, author_id__in=author_ids)
+        .values("author_id")
+        .annotate(latest=Max("created_at"))
+        .values_list("author_id", "latest")
+    )
+
+    # autor sem entradas: posts recentes; com entradas: só os posteriores à sua marca
+    condition = Q(user_id__in=[author_id for author_id in author_ids if author_id not in latest])
+    for author_id, since in latest.items():
+        condition |= Q(user_id=author_id, created_at__gt=since)
+    posts = list(
+        Post.objects.filter(condition).order_by("-created_at")
+        .values_list("id", "user_id", "created_at")[: settings.TIMELINE_BACKFILL_SIZE]
+    )
+
+    TimelineEntry.objects.bulk_create(_build_entries([user.id], posts), ignore_conflicts=True)
+
+
+# FOLLOW: copia os posts recentes do autor seguido para a timeline do seguidor
+def backfill_timeline(follower_id, following_id):
+    TimelineEntry.objects.bulk_create(
+        _build_entries([follower_id], _recent_posts([following_id])),
+        ignore_conflicts=True,
+    )
+
+
+# UNFOLLOW: remove da timeline do seguidor todas as entradas do autor
+def evict_from_timeline(follower_id, following_id):
+    TimelineEntry.objects.filter(owner_id=follower_id, author_id=following_id).delete()
+
+
+# reconstrói a timeline inteira de um usuário a partir de quem ele segue
+def rebuild_timeline(user):
+    TimelineEntry.objects.filter(owner=user).delete()
+    for following_id in user.following_set.values_list("following_id", flat=True):
+        backfill_timeline(user.id, following_id)
+
+
+# carrega os posts de uma página de entradas de índice (TimelineEntry, PostHashtag)
+# preservando a ordem das entradas
+def posts_for_entries(entries):
+    entries = list(entries)
+    posts = Post.objects.filter(id__in=[entry.post_id for entry in entries])\
+        .select_related("user", "retweet__user")
+    posts_by_id = {post.id: post for post in posts}
+    return [posts_by_id[entry.post_id] for entry in entries if entry.post_id in posts_by_id]
@@ -0,0 +1,44 @@
+# posts/viewer_state.py
+
+# estado do usuário logado em relação a uma página de posts/comments
+# (hasLiked, hasRetweeted), calculado para a página inteira em uma única query
+# evita as requisições /likes/.../has_liked/ por card no frontend
+
+from django.db.models import Exists, OuterRef
+
+from likes.models import Like
+from comments.models import Comment
+from .models import Post
+
+VIEWER_STATE = "viewer_state"
+
+
+# {post_id: {"hasLiked": bool, "hasRetweeted": bool}}
+def post_viewer_state(user, post_ids):
+    rows = Post.objects.filter(id__in=post_ids).annotate(
+        has_liked=Exists(Like.objects.filter(user=user, post=OuterRef("pk"))),
+        has_retweeted=Exists(Post.objects.filter(user=user, retweet=OuterRef("pk"))),
+    ).values_list("id", "has_liked", "has_retweeted")
+
+    return {
+        post_id: {"hasLiked": has_liked, "hasRetweeted": has_retweeted}
+        for post_id, has_liked, has_retweeted in rows
+    }
+
+
+# {comment_id: {"hasLiked": bool}}
+def comment_viewer_state(user, comment_ids):
+    rows = Comment.objects.filter(id__in=comment_ids).annotate(
+        has_liked=Exists(Like.objects.filter(user=user, comment=OuterRef("pk"))),
+    ).values_list("id", "has_liked")
+
+    return {comment_id: {"hasLiked": has_liked} for comment_id, has_liked in rows}
+
+
+# lê (ou calcula e guarda no context) o estado do objeto
+# context[context_key]: dicionário compartilhado entre o ListSerializer e os filhos
+def get_viewer_state(context, context_key, loader, obj):
+    states = context.setdefault(context_key, {})
+    if obj.id not in states:
+        states.update(loader(context["request"].user, [obj.id]))
+    return states.get(obj.id, {})
@@ -14,24 +14,22 @@ from rest_framework import status
 
 from rest_framework.permissions import IsAuthenticated
 
-# Count: função de agregação do Django, contagem de valores direto no db
-# usando na queryset com .annotate() para adicionar um field calculado ("comments") 
-from django.db.models import Count
-
-from ..models import Post
+from ..models import Post, TimelineEntry
 from ..serializers import PostSerializer
-from ..pagination import PostCursorPagination
+from ..pagination import PostCursorPagination, PostSearchCursorPagination
+from ..search import search_posts
+from ..timeline import pull_high_fanout_posts, posts_for_entries
+from uploads.handlers import StreamingUploadMixin
 
 # (list, retrieve, create, update, destroy)
 # criação automática de rotas
-class PostViewSet(viewsets.ModelViewSet):
+# StreamingUploadMixin: image/video do multipart gravados em disco em blocos (uploads/handlers.py)
+class PostViewSet(StreamingUploadMixin, viewsets.ModelViewSet):
     # consulta principal ao db
     # select_related(): carrega dados relacionados na mesma consulta (via JOIN no SQL)
     # puxa os dados do user autor do post e do usuário do post retuitado (se for o caso) em uma só consulta ao db
-    # annotate(): cria o campo total_comments_count e 
-    # usa Count para contagem de instâncias do campo "comments" de cada Post
-    queryset = Post.objects.all().select_related("user", "retweet__user").annotate\
-    (total_comments_count=Count('comments')).order_by('-created_at')
+    # contagens (comments, likes, retweets) vêm das colunas desnormalizadas de Post
+    queryset = Post.objects.all().select_related("user", "retweet__user").order_by('-created_at')
 
     serializer_class = PostSerializer
     permission_classes = [IsAuthenticated]
@@ -79,6 +77,25 @@ class PostViewSet(viewsets.ModelViewSet):
         count = Post.objects.filter(user_id=user_id).count()
         return Response({"count": count})
 
+    # SEARCH POSTS (busca full-text no conteúdo)
+    # self: PostViewSet
+    # request: requisição HTTP atual, objeto Request do DRF
+    # novo endpoint customizado /posts/search/?q=...
+    # posts/search.py: tsvector + GIN no PostgreSQL, índice invertido nos demais
+    # paginação por cursor em (-rank, -created_at)
+    @action(detail=False, methods=["get"], pagination_class=PostSearchCursorPagination)
+    def search(self, request):
+        query = request.query_params.get("q", "")
+        posts = search_posts(query).select_related("user", "retweet__user")
+
+        page = self.paginate_queryset(posts)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True, context={"request": request})
+            return self.get_paginated_response(serializer.data)
+
+        serializer = self.get_serializer(posts, many=True, context={"request": request})
+        return Response(serializer.data)
+
     # função chamada automaticamente antes de salvar um novo post
     # user: autor do post => usuário autenticado
     def perform_create(self, serializer):
@@ -122,6 +139,9 @@ class PostViewSet(viewsets.ModelViewSet):
     # self: PostViewSet
     # request: requisição HTTP atual, objeto Request do DRF
     # novo endpoint customizado /posts/following/
+    # leitura via timeline materializada (posts/timeline.py):
+    # paginação sobre TimelineEntry (index scan em owner, -created_at)
+    # em vez de JOIN de todos os posts dos usuários seguidos
     @action(detail=False, methods=["get"], url_path='following')
     def following_posts(self, request):
         user = self.request.user
@@ -129,26 +149,19 @@ class PostViewSet(viewsets.ModelViewSet):
         if not user.is_authenticated:
             return Response(status=status.HTTP_401_UNAUTHORIZED)
 
-        # IDs de todos os users que o user logado segue
-        # values_list('following__id', flat=True): lista de IDs
-        followed_users_ids = user.following_set.values_list('following__id', flat=True)
+        # posts novos de autores de alto alcance (sem fan-out) entram na timeline agora
+        pull_high_fanout_posts(user)
 
-        # consulta ao db: filtra posts de following users
-        # select_related(): dados relacionados
-        # annotate(): contagens
-        queryset = Post.objects.filter(user__id__in=followed_users_ids)\
-            .select_related("user", "retweet__user")\
-            .annotate(total_comments_count=Count('comments'))\
-            .order_by('-created_at')
+        entries = TimelineEntry.objects.filter(owner=user).only("post_id", "created_at")
 
-        # paginação da queryset
-        page = self.paginate_queryset(queryset)
+        # paginação das entradas da timeline (mesmo cursor em -created_at dos posts)
+        page = self.paginate_queryset(entries)
         if page is not None:
-            # serializa a página atual e retorna a resposta paginada
+            # serializa os posts da página atual e retorna a resposta paginada
             # context={"request": request} para PostSerializer ter acesso ao objeto request
-            serializer = self.get_serializer(page, many=True, context={"request": request})
+            serializer = self.get_serializer(posts_for_entries(page), many=True, context={"request": request})
             return self.get_paginated_response(serializer.data)
 
-        # caso a paginação esteja desabilitada, serializa todos os posts da queryset
-        serializer = self.get_serializer(queryset, many=True, context={"request": request})
-        return Response(serializer.data)
\ No newline at end of file
+        # caso a paginação esteja desabilitada, serializa todos os posts da timeline
+        serializer = self.get_serializer(posts_for_entries(entries), many=True, context={"request": request})
+        return Response(serializer.data)
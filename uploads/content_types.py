@@ -0,0 +1,39 @@
+# uploads/content_types.py
+
+# tipos de mídia aceitos por campo e assinatura do cabeçalho de cada um
+# o Content-Type declarado pelo cliente só vale se os primeiros bytes conferem
+
+# campo -> {content type: extensão}
+CONTENT_TYPES = {
+    "image": {
+        "image/jpeg": ".jpg",
+        "image/png": ".png",
+        "image/gif": ".gif",
+        "image/webp": ".webp",
+    },
+    "video": {
+        "video/mp4": ".mp4",
+        "video/quicktime": ".mov",
+        "video/webm": ".webm",
+    },
+}
+
+# bytes do cabeçalho necessários para reconhecer qualquer tipo acima
+HEADER_SIZE = 16
+
+SIGNATURES = {
+    "image/jpeg": lambda header: header.startswith(b"\xff\xd8\xff"),
+    "image/png": lambda header: header.startswith(b"\x89PNG\r\n\x1a\n"),
+    "image/gif": lambda header: header[:6] in (b"GIF87a", b"GIF89a"),
+    "image/webp": lambda header: header[:4] == b"RIFF" and header[8:12] == b"WEBP",
+    # ISO base media (MP4/MOV): caixa "ftyp" logo no início
+    "video/mp4": lambda header: header[4:8] == b"ftyp",
+    "video/quicktime": lambda header: header[4:8] in (b"ftyp", b"moov", b"mdat", b"wide"),
+    # EBML (Matroska/WebM)
+    "video/webm": lambda header: header.startswith(b"\x1a\x45\xdf\xa3"),
+}
+
+
+def header_matches(content_type, header):
+    signature = SIGNATURES.get(content_type)
+    return signature is not None and signature(header)
@@ -0,0 +1,215 @@
+# uploads/direct.py
+
+# uploads diretos ao storage: o arquivo não passa por um worker do gunicorn
+# 1. POST /api/uploads/ {kind, target, content_type, size} -> UploadIntent + destino:
+#    - S3: POST pré-assinado; a policy fixa Content-Type e tamanho exato
+#    - local: PUT em partes retomáveis em /api/uploads/{id}/content/ (Content-Range)
+# 2. POST /api/uploads/{id}/finalize/: confere tamanho e cabeçalho do arquivo;
+#    imagens também passam pelo verify() do Pillow (mesma validação do ImageField)
+# 3. image_upload/video_upload = id no POST de post/comment: o campo recebe a key
+#    e o pipeline de mídia (uploads/pipeline.py) gera as renditions
+
+import os
+import uuid
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from .content_types import CONTENT_TYPES, HEADER_SIZE, header_matches
+from .models import UploadIntent
+from .pipeline import get_temp_storage
+from .storages import get_media_storage
+
+# alvo aceito na criação -> model
+TARGETS = {
+    "post": "posts.Post",
+    "comment": "comments.Comment",
+}
+
+# blocos lidos do corpo da requisição no upload local
+STREAM_BLOCK_SIZE = 64 * 1024
+
+
+class UploadRejected(Exception):
+    pass
+
+
+def max_size(kind):
+    return settings.UPLOADS_MAX_VIDEO_SIZE if kind == UploadIntent.VIDEO else settings.UPLOADS_MAX_IMAGE_SIZE
+
+
+# S3: POST pré-assinado; outros storages: upload em partes pelo servidor
+def supports_presigned(storage):
+    return getattr(storage, "bucket_name", None) is not None
+
+
+# INTENT
+
+def create_intent(user, kind, target, content_type, size):
+    model = apps.get_model(TARGETS[target])
+    extension = CONTENT_TYPES[kind][content_type]
+    key = model._meta.get_field(kind).generate_filename(None, f"{uuid.uuid4().hex}{extension}")
+
+    intent = UploadIntent(
+        user=user, kind=kind, target=model._meta.label, content_type=content_type, size=size, key=key,
+        expires_at=timezone.now() + timedelta(seconds=settings.UPLOADS_INTENT_EXPIRES_SECONDS),
+    )
+    if not supports_presigned(get_media_storage()):
+        intent.temp_name = f"intents/{intent.id}"
+    intent.save()
+    return intent
+
+
+# destino do envio devolvido ao cliente
+def upload_target(intent, request):
+    storage = get_media_storage()
+    if not supports_presigned(storage):
+        url = reverse("upload-content", kwargs={"pk": intent.id})
+        return {
+            "method": "PUT",
+            "url": request.build_absolute_uri(url),
+            "headers": {"Content-Type": "application/octet-stream"},
+            "chunk_size": settings.UPLOADS_CHUNK_SIZE,
+        }
+
+    fields = {"Content-Type": intent.content_type}
+    conditions = [
+        {"Content-Type": intent.content_type},
+        ["content-length-range", intent.size, intent.size],
+    ]
+    if storage.default_acl:
+        fields["acl"] = storage.default_acl
+        conditions.append({"acl": storage.default_acl})
+
+    presigned = storage.connection.meta.client.generate_presigned_post(
+        Bucket=storage.bucket_name,
+        Key=_s3_key(storage, intent.key),
+        Fields=fields,
+        Conditions=conditions,
+        ExpiresIn=max(1, int((intent.expires_at - timezone.now()).total_seconds())),
+    )
+    return {"method": "POST", "url": presigned["url"], "fields": presigned["fields"]}
+
+
+def _s3_key(storage, name):
+    # mesmo prefixo (location) que o storage usa para o nome
+    from storages.utils import clean_name
+    return storage._normalize_name(clean_name(name))
+
+
+# UPLOAD LOCAL EM PARTES
+
+# grava os bytes [start, start + length) no arquivo temporário do intent
+# start precisa ser o total já recebido (retomada: GET /api/uploads/{id}/)
+def append_chunk(intent, start, length, stream):
+    if start != intent.received:
+        raise UploadRejected(f"Expected offset {intent.received}.")
+    if length > settings.UPLOADS_CHUNK_SIZE or start + length > intent.size:
+        raise UploadRejected("Chunk too large.")
+
+    path = get_temp_storage().path(intent.temp_name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    written = 0
+    with open(path, "r+b" if os.path.exists(path) else "wb") as f:
+        # sobrescreve restos de uma parte interrompida
+        f.seek(start)
+        while written < length:
+            block = stream.read(min(STREAM_BLOCK_SIZE, length - written))
+            if not block:
+                break
+            f.write(block)
+            written += len(block)
+        f.truncate()
+
+    if written != length:
+        raise UploadRejected("Incomplete chunk.")
+    intent.received = start + length
+    intent.save(update_fields=["received"])
+    return intent.received
+
+
+# FINALIZE
+
+# confere o arquivo enviado: tamanho declarado e cabeçalho do tipo declarado
+# imagem: arquivo inteiro validado pelo Pillow (cabeçalho certo com conteúdo
+# inválido quebraria as renditions do pipeline)
+def finalize_intent(intent):
+    if intent.status == UploadIntent.COMPLETED:
+        return intent
+
+    if intent.temp_name:
+        size, header = _local_upload(intent)
+    else:
+        size, header = _s3_upload(intent)
+
+    if size != intent.size:
+        raise UploadRejected(f"Expected {intent.size} bytes, got {size}.")
+    if not header_matches(intent.content_type, header):
+        raise UploadRejected(f"File content is not {intent.content_type}.")
+    if intent.kind == UploadIntent.IMAGE:
+        _verify_image(intent)
+
+    intent.status = UploadIntent.COMPLETED
+    intent.save(update_fields=["status"])
+    return intent
+
+
+def _local_upload(intent):
+    temp_storage = get_temp_storage()
+    if not temp_storage.exists(intent.temp_name):
+        return 0, b""
+    with temp_storage.open(intent.temp_name) as f:
+        return temp_storage.size(intent.temp_name), f.read(HEADER_SIZE)
+
+
+def _s3_upload(intent):
+    from botocore.exceptions import ClientError
+
+    storage = get_media_storage()
+    client = storage.connection.meta.client
+    key = _s3_key(storage, intent.key)
+    try:
+        head = client.head_object(Bucket=storage.bucket_name, Key=key)
+    except ClientError:
+        return 0, b""
+    # só o cabeçalho: o vídeo inteiro não é baixado
+    header = client.get_object(Bucket=storage.bucket_name, Key=key, Range=f"bytes=0-{HEADER_SIZE - 1}")["Body"].read()
+    return head["ContentLength"], header
+
+
+def _verify_image(intent):
+    if intent.temp_name:
+        source = get_temp_storage().open(intent.temp_name)
+    else:
+        source = get_media_storage().open(intent.key)
+
+    with source:
+        try:
+            with Image.open(source) as image:
+                image_format = image.format
+                image.verify()
+        except Exception:
+            raise UploadRejected(f"File content is not a valid {intent.content_type} image.")
+    if Image.MIME.get(image_format) != intent.content_type:
+        raise UploadRejected(f"File content is not {intent.content_type}.")
+
+
+# EXPIRADOS
+
+# intents não anexados dentro da validade: remove arquivo temporário e objeto enviado
+# retorna a quantidade de intents removidos
+def purge_expired_intents(batch_size=100):
+    expired = list(UploadIntent.objects.filter(expires_at__lte=timezone.now())[:batch_size])
+    storage, temp_storage = get_media_storage(), get_temp_storage()
+    for intent in expired:
+        if intent.temp_name:
+            temp_storage.delete(intent.temp_name)
+        else:
+            storage.delete(intent.key)
+    UploadIntent.objects.filter(id__in=[intent.id for intent in expired]).delete()
+    return len(expired)
@@ -0,0 +1,136 @@
+# uploads/handlers.py
+
+# upload handler de image/video de posts e comments (StreamingUploadMixin)
+# - corpo lido em blocos de STREAM_CHUNK_SIZE e gravado direto no storage
+#   temporário do pipeline de mídia: memória por upload constante
+# - requisição maior que o permitido: rejeitada antes de ler o corpo
+# - arquivo acima do limite do campo: rejeitado no bloco que passa do limite
+# - cabeçalho (primeiros bytes) conferido no primeiro bloco: tipo desconhecido
+#   é rejeitado sem ler o resto do arquivo
+# - stage_media só renomeia o arquivo (mesmo disco), sem copiar nem reler
+# rejeição: MultiPartParserError -> 400 (ParseError do DRF)
+
+import os
+import uuid
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, StopFutureHandlers
+from django.http.multipartparser import MultiPartParserError
+
+from .content_types import CONTENT_TYPES, HEADER_SIZE, header_matches
+from .direct import max_size
+from .pipeline import get_temp_storage
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+class MediaUploadRejected(MultiPartParserError):
+    pass
+
+
+# arquivo recebido já no storage temporário
+# temporary_file_path: FileSystemStorage.save move o arquivo (rename)
+class StagedUploadedFile(UploadedFile):
+    def __init__(self, path, name, content_type, size, charset, content_type_extra=None):
+        super().__init__(open(path, "rb"), name, content_type, size, charset, content_type_extra)
+        self.path = path
+
+    def temporary_file_path(self):
+        return self.path
+
+    def close(self):
+        try:
+            return self.file.close()
+        finally:
+            # não movido pelo pipeline (ex.: requisição inválida): descarta
+            _remove(self.path)
+
+
+class StreamingMediaUploadHandler(FileUploadHandler):
+    chunk_size = STREAM_CHUNK_SIZE
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.file = None
+        # arquivos já completos da mesma requisição (removidos se ela for rejeitada)
+        self.completed = []
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        # maior requisição válida: um vídeo, uma imagem e os campos de texto
+        limit = settings.UPLOADS_MAX_VIDEO_SIZE + settings.UPLOADS_MAX_IMAGE_SIZE + settings.DATA_UPLOAD_MAX_MEMORY_SIZE
+        if content_length > limit:
+            self._reject(f"Request body too large ({content_length} bytes).")
+        return None
+
+    def new_file(self, field_name, file_name, content_type, content_length, charset=None, content_type_extra=None):
+        super().new_file(field_name, file_name, content_type, content_length, charset, content_type_extra)
+        if field_name not in CONTENT_TYPES:
+            self._reject(f"Unexpected file field '{field_name}'.")
+
+        self.limit = max_size(field_name)
+        if content_length is not None and content_length > self.limit:
+            self._reject(f"'{field_name}' is larger than {self.limit} bytes.")
+
+        self.header = b""
+        self.path = get_temp_storage().path(f"incoming/{uuid.uuid4().hex}")
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.file = open(self.path, "wb")
+        raise StopFutureHandlers()
+
+    def receive_data_chunk(self, raw_data, start):
+        if start + len(raw_data) > self.limit:
+            self._reject(f"'{self.field_name}' is larger than {self.limit} bytes.")
+
+        if len(self.header) < HEADER_SIZE:
+            self.header += raw_data[:HEADER_SIZE - len(self.header)]
+            if len(self.header) == HEADER_SIZE:
+                self._check_header()
+
+        self.file.write(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        # arquivo menor que o cabeçalho
+        if len(self.header) < HEADER_SIZE:
+            self._check_header()
+        self.file.close()
+        self.file = None
+        self.completed.append(self.path)
+        return StagedUploadedFile(
+            self.path, self.file_name, self.content_type, file_size, self.charset, self.content_type_extra,
+        )
+
+    def upload_interrupted(self):
+        self._discard()
+
+    def _check_header(self):
+        if not any(header_matches(content_type, self.header) for content_type in CONTENT_TYPES[self.field_name]):
+            self._reject(f"'{self.field_name}' must be one of: {', '.join(CONTENT_TYPES[self.field_name])}.")
+
+    def _reject(self, message):
+        self._discard()
+        for path in self.completed:
+            _remove(path)
+        raise MediaUploadRejected(message)
+
+    def _discard(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+            _remove(self.path)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+# viewsets de posts/comments: multipart recebido por StreamingMediaUploadHandler
+# (no lugar dos handlers padrão: memória até 2.5MB, depois /tmp e cópia)
+class StreamingUploadMixin:
+    def initialize_request(self, request, *args, **kwargs):
+        request.upload_handlers = [StreamingMediaUploadHandler(request)]
+        return super().initialize_request(request, *args, **kwargs)
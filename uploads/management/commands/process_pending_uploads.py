@@ -0,0 +1,70 @@
+# uploads/management/commands/process_pending_uploads.py
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from uploads.direct import purge_expired_intents
+from uploads.pipeline import drain_pending_uploads
+
+
+class Command(BaseCommand):
+    # python manage.py help process_pending_uploads
+    help = (
+        'Processes media uploads the background workers did not finish '
+        '(stores the original and generates the image renditions) and removes '
+        'expired direct upload intents.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=20,
+            help='Maximum number of uploads read per poll (each one is claimed and stored on its own).',
+        )
+        parser.add_argument(
+            '--older-than',
+            type=int,
+            default=300,
+            help='Only uploads staged at least this many seconds ago (newer ones are still queued).',
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=5,
+            help='Uploads that failed this many times are skipped.',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep polling instead of exiting when nothing is pending.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=10.0,
+            help='Seconds to wait between polls when nothing is pending (with --loop).',
+        )
+
+    def handle(self, *args, **kwargs):
+        total = total_failed = expired = 0
+        while True:
+            processed, failed = drain_pending_uploads(kwargs['batch_size'], kwargs['older_than'], kwargs['max_attempts'])
+            purged = purge_expired_intents(kwargs['batch_size'])
+            total += processed
+            total_failed += failed
+            expired += purged
+
+            # uploads com falha ficam em backoff: a próxima leitura não os repete
+            if processed or failed or purged:
+                continue
+            if not kwargs['loop']:
+                break
+            time.sleep(kwargs['interval'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Processed {total} pending upload(s), removed {expired} expired upload intent(s).'
+        ))
+        if total_failed:
+            self.stdout.write(self.style.WARNING(f'{total_failed} pending upload(s) failed and will be retried later.'))
@@ -0,0 +1,82 @@
+# uploads/media_urls.py
+
+# URLs absolutas de arquivos de mídia (fotos de perfil, image/video de posts e
+# comments, renditions) sem storage.url() + build_absolute_uri por campo
+# - base do storage (MEDIA_URL local, domínio do bucket no S3) calculada uma
+#   vez por processo; URL = base + nome (mesma quotação do storage)
+# - storage com URL que não é base + nome (S3 com querystring assinada,
+#   location que não bate): storage.url() por arquivo, como antes
+# - por requisição: base absoluta (host/esquema) resolvida uma vez e memo
+#   por nome de arquivo (o mesmo autor aparece em vários posts do feed)
+# - override_settings de MEDIA_URL/STORAGES (testes) descarta o cache
+
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.encoding import filepath_to_uri
+
+from .pipeline import is_media_pending
+
+# nome de teste: confirma que storage.url(nome) == base + nome
+_PROBE_NAME = "probe dir/ação.png"
+
+# storage -> base (str) | None (sem atalho)
+_bases = {}
+
+
+def _storage_base(storage):
+    try:
+        return _bases[storage]
+    except KeyError:
+        pass
+
+    base = None
+    if not getattr(storage, "querystring_auth", False):
+        candidate = storage.url("")
+        if candidate.endswith("/") and storage.url(_PROBE_NAME) == candidate + filepath_to_uri(_PROBE_NAME):
+            base = candidate
+    _bases[storage] = base
+    return base
+
+
+@receiver(setting_changed)
+def _clear_bases(setting, **kwargs):
+    if setting in ("MEDIA_URL", "STORAGES"):
+        _bases.clear()
+
+
+# URL absoluta (relativa sem request) de um nome no storage
+def storage_url(storage, name, request=None):
+    memo = getattr(request, "_media_urls", None) if request is not None else None
+    if memo is None:
+        memo = {}
+        if request is not None:
+            request._media_urls = memo
+
+    key = (storage, name)
+    if key in memo:
+        return memo[key]
+
+    base = _storage_base(storage)
+    if base is None:
+        url = storage.url(name)
+        if request is not None:
+            url = request.build_absolute_uri(url)
+    else:
+        if request is not None:
+            # host/esquema da requisição: um build_absolute_uri por storage
+            absolute = memo.get((storage, None))
+            if absolute is None:
+                absolute = memo[(storage, None)] = request.build_absolute_uri(base)
+            base = absolute
+        url = base + filepath_to_uri(name).lstrip("/")
+
+    memo[key] = url
+    return url
+
+
+# FieldFile (obj.image, user.profile_picture) -> URL
+# None sem arquivo ou com o upload ainda pendente no pipeline (daria 404)
+def media_url(field_file, request=None):
+    if not field_file or is_media_pending(field_file.instance, field_file.field.name):
+        return None
+    return storage_url(field_file.storage, field_file.name, request)
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("uploads", "0002_upload_intent"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="pendingupload",
+            name="claimed_until",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,2 @@
+from .pending_upload import PendingUpload
+from .upload_intent import UploadIntent
@@ -0,0 +1,29 @@
+# uploads/models/pending_upload.py
+
+from django.db import models
+
+
+# upload aguardando o pipeline de mídia (uploads/pipeline.py)
+# gravada na mesma transação do Post/Comment; removida quando o worker termina
+# sobras (ex.: processo reiniciado): python manage.py process_pending_uploads
+class PendingUpload(models.Model):
+    # "posts.Post" | "comments.Comment"
+    model = models.CharField(max_length=100)
+    object_id = models.CharField(max_length=36)
+
+    # {campo: {"temp": nome no storage temporário, "name": nome final}}
+    # o nome final já está gravado no campo do model
+    # temp null: arquivo já no storage (upload direto), só as renditions
+    files = models.JSONField()
+
+    attempts = models.PositiveSmallIntegerField(default=0)
+    # reservado por um worker até aqui (ou, após uma falha, em backoff);
+    # reserva vencida (worker morto) pode ser retomada
+    claimed_until = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["id"]
+
+    def __str__(self):
+        return f"{self.model} {self.object_id} #{self.pk}"
@@ -0,0 +1,53 @@
+# uploads/models/upload_intent.py
+
+import uuid
+
+from django.conf import settings
+from django.db import models
+
+
+# upload direto ao storage (uploads/direct.py)
+# criado antes do envio; o cliente envia o arquivo ao destino devolvido
+# (POST pré-assinado no S3 ou PUT em partes no servidor local), confirma
+# com finalize e usa o id em image_upload/video_upload do post/comment
+# removido quando anexado; expirado: python manage.py process_pending_uploads
+class UploadIntent(models.Model):
+    PENDING = "pending"
+    COMPLETED = "completed"
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (COMPLETED, "Completed"),
+    ]
+
+    IMAGE = "image"
+    VIDEO = "video"
+    KIND_CHOICES = [
+        (IMAGE, "Image"),
+        (VIDEO, "Video"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="upload_intents")
+
+    # campo de destino: image/video de "posts.Post" | "comments.Comment"
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    target = models.CharField(max_length=100)
+
+    content_type = models.CharField(max_length=100)
+    size = models.PositiveBigIntegerField()
+
+    # nome final no storage de mídia
+    key = models.CharField(max_length=255)
+    # upload local em partes: arquivo no storage temporário e bytes recebidos
+    temp_name = models.CharField(max_length=255, blank=True, default="")
+    received = models.PositiveBigIntegerField(default=0)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.user_id} {self.kind} {self.key} [{self.status}]"
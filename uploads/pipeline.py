@@ -0,0 +1,294 @@
+# uploads/pipeline.py
+
+# pipeline assíncrono de mídia (image/video) de posts e comments
+# na requisição (MediaPipelineMixin, uploads/serializers):
+# - stage_media: arquivo gravado em disco local (UPLOADS_TEMP_ROOT), sem rede;
+#   o campo do model já recebe o nome final (post_images/<uuid>.png), marcado
+#   como pendente em media_renditions["pending"]: sem URL (null) até o worker
+#   enviar o original ao storage
+# - schedule_media: PendingUpload gravado; após o commit, o backend configurado
+#   em settings.UPLOADS_BACKEND recebe o id
+# no worker (process_pending_upload):
+# - PendingUpload reservado por um UPDATE condicional curto (claimed_until):
+#   outro worker/process_pending_uploads não o processa em paralelo
+# - original enviado ao storage do campo (S3 em produção), fora de transação
+# - imagens: renditions WebP/JPEG sem metadados (uploads/renditions.py)
+# - só a gravação final em transação: media_renditions com update() (sem
+#   signals), sem a marca de pendente, e PendingUpload removido
+# - arquivos temporários removidos
+# uploads diretos ao storage (uploads/direct.py) entram no mesmo fluxo,
+# com o original já no storage: só as renditions
+
+import os
+import queue
+import threading
+import uuid
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.db import close_old_connections, transaction
+from django.db.models import F, ImageField, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import PendingUpload, UploadIntent
+from .renditions import build_renditions
+
+MEDIA_FIELDS = ("image", "video")
+
+# media_renditions["pending"]: campos com o original ainda só no disco local
+PENDING_KEY = "pending"
+
+
+_temp_storages = {}
+
+
+# disco local do processo web (compartilhado com os workers)
+def get_temp_storage():
+    location = settings.UPLOADS_TEMP_ROOT
+    if location not in _temp_storages:
+        _temp_storages[location] = FileSystemStorage(location=location)
+    return _temp_storages[location]
+
+
+# REQUISIÇÃO
+
+# antes do save: arquivos enviados -> disco local
+# validated_data recebe o nome final no lugar do arquivo
+# upload direto (image_upload/video_upload, uploads/direct.py): key do UploadIntent
+# retorna {campo: {"temp": nome temporário | None, "name": nome final, "intent": id}}
+def stage_media(model, validated_data):
+    staged = {}
+    for field_name in MEDIA_FIELDS:
+        intent = validated_data.pop(f"{field_name}_upload", None)
+        if intent is not None:
+            staged[field_name] = {"temp": intent.temp_name or None, "name": intent.key, "intent": str(intent.id)}
+            validated_data[field_name] = intent.key
+            continue
+
+        upload = validated_data.get(field_name)
+        if not upload:
+            continue
+
+        extension = os.path.splitext(upload.name)[1].lower()
+        name = model._meta.get_field(field_name).generate_filename(None, f"{uuid.uuid4().hex}{extension}")
+        staged[field_name] = {"temp": get_temp_storage().save(name, upload), "name": name}
+        validated_data[field_name] = name
+    return staged
+
+
+# media_renditions com a marca de pendente dos arquivos em disco local
+# replaced: campos trocados/removidos na requisição (marca anterior não vale mais)
+def mark_pending(renditions, staged, replaced=()):
+    renditions = dict(renditions)
+    pending = [field_name for field_name in renditions.pop(PENDING_KEY, []) if field_name not in replaced]
+    pending += [field_name for field_name, entry in staged.items() if entry["temp"] and field_name not in pending]
+    if pending:
+        renditions[PENDING_KEY] = pending
+    return renditions
+
+
+def is_media_pending(instance, field_name):
+    renditions = getattr(instance, "media_renditions", None) or {}
+    return field_name in renditions.get(PENDING_KEY, ())
+
+
+# depois do save: registra o upload e agenda o processamento para o commit
+# UploadIntent anexado deixa de existir (a key agora é do post/comment)
+def schedule_media(instance, staged):
+    if not staged:
+        return None
+
+    intent_ids = [entry.pop("intent") for entry in staged.values() if "intent" in entry]
+    if intent_ids:
+        UploadIntent.objects.filter(id__in=intent_ids).delete()
+
+    pending = PendingUpload.objects.create(
+        model=instance._meta.label, object_id=str(instance.pk), files=staged,
+    )
+    transaction.on_commit(lambda: get_backend().submit([pending.id]))
+    return pending
+
+
+# WORKER
+
+# reserva o PendingUpload para este worker (UPDATE condicional, sem lock longo)
+# falso: reservado por outro worker ou em backoff
+def claim_pending_upload(pending_id):
+    now = timezone.now()
+    return PendingUpload.objects.filter(
+        Q(claimed_until__isnull=True) | Q(claimed_until__lte=now), pk=pending_id,
+    ).update(claimed_until=now + timedelta(seconds=settings.UPLOADS_CLAIM_SECONDS)) == 1
+
+
+# chamado com o PendingUpload já reservado
+def process_pending_upload(pending):
+    model = apps.get_model(pending.model)
+    instance = model.objects.filter(pk=pending.object_id).first()
+    temp_storage = get_temp_storage()
+
+    # envios e renditions sem transação aberta: {campo: (nome no storage, renditions | None)}
+    results = {}
+    if instance is not None:
+        for field_name, staged in pending.files.items():
+            field_file = getattr(instance, field_name)
+            # arquivo trocado/removido depois do upload: nada a enviar
+            if field_file.name != staged["name"]:
+                continue
+
+            # temp null: upload direto, o original já está no storage
+            is_image = isinstance(field_file.field, ImageField)
+            if not staged["temp"] and not is_image:
+                continue
+
+            source_storage = temp_storage if staged["temp"] else field_file.storage
+            with source_storage.open(staged["temp"] or staged["name"]) as source:
+                stored = staged["name"]
+                if staged["temp"]:
+                    stored = field_file.storage.save(staged["name"], source)
+
+                entries = None
+                if is_image:
+                    source.seek(0)
+                    entries, files = build_renditions(source, stored)
+                    for name, content in files:
+                        field_file.storage.save(name, ContentFile(content))
+            results[field_name] = (stored, entries)
+
+    with transaction.atomic():
+        if results:
+            _save_results(model, pending, results)
+        pending.delete()
+
+    for staged in pending.files.values():
+        if staged["temp"]:
+            temp_storage.delete(staged["temp"])
+
+
+# grava o resultado dos envios na linha travada, relida agora:
+# campo trocado/removido durante o envio fica como está
+def _save_results(model, pending, results):
+    instance = (
+        model.objects.select_for_update().filter(pk=pending.object_id)
+        .only("media_renditions", *results).first()
+    )
+    if instance is None:
+        return
+
+    renditions, names = dict(instance.media_renditions), {}
+    pending_fields = list(renditions.pop(PENDING_KEY, []))
+    for field_name, (stored, entries) in results.items():
+        staged_name = pending.files[field_name]["name"]
+        if getattr(instance, field_name).name != staged_name:
+            continue
+        if stored != staged_name:
+            names[field_name] = stored
+        if entries is not None:
+            renditions[field_name] = entries
+        # original no storage: o campo volta a ter URL
+        if field_name in pending_fields:
+            pending_fields.remove(field_name)
+
+    if pending_fields:
+        renditions[PENDING_KEY] = pending_fields
+    # só as colunas de mídia: contadores e conteúdo não são sobrescritos
+    model.objects.filter(pk=instance.pk).update(media_renditions=renditions, **names)
+
+
+# processa os PendingUpload pelos ids (os reservados por outro worker são pulados)
+# falha: a reserva vira backoff, a próxima tentativa fica para process_pending_uploads
+# retorna (processados, com falha)
+def process_pending_uploads(pending_ids):
+    processed = failed = 0
+    for pending_id in pending_ids:
+        if not claim_pending_upload(pending_id):
+            continue
+        pending = PendingUpload.objects.filter(pk=pending_id).first()
+        if pending is None:
+            continue
+        try:
+            process_pending_upload(pending)
+            processed += 1
+        except Exception as e:
+            failed += 1
+            delay = settings.UPLOADS_RETRY_SECONDS * 2 ** pending.attempts
+            PendingUpload.objects.filter(pk=pending.pk).update(
+                attempts=F("attempts") + 1,
+                claimed_until=timezone.now() + timedelta(seconds=delay),
+            )
+            print(f"ERROR: Falha ao processar upload #{pending.pk}. Erro: {e}")
+    return processed, failed
+
+
+# BACKENDS
+
+# processa no on_commit da própria requisição (desenvolvimento/testes)
+class InlineBackend:
+    def submit(self, pending_ids):
+        process_pending_uploads(pending_ids)
+
+
+# fila em memória consumida por threads workers (default)
+class ThreadPoolBackend:
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._workers = []
+        self._lock = threading.Lock()
+
+    def submit(self, pending_ids):
+        self._start_workers()
+        for pending_id in pending_ids:
+            self._queue.put(pending_id)
+
+    def _start_workers(self):
+        if self._workers:
+            return
+        with self._lock:
+            while len(self._workers) < settings.UPLOADS_WORKERS:
+                worker = threading.Thread(
+                    target=self._work,
+                    name=f"uploads-{len(self._workers)}",
+                    daemon=True,
+                )
+                worker.start()
+                self._workers.append(worker)
+
+    def _work(self):
+        while True:
+            pending_id = self._queue.get()
+            try:
+                process_pending_uploads([pending_id])
+            finally:
+                # thread própria: devolve a conexão com o db
+                close_old_connections()
+                self._queue.task_done()
+
+
+_backends = {}
+
+
+def get_backend():
+    path = settings.UPLOADS_BACKEND
+    if path not in _backends:
+        _backends[path] = import_string(path)()
+    return _backends[path]
+
+
+# uploads que os workers não concluíram (processo reiniciado, erro do storage)
+# older_than: segundos; uploads recentes ainda estão na fila de algum worker
+# reservados (em envio ou em backoff) ficam de fora; cada um é reservado
+# de novo antes do envio (claim_pending_upload), sem lock durante as transferências
+# retorna (processados, com falha)
+def drain_pending_uploads(batch_size, older_than, max_attempts):
+    now = timezone.now()
+    pending_ids = list(
+        PendingUpload.objects.filter(
+            Q(claimed_until__isnull=True) | Q(claimed_until__lte=now),
+            created_at__lte=now - timedelta(seconds=older_than),
+            attempts__lt=max_attempts,
+        ).order_by("id").values_list("id", flat=True)[:batch_size]
+    )
+    return process_pending_uploads(pending_ids)
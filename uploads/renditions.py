@@ -0,0 +1,63 @@
+# uploads/renditions.py
+
+# renditions de imagem com Pillow (uploads/pipeline.py)
+# - orientação EXIF aplicada nos pixels antes de descartar os metadados
+# - metadados removidos: EXIF (GPS, câmera), ICC, comentários
+# - uma rendition WebP e uma JPEG por largura de UPLOADS_RENDITION_WIDTHS,
+#   sem ampliar: larguras maiores que a original viram a largura original
+# - formato salvo no model (media_renditions):
+#   {"image": [{"width": 320, "height": 240, "webp": nome, "jpeg": nome}, ...]}
+
+import io
+import os
+
+from django.conf import settings
+from PIL import Image, ImageOps
+
+# formato no srcset -> (formato do Pillow, setting de qualidade)
+FORMATS = {
+    "webp": ("WEBP", "UPLOADS_WEBP_QUALITY"),
+    "jpeg": ("JPEG", "UPLOADS_JPEG_QUALITY"),
+}
+
+
+def rendition_widths(width):
+    return sorted({min(target, width) for target in settings.UPLOADS_RENDITION_WIDTHS})
+
+
+# source: arquivo aberto (binário); name: nome final do original no storage
+# retorna (entradas do media_renditions, [(nome, bytes)] a enviar ao storage)
+def build_renditions(source, name):
+    stem = os.path.splitext(name)[0]
+    entries, files = [], []
+
+    with Image.open(source) as original:
+        image = ImageOps.exif_transpose(original)
+        has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+        image = image.convert("RGBA" if has_alpha else "RGB")
+
+        for width in rendition_widths(image.width):
+            height = max(1, round(image.height * width / image.width))
+            resized = image if width == image.width else image.resize((width, height), Image.Resampling.LANCZOS)
+
+            entry = {"width": width, "height": height}
+            for key, (pillow_format, quality_setting) in FORMATS.items():
+                entry[key] = f"{stem}_{width}.{key}"
+                files.append((entry[key], _encode(resized, pillow_format, getattr(settings, quality_setting))))
+            entries.append(entry)
+
+    return entries, files
+
+
+def _encode(image, pillow_format, quality):
+    if pillow_format == "JPEG" and image.mode == "RGBA":
+        # JPEG sem canal alfa: transparência sobre fundo branco
+        background = Image.new("RGB", image.size, "white")
+        background.paste(image, mask=image.getchannel("A"))
+        image = background
+
+    # info vazio: nenhum metadado do original é reescrito
+    image.info = {}
+    buffer = io.BytesIO()
+    image.save(buffer, pillow_format, quality=quality, optimize=pillow_format == "JPEG")
+    return buffer.getvalue()
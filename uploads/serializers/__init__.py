@@ -0,0 +1,2 @@
+from .media_serializer import MediaFileField, MediaImageField, MediaPipelineMixin, SrcsetField
+from .upload_intent_serializer import UploadIntentSerializer, UploadIntentField
@@ -0,0 +1,67 @@
+# uploads/serializers/media_serializer.py
+
+from rest_framework import serializers
+
+from ..media_urls import media_url, storage_url
+from ..pipeline import MEDIA_FIELDS, mark_pending, schedule_media, stage_media
+from ..renditions import FORMATS
+
+
+# ModelSerializer com image/video: os arquivos passam pelo pipeline de mídia
+# (uploads/pipeline.py) em vez de irem ao storage dentro da requisição
+class MediaPipelineMixin:
+    def create(self, validated_data):
+        staged = stage_media(self.Meta.model, validated_data)
+        validated_data["media_renditions"] = mark_pending({}, staged)
+        instance = super().create(validated_data)
+        schedule_media(instance, staged)
+        return instance
+
+    def update(self, instance, validated_data):
+        staged = stage_media(self.Meta.model, validated_data)
+        # renditions do arquivo anterior deixam de valer
+        replaced = [field_name for field_name in MEDIA_FIELDS if field_name in validated_data]
+        renditions = {key: value for key, value in instance.media_renditions.items() if key not in replaced}
+        instance.media_renditions = mark_pending(renditions, staged, replaced)
+        instance = super().update(instance, validated_data)
+        schedule_media(instance, staged)
+        return instance
+
+
+# renditions de um campo de mídia no formato srcset, por formato:
+# {"webp": "https://.../a_320.webp 320w, https://.../a_640.webp 640w", "jpeg": "..."}
+# null enquanto o pipeline não terminou (image também null até o original
+# chegar ao storage; depois o cliente usa o original até as renditions)
+class SrcsetField(serializers.Field):
+    def __init__(self, media_field, **kwargs):
+        self.media_field = media_field
+        kwargs["source"] = "media_renditions"
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, renditions):
+        entries = renditions.get(self.media_field)
+        if not entries:
+            return None
+
+        storage = self.parent.Meta.model._meta.get_field(self.media_field).storage
+        request = self.context.get("request")
+        return {
+            key: ", ".join(f"{storage_url(storage, entry[key], request)} {entry['width']}w" for entry in entries)
+            for key in FORMATS
+        }
+
+
+# image/video de entrada (upload) com saída pelo resolver de URLs (uploads/media_urls.py)
+# null enquanto o upload está pendente
+class MediaURLMixin:
+    def to_representation(self, value):
+        return media_url(value, self.context.get("request"))
+
+
+class MediaFileField(MediaURLMixin, serializers.FileField):
+    pass
+
+
+class MediaImageField(MediaURLMixin, serializers.ImageField):
+    pass
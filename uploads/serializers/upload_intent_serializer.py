@@ -0,0 +1,59 @@
+# uploads/serializers/upload_intent_serializer.py
+
+from django.utils import timezone
+from rest_framework import serializers
+
+from ..content_types import CONTENT_TYPES
+from ..direct import TARGETS, create_intent, max_size
+from ..models import UploadIntent
+
+
+# POST /api/uploads/ e GET /api/uploads/{id}/
+class UploadIntentSerializer(serializers.ModelSerializer):
+    target = serializers.ChoiceField(choices=sorted(TARGETS), write_only=True)
+
+    class Meta:
+        model = UploadIntent
+        fields = [
+            "id",
+            "kind",
+            "target",
+            "content_type",
+            "size",
+            "received",
+            "status",
+            "expires_at",
+        ]
+        read_only_fields = ["id", "received", "status", "expires_at"]
+
+    def validate(self, attrs):
+        kind, content_type, size = attrs["kind"], attrs["content_type"], attrs["size"]
+        if content_type not in CONTENT_TYPES[kind]:
+            raise serializers.ValidationError(
+                {"content_type": f"Unsupported {kind} type. Allowed: {', '.join(CONTENT_TYPES[kind])}."}
+            )
+        if not 0 < size <= max_size(kind):
+            raise serializers.ValidationError({"size": f"Size must be between 1 and {max_size(kind)} bytes."})
+        return attrs
+
+    def create(self, validated_data):
+        return create_intent(self.context["request"].user, **validated_data)
+
+
+# id de um UploadIntent finalizado do usuário logado, para image_upload/video_upload
+# de posts e comments (MediaPipelineMixin anexa a key ao campo)
+class UploadIntentField(serializers.PrimaryKeyRelatedField):
+    def __init__(self, kind, **kwargs):
+        self.kind = kind
+        kwargs.setdefault("required", False)
+        kwargs.setdefault("write_only", True)
+        super().__init__(**kwargs)
+
+    def get_queryset(self):
+        return UploadIntent.objects.filter(
+            user=self.context["request"].user,
+            kind=self.kind,
+            target=self.parent.Meta.model._meta.label,
+            status=UploadIntent.COMPLETED,
+            expires_at__gt=timezone.now(),
+        )
@@ -0,0 +1,25 @@
+# uploads/storages.py
+
+# storages de mídia compartilhados, um por perfil de ACL
+# (settings.UPLOADS_STORAGE_PROFILES: perfil -> alias em settings.STORAGES)
+# - instância criada uma vez por processo pelo registro do Django
+#   (django.core.files.storage.storages), não uma por upload
+# - S3Storage é thread-safe: sessão/conexão boto3 por thread (threading.local),
+#   reaproveitada entre uploads; multipart e pool HTTP em AWS_S3_TRANSFER_CONFIG
+#   e AWS_S3_CLIENT_CONFIG
+# - local/testes: o alias aponta para FileSystemStorage
+
+from django.conf import settings
+from django.core.files.storage import storages
+
+PUBLIC = "public"
+
+
+def get_media_storage(profile=PUBLIC):
+    return storages[settings.UPLOADS_STORAGE_PROFILES[profile]]
+
+
+# storage dos campos image/video de posts e comments
+# callable: a migração guarda a referência, não o backend do ambiente
+def public_media_storage():
+    return get_media_storage(PUBLIC)
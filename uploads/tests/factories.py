@@ -0,0 +1,23 @@
+# uploads/tests/factories.py
+
+from datetime import timedelta
+
+import factory
+from django.utils import timezone
+from factory.django import DjangoModelFactory
+from uploads.models import UploadIntent
+from accounts.tests.factories import UserFactory
+
+
+class UploadIntentFactory(DjangoModelFactory):
+    class Meta:
+        model = UploadIntent
+
+    user = factory.SubFactory(UserFactory)
+    kind = UploadIntent.IMAGE
+    target = "posts.Post"
+    content_type = "image/png"
+    size = 1024
+    key = factory.Sequence(lambda n: f'post_images/upload{n}.png')
+    temp_name = factory.LazyAttribute(lambda intent: f'intents/{intent.key}')
+    expires_at = factory.LazyFunction(lambda: timezone.now() + timedelta(hours=1))
@@ -0,0 +1,396 @@
+# uploads/tests/test_upload_views.py
+
+import base64
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import RequestFactory, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from accounts.tests.factories import UserFactory
+from comments.models import Comment
+from posts.models import Post
+from posts.tests.factories import PostFactory
+from uploads.direct import upload_target
+from uploads.models import PendingUpload, UploadIntent
+from uploads.renditions import build_renditions
+from uploads.storages import get_media_storage
+from uploads.tests.factories import UploadIntentFactory
+
+
+def png_bytes(size=(64, 48)):
+    stream = io.BytesIO()
+    Image.new('RGB', size, 'blue').save(stream, format='PNG')
+    return stream.getvalue()
+
+
+def jpeg_with_metadata(size=(800, 600)):
+    exif = Image.Exif()
+    exif[0x0112] = 6  # orientação: girar 90°
+    exif[0x010F] = "Camera"
+    stream = io.BytesIO()
+    Image.new('RGB', size, 'red').save(stream, format='JPEG', exif=exif)
+    return SimpleUploadedFile('photo.jpg', stream.getvalue(), content_type='image/jpeg')
+
+
+class MediaTestCase(APITestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.temp_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        self.addCleanup(shutil.rmtree, self.temp_root, ignore_errors=True)
+
+        settings_override = override_settings(
+            MEDIA_ROOT=self.media_root,
+            UPLOADS_TEMP_ROOT=self.temp_root,
+            UPLOADS_BACKEND='uploads.pipeline.InlineBackend',
+            UPLOADS_RENDITION_WIDTHS=[320, 1280],
+            NOTIFICATIONS_BACKEND='notifications.pipeline.InlineBackend',
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = UserFactory()
+        self.client.force_authenticate(user=self.user)
+
+    def temp_files(self):
+        return [name for _, _, names in os.walk(self.temp_root) for name in names]
+
+
+class MediaPipelineTests(MediaTestCase):
+
+
+    def test_post_image_is_stored_with_stripped_renditions(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('post-list'), {'content': 'Photo.', 'image': jpeg_with_metadata()}, format='multipart',
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        # resposta antes do pipeline: original ainda só no disco local, sem URL (evita 404)
+        self.assertIsNone(response.data['image'])
+        self.assertIsNone(response.data['image_srcset'])
+
+        post = Post.objects.get(id=response.data['id'])
+        self.assertFalse(PendingUpload.objects.exists())
+        self.assertEqual(self.temp_files(), [])
+        self.assertTrue(os.path.exists(post.image.path))
+
+        # orientação aplicada (600x800) e sem ampliar além da largura original
+        entries = post.media_renditions['image']
+        self.assertEqual([(entry['width'], entry['height']) for entry in entries], [(320, 427), (600, 800)])
+        for entry in entries:
+            for key in ('webp', 'jpeg'):
+                with Image.open(os.path.join(self.media_root, entry[key])) as rendition:
+                    self.assertEqual(rendition.width, entry['width'])
+                    self.assertEqual(len(rendition.getexif()), 0)
+
+        response = self.client.get(reverse('post-detail', kwargs={'pk': post.id}))
+        self.assertTrue(response.data['image'].endswith(post.image.name))
+        srcset = response.data['image_srcset']
+        self.assertIn('_320.webp 320w, ', srcset['webp'])
+        self.assertTrue(srcset['jpeg'].endswith('_600.jpeg 600w'))
+
+
+
+    def test_comment_video_is_moved_to_storage(self):
+        post = PostFactory(user=self.user)
+        video = SimpleUploadedFile('clip.mp4', b'\x00\x00\x00\x18ftypmp42' + b'\x00' * 64, content_type='video/mp4')
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('post-comments-list', kwargs={'post_id': post.id}),
+                {'content': 'Clip.', 'post': post.id, 'video': video},
+                format='multipart',
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        comment = Comment.objects.get(id=response.data['id'])
+        self.assertTrue(comment.video.name.startswith('comment_videos/'))
+        self.assertTrue(os.path.exists(comment.video.path))
+        self.assertEqual(comment.media_renditions, {})
+        self.assertEqual(self.temp_files(), [])
+
+
+
+    def test_process_pending_uploads_picks_up_unfinished_uploads(self):
+        # sem captureOnCommitCallbacks: o worker nunca recebeu o upload
+        response = self.client.post(
+            reverse('post-list'), {'content': 'Photo.', 'image': jpeg_with_metadata((200, 100))}, format='multipart',
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        pending = PendingUpload.objects.get()
+
+        # recente: ainda pode estar na fila de um worker
+        call_command('process_pending_uploads', stdout=io.StringIO())
+        self.assertTrue(PendingUpload.objects.exists())
+        # feed não aponta para o original que ainda não está no storage
+        response = self.client.get(reverse('post-list'))
+        self.assertIsNone(response.data['results'][0]['image'])
+
+        PendingUpload.objects.filter(pk=pending.pk).update(created_at=timezone.now() - timedelta(hours=1))
+        call_command('process_pending_uploads', stdout=io.StringIO())
+
+        self.assertFalse(PendingUpload.objects.exists())
+        post = Post.objects.get(id=pending.object_id)
+        self.assertEqual(post.media_renditions, {'image': post.media_renditions['image']})
+        self.assertEqual([entry['width'] for entry in post.media_renditions['image']], [100])
+        self.assertIsNotNone(self.client.get(reverse('post-list')).data['results'][0]['image'])
+
+
+
+    def test_pending_upload_is_claimed_and_stored_outside_transactions(self):
+        response = self.client.post(
+            reverse('post-list'), {'content': 'Photo.', 'image': jpeg_with_metadata((200, 100))}, format='multipart',
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        pending = PendingUpload.objects.get()
+        PendingUpload.objects.update(created_at=timezone.now() - timedelta(hours=1))
+
+        # reservado por outro worker (envio em andamento): não é processado de novo
+        PendingUpload.objects.update(claimed_until=timezone.now() + timedelta(minutes=5))
+        call_command('process_pending_uploads', stdout=io.StringIO())
+        self.assertTrue(PendingUpload.objects.exists())
+
+        # reserva vencida (worker morto): retomado; envio e renditions sem transação aberta
+        PendingUpload.objects.update(claimed_until=timezone.now() - timedelta(seconds=1))
+        depth = len(connection.atomic_blocks)
+        depths = []
+
+        def build_outside_transaction(*args):
+            depths.append(len(connection.atomic_blocks))
+            return build_renditions(*args)
+
+        with patch('uploads.pipeline.build_renditions', side_effect=build_outside_transaction):
+            call_command('process_pending_uploads', stdout=io.StringIO())
+        self.assertEqual(depths, [depth])
+        self.assertFalse(PendingUpload.objects.exists())
+        self.assertIn('image', Post.objects.get(id=pending.object_id).media_renditions)
+
+
+
+    def test_failed_upload_backs_off_instead_of_retrying_at_once(self):
+        response = self.client.post(
+            reverse('post-list'), {'content': 'Photo.', 'image': jpeg_with_metadata((200, 100))}, format='multipart',
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        PendingUpload.objects.update(created_at=timezone.now() - timedelta(hours=1))
+
+        out = io.StringIO()
+        with patch('uploads.pipeline.build_renditions', side_effect=OSError('storage down')), patch('builtins.print'):
+            call_command('process_pending_uploads', stdout=out)
+            call_command('process_pending_uploads', stdout=io.StringIO())
+
+        self.assertIn('1 pending upload(s) failed', out.getvalue())
+        pending = PendingUpload.objects.get()
+        self.assertEqual(pending.attempts, 1)
+        self.assertGreater(pending.claimed_until, timezone.now())
+        # original ainda marcado como pendente: sem URL
+        self.assertEqual(Post.objects.get(id=pending.object_id).media_renditions, {'pending': ['image']})
+
+
+
+    def test_media_fields_share_one_storage_instance(self):
+        storage = get_media_storage()
+        for model in (Post, Comment):
+            for field_name in ('image', 'video'):
+                self.assertIs(model._meta.get_field(field_name).storage, storage)
+
+        # registro por processo: mesma instância em qualquer thread (workers do pipeline)
+        seen = []
+        worker = threading.Thread(target=lambda: seen.append(get_media_storage()))
+        worker.start()
+        worker.join()
+        self.assertIs(seen[0], storage)
+
+
+
+class UploadIntentTests(MediaTestCase):
+    def create_intent(self, content, **overrides):
+        data = {'kind': 'image', 'target': 'post', 'content_type': 'image/png', 'size': len(content), **overrides}
+        return self.client.post(reverse('upload-list'), data, format='json')
+
+    def put_chunk(self, intent_id, content, start, total):
+        return self.client.generic(
+            'PUT', reverse('upload-content', kwargs={'pk': intent_id}), content,
+            content_type='application/octet-stream',
+            HTTP_CONTENT_RANGE=f'bytes {start}-{start + len(content) - 1}/{total}',
+        )
+
+
+
+    def test_local_chunked_upload_is_attached_to_a_post(self):
+        content = png_bytes()
+        response = self.create_intent(content)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['upload']['method'], 'PUT')
+        intent_id = response.data['id']
+
+        half = len(content) // 2
+        self.assertEqual(self.put_chunk(intent_id, content[:half], 0, len(content)).data, {'received': half})
+
+        # retomada: offset errado devolve o que já foi recebido
+        response = self.put_chunk(intent_id, content[half:], 0, len(content))
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data['received'], half)
+        self.assertEqual(self.client.get(reverse('upload-detail', kwargs={'pk': intent_id})).data['received'], half)
+
+        self.put_chunk(intent_id, content[half:], half, len(content))
+        response = self.client.post(reverse('upload-finalize', kwargs={'pk': intent_id}))
+        self.assertEqual(response.data['status'], UploadIntent.COMPLETED)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('post-list'), {'content': 'Direct.', 'image_upload': intent_id}, format='json',
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        post = Post.objects.get(id=response.data['id'])
+        self.assertTrue(post.image.name.startswith('post_images/'))
+        with open(post.image.path, 'rb') as f:
+            self.assertEqual(f.read(), content)
+        self.assertEqual([entry['width'] for entry in post.media_renditions['image']], [64])
+        self.assertFalse(UploadIntent.objects.exists())
+        self.assertEqual(self.temp_files(), [])
+
+
+
+    def test_finalize_rejects_incomplete_or_mismatched_files(self):
+        content = png_bytes()
+        intent_id = self.create_intent(content).data['id']
+        self.put_chunk(intent_id, content[:10], 0, len(content))
+        response = self.client.post(reverse('upload-finalize', kwargs={'pk': intent_id}))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        # declarado como PNG, cabeçalho de JPEG
+        fake = b'\xff\xd8\xff' + b'\x00' * 29
+        intent_id = self.create_intent(fake).data['id']
+        self.put_chunk(intent_id, fake, 0, len(fake))
+        response = self.client.post(reverse('upload-finalize', kwargs={'pk': intent_id}))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        # assinatura de JPEG, conteúdo que o Pillow não abre
+        junk = b'\xff\xd8\xff\xe0' + b'junk' * 15
+        junk_id = self.create_intent(junk, content_type='image/jpeg').data['id']
+        self.put_chunk(junk_id, junk, 0, len(junk))
+        response = self.client.post(reverse('upload-finalize', kwargs={'pk': junk_id}))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(UploadIntent.objects.get(pk=junk_id).status, UploadIntent.PENDING)
+
+        # não finalizado: não pode ser anexado
+        response = self.client.post(reverse('post-list'), {'content': 'x', 'image_upload': intent_id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+
+    def test_intent_validation_and_ownership(self):
+        response = self.create_intent(b'x' * 10, content_type='application/pdf')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        with override_settings(UPLOADS_MAX_IMAGE_SIZE=5):
+            response = self.create_intent(b'x' * 10)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        other = UploadIntentFactory(status=UploadIntent.COMPLETED)
+        response = self.client.get(reverse('upload-detail', kwargs={'pk': other.id}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.post(reverse('post-list'), {'content': 'x', 'image_upload': other.id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+
+    def test_s3_target_is_a_presigned_post_with_size_and_type_policy(self):
+        from storages.backends.s3 import S3Storage
+
+        storage = S3Storage(
+            bucket_name='media-bucket', access_key='key', secret_key='secret', region_name='sa-east-1',
+        )
+        intent = UploadIntentFactory(user=self.user, temp_name='', size=2048)
+        with patch('uploads.direct.get_media_storage', return_value=storage):
+            target = upload_target(intent, RequestFactory().post('/'))
+
+        self.assertEqual(target['method'], 'POST')
+        self.assertIn('media-bucket', target['url'])
+        self.assertEqual(target['fields']['key'], intent.key)
+        self.assertEqual(target['fields']['Content-Type'], 'image/png')
+        policy = json.loads(base64.b64decode(target['fields']['policy']))
+        self.assertIn(['content-length-range', 2048, 2048], policy['conditions'])
+
+
+
+class StreamingUploadTests(MediaTestCase):
+    def post_file(self, field, upload):
+        return self.client.post(reverse('post-list'), {'content': 'Upload.', field: upload}, format='multipart')
+
+
+
+    def test_uploaded_file_is_moved_into_the_pipeline_staging_area(self):
+        response = self.post_file('image', SimpleUploadedFile('a.png', png_bytes(), content_type='image/png'))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        # gravado em blocos em incoming/ e renomeado para o nome do pipeline
+        staged = PendingUpload.objects.get().files['image']['temp']
+        self.assertTrue(os.path.exists(os.path.join(self.temp_root, staged)))
+        self.assertEqual(os.listdir(os.path.join(self.temp_root, 'incoming')), [])
+
+
+
+    def test_oversized_or_unknown_files_are_rejected_while_streaming(self):
+        header = b'\x00\x00\x00\x18ftypmp42'
+        with override_settings(UPLOADS_MAX_VIDEO_SIZE=1024):
+            response = self.post_file('video', SimpleUploadedFile('big.mp4', header + b'\x00' * 4096))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        # cabeçalho de PNG no campo de vídeo
+        response = self.post_file('video', SimpleUploadedFile('fake.mp4', png_bytes()))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.post_file('document', SimpleUploadedFile('notes.txt', b'plain text file'))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        with override_settings(UPLOADS_MAX_VIDEO_SIZE=10, UPLOADS_MAX_IMAGE_SIZE=10, DATA_UPLOAD_MAX_MEMORY_SIZE=10):
+            response = self.post_file('image', SimpleUploadedFile('a.png', png_bytes()))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.assertFalse(Post.objects.filter(content='Upload.').exists())
+        self.assertEqual(self.temp_files(), [])
+
+
+
+class MediaURLTests(MediaTestCase):
+    def test_feed_media_urls_skip_storage_url_once_base_is_cached(self):
+        self.user.profile_picture = 'profile_pictures/me.png'
+        self.user.save()
+        for index in range(3):
+            PostFactory(user=self.user, image=f'post_images/foto {index}.png', video='post_videos/clip.mp4')
+
+        self.client.get(reverse('post-list'))
+        with patch.object(FileSystemStorage, 'url', autospec=True, side_effect=FileSystemStorage.url) as url:
+            response = self.client.get(reverse('post-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # base do storage em cache por processo: nenhum storage.url() por campo
+        self.assertEqual(url.call_count, 0)
+
+        # mesmas URLs que storage.url() + build_absolute_uri
+        results = response.data['results']
+        self.assertEqual(
+            sorted(post['image'] for post in results),
+            [f'http://testserver/media/post_images/foto%20{index}.png' for index in range(3)],
+        )
+        self.assertEqual(results[0]['video'], 'http://testserver/media/post_videos/clip.mp4')
+        self.assertEqual(results[0]['user']['profile_picture'], 'http://testserver/media/profile_pictures/me.png')
+
+        with override_settings(MEDIA_URL='https://cdn.example.com/media/'):
+            response = self.client.get(reverse('post-list'))
+        self.assertEqual(response.data['results'][0]['video'], 'https://cdn.example.com/media/post_videos/clip.mp4')
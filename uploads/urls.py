@@ -0,0 +1,12 @@
+# uploads/urls.py
+
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from .viewsets import UploadIntentViewSet
+
+router = DefaultRouter()
+router.register(r'uploads', UploadIntentViewSet, basename='upload')
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
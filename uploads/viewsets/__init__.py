@@ -0,0 +1 @@
+from .upload_intent_viewset import UploadIntentViewSet
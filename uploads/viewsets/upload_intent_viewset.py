@@ -0,0 +1,84 @@
+# uploads/viewsets/upload_intent_viewset.py
+
+import io
+import re
+
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from ..direct import UploadRejected, append_chunk, finalize_intent, upload_target
+from ..models import UploadIntent
+from ..serializers import UploadIntentSerializer
+
+CONTENT_RANGE = re.compile(r"^bytes (\d+)-(\d+)/(\d+)$")
+
+
+# uploads diretos ao storage (uploads/direct.py)
+# POST /uploads/                 -> intent + destino do envio ("upload")
+# GET  /uploads/{id}/            -> estado (received: retomada do upload local)
+# PUT  /uploads/{id}/content/    -> parte do upload local (Content-Range)
+# POST /uploads/{id}/finalize/   -> confere tamanho e tipo
+class UploadIntentViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    serializer_class = UploadIntentSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return UploadIntent.objects.filter(user=self.request.user)
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        intent = serializer.save()
+
+        data = serializer.data
+        data["upload"] = upload_target(intent, request)
+        return Response(data, status=status.HTTP_201_CREATED)
+
+    # corpo: bytes da parte; cabeçalho Content-Range: bytes {início}-{fim}/{total}
+    # início diferente do já recebido: 409 com o offset para retomar
+    @action(detail=True, methods=["put"])
+    def content(self, request, pk=None):
+        match = CONTENT_RANGE.match(request.headers.get("Content-Range", ""))
+        if match is None:
+            return Response({"detail": "Content-Range header required."}, status=status.HTTP_400_BAD_REQUEST)
+        start, end, total = (int(value) for value in match.groups())
+
+        with transaction.atomic():
+            intent = self.get_queryset().select_for_update().filter(pk=pk).first()
+            if intent is None:
+                return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+            if not intent.temp_name:
+                return Response(
+                    {"detail": "Upload directly to the storage target."}, status=status.HTTP_400_BAD_REQUEST,
+                )
+            if intent.status != UploadIntent.PENDING or intent.expires_at <= timezone.now():
+                return Response({"detail": "Upload is closed."}, status=status.HTTP_409_CONFLICT)
+            if total != intent.size or end < start:
+                return Response({"detail": "Invalid Content-Range."}, status=status.HTTP_400_BAD_REQUEST)
+            if start != intent.received:
+                return Response(
+                    {"detail": "Unexpected offset.", "received": intent.received}, status=status.HTTP_409_CONFLICT,
+                )
+
+            try:
+                received = append_chunk(intent, start, end - start + 1, request.stream or io.BytesIO())
+            except UploadRejected as e:
+                return Response(
+                    {"detail": str(e), "received": intent.received}, status=status.HTTP_400_BAD_REQUEST,
+                )
+        return Response({"received": received})
+
+    @action(detail=True, methods=["post"])
+    def finalize(self, request, pk=None):
+        intent = self.get_object()
+        if intent.expires_at <= timezone.now():
+            return Response({"detail": "Upload intent expired."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            finalize_intent(intent)
+        except UploadRejected as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(self.get_serializer(intent).data)